@@ -0,0 +1,203 @@
+"""User-defined price alerts, checked against every 1m kline tick.
+
+Alerts are plain dicts so they can be stored with the settings:
+
+    {"id": 1, "symbol": "BTCUSDT", "kind": "price", "value": 70000, "cooldown": 300}
+    {"id": 2, "symbol": "ETHUSDT", "kind": "move", "value": -5, "window": 15, "cooldown": 300}
+    {"id": 3, "symbol": "SOLUSDT", "kind": "volume", "value": 3, "cooldown": 300}
+
+* price: the price crosses `value` in either direction;
+* move: the price is `value` % above the lowest low (or, when negative, below
+  the highest high) of the last `window` one-minute candles;
+* volume: the forming candle's volume reaches `value` times the average of the
+  previous VOLUME_LOOKBACK closed candles.
+
+Thresholds are kept per symbol in sorted lists, so a tick finds every alert it
+fires with a bisect: O(log n) however many alerts a symbol has. An alert that
+fires leaves its list for `cooldown` seconds, which keeps conditions that stay
+true (a sustained move or spike) from being rescanned on every tick.
+AlertNotifier delivers events on its own thread and merges bursts per symbol.
+"""
+import heapq
+import queue
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+
+KINDS = ("price", "move", "volume")
+DEFAULT_COOLDOWN = 300.0
+DEFAULT_WINDOW = 15  # Minutes, for "move" alerts
+VOLUME_LOOKBACK = 20  # Closed candles averaged for "volume" alerts
+VOLUME_MIN_HISTORY = 5  # Volume alerts stay quiet until this many candles have closed
+DEBOUNCE_S = 2.0  # Alerts for one symbol closer together than this are delivered as one notification
+_MINUTE_MS = 60_000
+_INF = float("inf")
+
+
+class _Window:
+    """Lowest low and highest high over the last `minutes` 1m candles (forming candle included), in O(1) amortized."""
+
+    def __init__(self, minutes):
+        self.minutes = minutes; self.lows, self.highs = deque(), deque()  # Monotonic (open_time, value) queues
+
+    def update(self, rec):
+        lows, highs = self.lows, self.highs
+        # A forming candle's low only falls and its high only rises, so its previous entry is always evicted here
+        while lows and lows[-1][1] >= rec.low: lows.pop()
+        lows.append((rec.open_time, rec.low))
+        while highs and highs[-1][1] <= rec.high: highs.pop()
+        highs.append((rec.open_time, rec.high))
+        start = rec.open_time - (self.minutes - 1) * _MINUTE_MS
+        while lows[0][0] < start: lows.popleft()
+        while highs[0][0] < start: highs.popleft()
+        return lows[0][1], highs[0][1]
+
+
+class _SymbolAlerts:
+    def __init__(self):
+        self.levels = []  # (level, id) for price alerts
+        self.moves = {}  # window minutes -> [_Window, [(pct, id) rising], [(pct, id) falling]]
+        self.spikes = []  # (factor, id) for volume alerts
+        self.price = None
+        self.volumes, self.volume_sum, self.volume_time = deque(maxlen=VOLUME_LOOKBACK), 0.0, None
+
+    def close_volume(self, rec):
+        if rec.open_time == self.volume_time: return
+        self.volume_time = rec.open_time
+        if len(self.volumes) == VOLUME_LOOKBACK: self.volume_sum -= self.volumes[0]
+        self.volumes.append(rec.volume); self.volume_sum += rec.volume
+
+
+class AlertEngine:
+    def __init__(self, alerts=(), on_fire=None):
+        """`on_fire(events)` is called from the checking thread with the events of each tick that fired any."""
+        self.on_fire = on_fire; self.lock = threading.Lock()
+        self.by_id, self.symbols, self.cooling = {}, {}, []  # cooling: heap of (until, id)
+        self.next_id = 1
+        for alert in alerts: self.add(alert)
+
+    @property
+    def alerts(self):
+        """All alerts as dicts, for saving with the settings."""
+        with self.lock: return [{k: v for k, v in a.items() if k != 'cooling'} for a in self.by_id.values()]
+
+    def add(self, alert):
+        """Validates and indexes an alert dict, assigning an id if it has none; returns the stored alert."""
+        alert = dict(alert); alert['symbol'] = alert['symbol'].upper(); alert['value'] = float(alert['value'])
+        if alert['kind'] not in KINDS: raise ValueError(f"Unknown alert kind: {alert['kind']}")
+        if alert['kind'] == "move":
+            alert['window'] = int(alert.get('window') or DEFAULT_WINDOW)
+            if alert['window'] < 1 or not alert['value']: raise ValueError("A move alert needs a window of at least 1 minute and a non-zero %")
+        else: alert.pop('window', None)
+        if alert['kind'] == "volume" and alert['value'] <= 0: raise ValueError("A volume alert needs a positive multiple")
+        alert['cooldown'] = float(alert.get('cooldown', DEFAULT_COOLDOWN)); alert.pop('cooling', None)
+        with self.lock:
+            alert['id'] = alert.get('id') or self.next_id; self.next_id = max(self.next_id, alert['id'] + 1)
+            self.by_id[alert['id']] = alert; self._index(alert)
+        return alert
+
+    def remove(self, alert_id):
+        with self.lock:
+            alert = self.by_id.pop(alert_id, None)
+            if alert is None: return
+            if not alert.get('cooling'): self._unindex(alert)
+            # Per-symbol state (last price, candle windows, volume history) is kept while any alert still uses it
+            rest = [a for a in self.by_id.values() if a['symbol'] == alert['symbol']]
+            if not rest: del self.symbols[alert['symbol']]
+            elif alert['kind'] == "move" and not any(a['kind'] == "move" and a['window'] == alert['window'] for a in rest):
+                del self.symbols[alert['symbol']].moves[alert['window']]
+
+    def _slot(self, alert):
+        """The sorted list an alert belongs in and its key."""
+        state = self.symbols.setdefault(alert['symbol'], _SymbolAlerts()); kind, value = alert['kind'], alert['value']
+        if kind == "price": return state.levels, (value, alert['id'])
+        if kind == "volume": return state.spikes, (value, alert['id'])
+        window = state.moves.get(alert['window'])
+        if window is None: window = state.moves[alert['window']] = [_Window(alert['window']), [], []]
+        return (window[1], (value, alert['id'])) if value > 0 else (window[2], (-value, alert['id']))
+
+    def _index(self, alert):
+        target, key = self._slot(alert); insort(target, key)
+
+    def _unindex(self, alert):
+        target, key = self._slot(alert); i = bisect_left(target, key)
+        if i < len(target) and target[i] == key: del target[i]
+
+    def _rearm(self, now):
+        while self.cooling and self.cooling[0][0] <= now:
+            _, alert_id = heapq.heappop(self.cooling); alert = self.by_id.get(alert_id)
+            if alert and alert.get('cooling'): alert['cooling'] = False; self._index(alert)
+
+    def check(self, rec, now=None):
+        """Checks one KlineRecord against the symbol's alerts; returns the events fired (usually none)."""
+        if rec.symbol not in self.symbols and not self.cooling: return []
+        now = time.time() if now is None else now
+        with self.lock:
+            if self.cooling and self.cooling[0][0] <= now: self._rearm(now)
+            state = self.symbols.get(rec.symbol)
+            if state is None: return []
+            fired = []; price, prev = rec.close, state.price; state.price = price
+            if state.levels and prev is not None and price != prev:
+                # Crossing up fires levels in (prev, price], crossing down fires levels in [price, prev)
+                lo, hi = (bisect_right(state.levels, (prev, _INF)), bisect_right(state.levels, (price, _INF))) if price > prev else \
+                         (bisect_left(state.levels, (price, 0)), bisect_left(state.levels, (prev, 0)))
+                fired += [(key, f"crossed {'above' if price > prev else 'below'} {key[0]:,.8g}") for key in state.levels[lo:hi]]
+            for minutes, (window, rising, falling) in state.moves.items():
+                low, high = window.update(rec)
+                if rising and low > 0:
+                    up = (price - low) / low * 100
+                    fired += [(key, f"up {up:.2f}% in {minutes}m (alert at {key[0]:g}%)") for key in rising[:bisect_right(rising, (up, _INF))]]
+                if falling and high > 0:
+                    down = (high - price) / high * 100
+                    fired += [(key, f"down {down:.2f}% in {minutes}m (alert at -{key[0]:g}%)") for key in falling[:bisect_right(falling, (down, _INF))]]
+            if state.spikes and len(state.volumes) >= VOLUME_MIN_HISTORY:
+                average = state.volume_sum / len(state.volumes)
+                ratio = rec.volume / average if average > 0 else 0.0
+                fired += [(key, f"volume {ratio:.1f}x the {len(state.volumes)}-candle average") for key in state.spikes[:bisect_right(state.spikes, (ratio, _INF))]]
+            if rec.closed: state.close_volume(rec)
+            events = [self._fire(key[1], message, price, now) for key, message in fired]
+        if events and self.on_fire: self.on_fire(events)
+        return events
+
+    def _fire(self, alert_id, message, price, now):
+        alert = self.by_id[alert_id]; alert['last_fired'] = now
+        if alert['cooldown'] > 0:
+            self._unindex(alert); alert['cooling'] = True; heapq.heappush(self.cooling, (now + alert['cooldown'], alert_id))
+        return {"id": alert_id, "symbol": alert['symbol'], "kind": alert['kind'], "price": price, "time": now, "message": f"{alert['symbol']} {message}"}
+
+
+class AlertNotifier:
+    """Delivers alert events on a background thread; events for one symbol within `debounce` seconds become one notification."""
+
+    def __init__(self, log_cb, debounce=DEBOUNCE_S, desktop=True, app_name="Elite Crypto Dashboard"):
+        self.log_cb, self.debounce, self.desktop, self.app_name = log_cb, debounce, desktop, app_name
+        self.queue = queue.Queue(); self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True, name="alert-notifier"); self.thread.start()
+
+    def submit(self, events):
+        for event in events: self.queue.put(event)
+
+    def stop(self): self.running = False; self.queue.put(None)
+
+    def _run(self):
+        pending = {}  # symbol -> (deadline, [events])
+        while self.running:
+            timeout = max(0.0, min(d for d, _ in pending.values()) - time.monotonic()) if pending else None
+            try:
+                event = self.queue.get(timeout=timeout)
+                if event is not None: pending.setdefault(event['symbol'], (time.monotonic() + self.debounce, []))[1].append(event)
+            except queue.Empty: pass
+            now = time.monotonic()
+            for symbol in [s for s, (deadline, _) in pending.items() if deadline <= now]: self._deliver(symbol, pending.pop(symbol)[1])
+
+    def _deliver(self, symbol, events):
+        messages = [e['message'] for e in events]
+        text = messages[0] if len(messages) == 1 else f"{len(messages)} alerts: " + "; ".join(messages)
+        self.log_cb(f"Alert: {text}")
+        if not self.desktop: return
+        try:
+            from plyer import notification
+            notification.notify(title=f"{symbol} alert", message=text[:256], app_name=self.app_name, timeout=10)
+        except Exception as e:  # plyer raises backend-specific errors when no notification service is available
+            self.log_cb(f"Desktop notification failed: {e}"); self.desktop = False
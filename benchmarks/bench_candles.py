@@ -0,0 +1,87 @@
+"""Multi-timeframe aggregator cost: CPU per 1m tick, memory, and interval-switch lookups at hundreds of symbols x 6 intervals.
+
+Every series is seeded with a full window of history, then a synthetic 1m
+stream (several ticks per minute, the last one closing the minute) runs for a
+few hours. The resampled 5m/1h candles of one symbol are checked against a
+plain resample of its 1m candles. Memory is what tracemalloc sees allocated by
+the aggregator.
+Run from the repository root: python benchmarks/bench_candles.py [minutes]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from candles import CandleAggregator
+from core import INTERVAL_MS, MAX_CHART_POINTS
+from decode import KlineRecord
+
+SYMBOL_COUNTS = (100, 300, 500)
+TICKS_PER_MINUTE = 3
+DAY = 86_400_000
+
+
+def history(rng, ms, end, price):
+    rows = []
+    for i in range(MAX_CHART_POINTS, 0, -1):
+        t = end - i * ms; c = price * (1 + rng.gauss(0, 0.01))
+        rows.append((t, price, max(price, c) * 1.001, min(price, c) * 0.999, c, rng.uniform(1, 100), t + ms - 1))
+    return rows
+
+
+def stream(rng, symbols, start, minutes):
+    """1m KlineRecords in arrival order: TICKS_PER_MINUTE per symbol and minute, running volume, the last one closed."""
+    prices = {s: rng.uniform(1, 1000) for s in symbols}
+    for m in range(minutes):
+        t = start + m * 60_000; candles = {s: [prices[s]] * 4 + [0.0] for s in symbols}
+        for k in range(TICKS_PER_MINUTE):
+            for s in symbols:
+                c = candles[s]; p = c[3] * (1 + rng.gauss(0, 0.001)); c[1], c[2], c[3] = max(c[1], p), min(c[2], p), p; c[4] += rng.uniform(0, 5)
+                yield KlineRecord(s, "1m", t, t + 59_999, c[0], c[1], c[2], c[3], c[4], k == TICKS_PER_MINUTE - 1)
+        for s in symbols: prices[s] = candles[s][3]
+
+
+def resample(minute_rows, ms):
+    out = {}
+    for t, o, h, l, c, v in minute_rows:
+        b = t - t % ms; r = out.get(b)
+        out[b] = [b, o, h, l, c, v] if r is None else [b, r[1], max(r[2], h), min(r[3], l), c, r[5] + v]
+    return [tuple(r) for _, r in sorted(out.items())]
+
+
+def main(minutes=240):
+    print(f"{len(INTERVAL_MS)} intervals, {MAX_CHART_POINTS} candles per series, {minutes} minutes x {TICKS_PER_MINUTE} ticks per symbol")
+    print(f"{'symbols':>8} {'us/tick':>9} {'ticks/s':>11} {'memory MiB':>11} {'B/series':>9} {'switch us':>10}")
+    for n in SYMBOL_COUNTS:
+        rng = random.Random(n); symbols = [f"COIN{i}USDT" for i in range(n)]; start = 20_000 * DAY  # UTC midnight
+        tracemalloc.start()
+        agg = CandleAggregator(INTERVAL_MS, MAX_CHART_POINTS)
+        for s in symbols:
+            for interval, ms in INTERVAL_MS.items(): agg.seed(s, interval, history(rng, ms, start, 100.0), now=start)
+        ticks = list(stream(rng, symbols, start, minutes)); tracemalloc.stop(); tracemalloc.start()
+        agg_mem = CandleAggregator(INTERVAL_MS, MAX_CHART_POINTS)
+        for s in symbols:
+            for interval, ms in INTERVAL_MS.items(): agg_mem.seed(s, interval, history(rng, ms, start, 100.0), now=start)
+        for rec in ticks: agg_mem.add(rec)
+        memory = tracemalloc.get_traced_memory()[0]; tracemalloc.stop(); del agg_mem
+        begin = time.perf_counter()
+        for rec in ticks: agg.add(rec)
+        per_tick = (time.perf_counter() - begin) / len(ticks) * 1e6
+        begin = time.perf_counter(); lookups = 0
+        for s in symbols[:50]:
+            for interval in INTERVAL_MS: assert agg.rows(s, interval, MAX_CHART_POINTS); lookups += 1
+        switch = (time.perf_counter() - begin) / lookups * 1e6
+        series = n * len(INTERVAL_MS)
+        print(f"{n:>8} {per_tick:>9.2f} {1e6 / per_tick:>11,.0f} {memory / 2**20:>11.1f} {memory / series:>9,.0f} {switch:>10.1f}")
+    # Correctness: the aggregator's candles equal a plain resample of the final 1m candles
+    minute_rows = [(r.open_time, r.open, r.high, r.low, r.close, r.volume) for r in ticks if r.symbol == "COIN0USDT" and r.closed]
+    for interval in ("5m", "15m", "1h"):
+        got = [r[:6] for r in agg.rows("COIN0USDT", interval) if r[0] >= start]; want = resample(minute_rows, INTERVAL_MS[interval])[-len(got):]
+        assert len(got) == len(want) and all(abs(a - b) < 1e-6 for g, w in zip(got, want) for a, b in zip(g, w)), interval
+    print("5m/15m/1h candles match a direct resample of the 1m stream")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 240)
@@ -0,0 +1,153 @@
+"""Dashboard table under a 500-row synthetic feed: per-tick Treeview updates vs the frame-budgeted TreeRenderer.
+
+Every DRAIN_MS (the UI queue drain interval) a batch of symbols gets a new
+price and 24h stats, as the kline and ticker streams deliver them. "direct" is
+the previous dashboard path: all seven cells formatted and sent with one
+`tree.item` per update. "renderer" marks rows dirty and draws at RENDER_HZ,
+unsorted and sorted by 24h % (rows move every frame).
+
+Without a display only the work is counted: Tk calls and Python time per
+second, with a stand-in tree that records calls and shows VISIBLE rows. With a
+display the feed runs in a real Tk main loop and a heartbeat `after` every
+HEARTBEAT_MS measures how late the loop serves it (p50/p99/max), i.e. input
+and redraw latency.
+Run from the repository root: python benchmarks/bench_dashboard.py [seconds]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tree_render import RENDER_HZ, TreeRenderer
+
+ROWS = 500
+DRAIN_MS = 100
+UPDATES_PER_DRAIN = 250  # Every row about twice a second
+VISIBLE = 25
+HEARTBEAT_MS = 5
+COLUMNS = ("Symbol", "Price", "24h %", "24h High", "24h Low", "24h Volume", "Action")
+_price = lambda v: f"${v:,.4f}"
+FORMATTERS = (str, lambda v: _price(v) if v > 0 else "Loading...", lambda v: f"{v:.2f}%", _price, _price, lambda v: f"${v:,.0f}", str)
+
+
+def has_display():
+    return sys.platform in ("win32", "darwin") or bool(os.environ.get("DISPLAY"))
+
+
+class Feed:
+    def __init__(self, seed):
+        self.rng = random.Random(seed); self.symbols = [f"COIN{i}USDT" for i in range(ROWS)]
+        self.rows = {s: [s, p, 0.0, p * 1.05, p * 0.95, self.rng.uniform(1e5, 1e9), "❌"] for s in self.symbols for p in [self.rng.uniform(0.01, 50000)]}
+
+    def step(self):
+        """Moves UPDATES_PER_DRAIN random symbols; returns them."""
+        batch = self.rng.sample(self.symbols, UPDATES_PER_DRAIN)
+        for s in batch:
+            r = self.rows[s]; r[1] *= 1 + self.rng.gauss(0, 0.0005); r[2] += self.rng.gauss(0, 0.02)
+            r[3], r[4] = max(r[3], r[1]), min(r[4], r[1]); r[5] += self.rng.uniform(0, 1e4)
+        return batch
+
+    def values(self, symbol): return self.rows[symbol]
+
+
+def direct_update(tree, feed, symbol):
+    """The dashboard's update path before TreeRenderer: format every cell, send the whole row."""
+    raw = feed.values(symbol); values = tuple(fmt(v) for fmt, v in zip(FORMATTERS, raw)); tag = "up" if raw[2] > 0 else "down"
+    if tree.exists(symbol): tree.item(symbol, values=values, tags=(tag,))
+    else: tree.insert("", "end", iid=symbol, values=values, tags=(tag,))
+
+
+def make_renderer(tree, feed, sort):
+    for col in COLUMNS: tree.heading(col, text=col)
+    renderer = TreeRenderer(tree, COLUMNS, feed.values, FORMATTERS, tag_fn=lambda raw: "up" if raw[2] > 0 else "down")
+    if sort: renderer.sort_by("24h %")
+    return renderer
+
+
+class _CountingTree:
+    """Records the Tk calls a Treeview would receive and reports a VISIBLE-row viewport."""
+    def __init__(self): self.calls = 0; self.children = []; self.headings = {}
+
+    def _call(self): self.calls += 1
+    def heading(self, col, option=None, **kw):
+        self._call()
+        if option: return self.headings.get(col, "")
+        self.headings[col] = kw.get("text", self.headings.get(col, ""))
+    def configure(self, **kw): self._call()
+    def bind(self, *args, **kw): self._call()
+    def after(self, ms, fn): return "after#"
+    def winfo_ismapped(self): self._call(); return True
+    def yview(self): self._call(); return 0.0, min(1.0, VISIBLE / max(1, len(self.children)))
+    def exists(self, iid): self._call(); return iid in self.children
+    def insert(self, parent, index, iid, **kw): self._call(); self.children.append(iid)
+    def item(self, iid, **kw): self._call()
+    def set(self, iid, col, value): self._call()
+    def set_children(self, parent, *iids): self._call(); self.children = list(iids)
+    def detach(self, iid): self._call(); self.children.remove(iid)
+    def move(self, iid, parent, index):
+        self._call()
+        if iid in self.children: self.children.remove(iid)
+        self.children.insert(index, iid)
+
+
+def count_work(mode, seconds):
+    """(Tk calls/s, Python ms/s) for `seconds` of simulated feed."""
+    feed = Feed(1); tree = _CountingTree(); drains = int(seconds * 1000 / DRAIN_MS); per_frame = max(1, round(1000 / RENDER_HZ / DRAIN_MS))
+    renderer = None if mode == "direct" else make_renderer(tree, feed, mode.endswith("sorted"))
+    for s in feed.symbols: direct_update(tree, feed, s) if renderer is None else renderer.mark(s)
+    if renderer: renderer.render()
+    tree.calls = 0; busy = 0.0
+    for i in range(drains):
+        batch = feed.step(); start = time.perf_counter()
+        if renderer is None:
+            for s in batch: direct_update(tree, feed, s)
+        else:
+            for s in batch: renderer.mark(s)
+            if i % per_frame == per_frame - 1: renderer.render()
+        busy += time.perf_counter() - start
+    return tree.calls / seconds, busy * 1000 / seconds
+
+
+def measure_loop(mode, seconds):
+    """Heartbeat lateness percentiles (ms) and drain-callback ms/s in a real Tk main loop."""
+    import tkinter as tk
+    from tkinter import ttk
+    root = tk.Tk(); tree = ttk.Treeview(root, columns=COLUMNS, show="headings", height=VISIBLE); tree.pack(fill=tk.BOTH, expand=True)
+    feed = Feed(1); renderer = None if mode == "direct" else make_renderer(tree, feed, mode.endswith("sorted"))
+    for s in feed.symbols: direct_update(tree, feed, s) if renderer is None else renderer.mark(s)
+    root.update()
+    late, busy, end = [], [0.0], time.monotonic() + seconds
+
+    def heartbeat(due):
+        now = time.monotonic(); late.append(max(0.0, now - due) * 1000)
+        if now < end: root.after(HEARTBEAT_MS, heartbeat, now + HEARTBEAT_MS / 1000)
+        else: root.quit()
+
+    def drain():
+        start = time.perf_counter()
+        for s in feed.step(): direct_update(tree, feed, s) if renderer is None else renderer.mark(s)
+        busy[0] += time.perf_counter() - start; root.after(DRAIN_MS, drain)
+
+    root.after(DRAIN_MS, drain); root.after(HEARTBEAT_MS, heartbeat, time.monotonic() + HEARTBEAT_MS / 1000); root.mainloop()
+    frame_ms = renderer.stats["max_frame_ms"] if renderer else 0.0
+    root.destroy(); late.sort()
+    return late[len(late) // 2], late[int(len(late) * 0.99)], late[-1], busy[0] * 1000 / seconds, frame_ms
+
+
+def main(seconds=10.0):
+    modes = ("direct", "renderer", "renderer sorted")
+    print(f"{ROWS} rows, {UPDATES_PER_DRAIN} updates every {DRAIN_MS} ms, renderer at {RENDER_HZ} Hz, {VISIBLE} rows visible")
+    print(f"{'mode':<16} {'Tk calls/s':>11} {'Python ms/s':>12}")
+    for mode in modes:
+        calls, busy = count_work(mode, seconds); print(f"{mode:<16} {calls:>11,.0f} {busy:>12.1f}")
+    if not has_display(): print("No display: skipping the main-loop latency measurement (try xvfb-run)"); return
+    print(f"\nmain-loop latency, {seconds:g}s per mode (heartbeat every {HEARTBEAT_MS} ms)")
+    print(f"{'mode':<16} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} {'drain ms/s':>11} {'max frame ms':>13}")
+    for mode in modes:
+        p50, p99, worst, busy, frame = measure_loop(mode, seconds)
+        print(f"{mode:<16} {p50:>7.1f} {p99:>7.1f} {worst:>7.1f} {busy:>11.1f} {frame:>13.1f}")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 10.0)
@@ -0,0 +1,60 @@
+"""Microbenchmark of websocket kline decoding: the old json.loads + float() path versus KlineDecoder.
+
+Frames are generated in Binance's combined-stream format; pass a file with one
+raw frame per line to benchmark recorded traffic instead.
+Run from the repository root: python benchmarks/bench_decode.py [frames.txt]
+"""
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import decode
+from decode import KlineDecoder
+
+TRACKED = [f"coin{i}usdt" for i in range(100)]
+UNTRACKED = [f"gone{i}usdt" for i in range(25)]  # e.g. frames still arriving after an UNSUBSCRIBE
+
+
+def make_frames(n):
+    rng = random.Random(7); frames = []
+    for i in range(n):
+        sym = rng.choice(TRACKED if rng.random() < 0.8 else UNTRACKED); price = rng.uniform(1, 60000)
+        k = {"t": 1700000000000 + i // 500 * 60000, "T": 1700000059999, "s": sym.upper(), "i": "1m", "f": 100, "L": 200,
+             "o": f"{price:.8f}", "c": f"{price * 1.001:.8f}", "h": f"{price * 1.002:.8f}", "l": f"{price * 0.999:.8f}",
+             "v": f"{rng.uniform(0, 100):.8f}", "n": 100, "x": rng.random() < 0.02, "q": "1.0", "V": "0.5", "Q": "0.5", "B": "0"}
+        frames.append(json.dumps({"stream": f"{sym}@kline_1m", "data": {"e": "kline", "E": k["t"], "s": sym.upper(), "k": k}}, separators=(",", ":")))
+    return frames
+
+
+def old_path(frames, tracked):
+    """What the app did before: decode every frame, then float() the same fields again in each UI consumer."""
+    for raw in frames:
+        data = json.loads(raw); data = data.get("data", data)
+        if "k" in data:
+            k = data["k"]
+            for _ in range(3): float(k["c"])  # data_callback, update_dashboard, append_live_data
+            float(k["o"]); float(k["h"]); float(k["l"]); float(k["v"])
+
+
+def new_path(frames, decoder):
+    for raw in frames:
+        rec = decoder.decode(raw)
+        if rec is not None: rec.close; rec.close; rec.close
+
+
+def main():
+    frames = [line.rstrip("\n") for line in open(sys.argv[1])] if len(sys.argv) > 1 else make_frames(200_000)
+    print(f"{len(frames):,} frames, JSON backend: {'orjson' if decode.orjson else 'json'}")
+    start = time.perf_counter(); old_path(frames, TRACKED); old = time.perf_counter() - start
+    print(f"{'json.loads + float() in consumers':<38}{len(frames) / old:>12,.0f} frames/s")
+    decoder = KlineDecoder(TRACKED)
+    start = time.perf_counter(); new_path(frames, decoder); new = time.perf_counter() - start
+    print(f"{'KlineDecoder (filter + KlineRecord)':<38}{len(frames) / new:>12,.0f} frames/s  x{old / new:.2f}")
+    print(f"decoded {decoder.stats['decoded']:,}, dropped before parsing {decoder.stats['dropped']:,}")
+
+
+if __name__ == "__main__":
+    main()
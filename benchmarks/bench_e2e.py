@@ -0,0 +1,132 @@
+"""End-to-end benchmark: a synthetic session replayed through the real app, with no network.
+
+For each pair count a session is synthesized and served by replay.ReplayServer on
+localhost; the app runs in a child process pointed at it (BINANCE_REST_URL /
+BINANCE_WS_URL) from a scratch directory, so no settings or databases are touched.
+The server stamps each frame's event time as it is sent, so latency is the time
+from the frame leaving the server to the update being drawn: measured when Tk goes
+idle after the batch was applied (tick-to-screen). A drawn symbol is timed from
+its oldest frame since it was last drawn, so ticks coalesced away in the queue
+count as the stale screen they caused rather than dropping out of the sample. Without a display (or with
+--headless) the core alone is measured, up to the drained batch reaching the consumer.
+Throughput, queue depth and RSS are sampled once a second.
+Run from the repository root: python benchmarks/bench_e2e.py [--seconds 30] [--speed 1] [--pairs 10,100,500]
+  (xvfb-run -a python benchmarks/bench_e2e.py for the GUI on a machine without a display)
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import replay
+
+_EVENT_TIME = re.compile(r'"E":(\d+)')
+SAMPLE_S = 1.0
+
+
+def has_display():
+    return sys.platform in ("win32", "darwin") or bool(os.environ.get("DISPLAY"))
+
+
+def rss_mib():
+    try:
+        with open("/proc/self/status") as f: return next(int(line.split()[1]) for line in f if line.startswith("VmRSS:")) / 1024
+    except (OSError, StopIteration):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)  # Peak, where /proc is missing
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))] if values else float("nan")
+
+
+def child(args):
+    """Runs the app against the replay server and prints one JSON summary line."""
+    import core
+    sent, latencies, received = {}, [], [0]
+    if args.gui:
+        import tkinter as tk
+        import crypto
+        root = tk.Tk(); app = crypto.EliteCryptoDashboard(root); api = app.api
+    else: api = core.BinanceAPI(lambda type, data: None, lambda msg: None, lambda status: None, args.pair_list)
+    decode = api.decoder.decode
+    def timed_decode(raw):
+        rec = decode(raw); received[0] += 1
+        if rec is not None and hasattr(rec, "open_time"):
+            m = _EVENT_TIME.search(raw)
+            if m: sent.setdefault(rec.symbol, int(m.group(1)))  # Oldest frame per symbol not yet drawn
+        return rec
+    api.decoder.decode = timed_decode
+    def record(pending):
+        now = time.time() * 1000; latencies.extend(now - t for t in pending)
+    data_cb = api.data_cb
+    def timed_data_cb(type, data):
+        data_cb(type, data)
+        if type != "klines": return
+        # Taken at drain time: frames decoded before the redraw belong to the next batch
+        pending = [t for t in (sent.pop(symbol, None) for symbol in {rec.symbol for rec in data}) if t is not None]
+        if args.gui: root.after_idle(record, pending)  # Idle callbacks run after the redraws the batch scheduled
+        else: record(pending)
+    api.data_cb = timed_data_cb
+    samples, start = [], time.monotonic()
+    def sample():
+        last = (0, 0)
+        while True:
+            time.sleep(SAMPLE_S); stats = (received[0], api.drain_stats["drained"])
+            samples.append({"t": round(time.monotonic() - start, 1), "frames": stats[0] - last[0], "drained": stats[1] - last[1],
+                            "queue": api.queue.qsize(), "max_queue": api.drain_stats["max_queue_depth"], "rss": round(rss_mib(), 1)})
+            last = stats
+    def finish():
+        print(json.dumps({"samples": samples, "latencies": latencies, "rss_start": rss_start}), flush=True)
+        os._exit(0)  # Skip on_closing and thread shutdown
+    rss_start = rss_mib(); threading.Thread(target=sample, daemon=True).start(); api.connect()
+    if args.gui: root.after(int(args.seconds * 1000), finish); root.mainloop()
+    else:
+        while time.monotonic() - start < args.seconds: api.process_queue(); time.sleep(0.1)
+        finish()
+
+
+def run(pairs, args, gui):
+    pair_list = [f"coin{i}usdt" for i in range(pairs)]
+    server = replay.ReplayServer(replay.synthesize(pair_list, args.seconds, args.rate), speed=args.speed).start()
+    env = dict(os.environ, BINANCE_REST_URL=server.rest_url, BINANCE_WS_URL=server.ws_url, PYTHONPATH=ROOT)
+    try:
+        with tempfile.TemporaryDirectory() as cwd:
+            with open(os.path.join(cwd, "config.json"), "w") as f: json.dump({"tracked_pairs": pair_list}, f)
+            cmd = [sys.executable, os.path.abspath(__file__), "--child", "--pairs", str(pairs), "--seconds", str(args.seconds + 5)] + (["--gui"] if gui else [])
+            out = subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, text=True, timeout=args.seconds + 120).stdout
+    finally: server.stop()
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pairs", default="10,100,500"); parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--rate", type=float, default=2.0, help="kline frames per second per pair")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed; 0 = as fast as possible")
+    parser.add_argument("--headless", action="store_true"); parser.add_argument("--child", action="store_true"); parser.add_argument("--gui", action="store_true")
+    args = parser.parse_args()
+    if args.child: args.pair_list = [f"coin{i}usdt" for i in range(int(args.pairs))]; child(args); return
+    gui = has_display() and not args.headless
+    print(f"{'GUI, tick-to-screen' if gui else 'core only, tick-to-consumer'}: {args.seconds:g}s sessions, {args.rate:g} kline frames/s/pair "
+          f"+ miniTicker, speed {'max' if not args.speed else f'{args.speed:g}x'}")
+    print(f"{'pairs':>6} {'frames/s':>9} {'drained/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max queue':>10} {'RSS MiB':>14}")
+    for pairs in (int(p) for p in args.pairs.split(",")):
+        result = run(pairs, args, gui); samples = [s for s in result["samples"] if s["frames"]] or result["samples"]
+        frames = sum(s["frames"] for s in samples) / max(1, len(samples)); drained = sum(s["drained"] for s in samples) / max(1, len(samples))
+        lat = result["latencies"]; rss = [s["rss"] for s in result["samples"]]
+        print(f"{pairs:>6} {frames:>9,.0f} {drained:>10,.0f} {percentile(lat, 50):>8.1f} {percentile(lat, 95):>8.1f} {percentile(lat, 99):>8.1f} "
+              f"{max((s['max_queue'] for s in samples), default=0):>10,} {result['rss_start']:>6.1f} -> {max(rss, default=0):<6.1f}")
+        print("       RSS over time (MiB): " + " ".join(f"{s['rss']:.0f}" for s in result["samples"][::5]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Shows that per-candle indicator updates cost the same regardless of history length.
+
+Run from the repository root: python benchmarks/bench_indicators.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from indicators import OVERLAYS, OSCILLATORS
+
+UPDATES = 5_000
+
+
+def make_data(n, seed=0):
+    rng = np.random.default_rng(seed); close = np.cumsum(rng.normal(0, 1, n)) + 10_000
+    high, low = close + rng.random(n), close - rng.random(n)
+    return np.vstack((np.arange(n) * 60_000.0, close, high, low, close, rng.random(n) * 10))
+
+
+def main():
+    factories = {**OVERLAYS, **OSCILLATORS}
+    print(f"{'indicator':<14}{'history':>9}{'seed (ms)':>12}{'update (us)':>13}{'full recompute (ms)':>21}")
+    for name, factory in factories.items():
+        for n in (1_000, 10_000, 100_000):
+            data = make_data(n + UPDATES); history, new = data[:, :n], data[:, n:]
+            ind = factory(); start = time.perf_counter(); ind.seed(history); seed_ms = (time.perf_counter() - start) * 1e3
+            start = time.perf_counter()
+            for i in range(UPDATES): ind.update(new[:, i])
+            update_us = (time.perf_counter() - start) / UPDATES * 1e6
+            # What each closed candle would cost if the whole window were recomputed instead
+            start = time.perf_counter()
+            for _ in range(5): factory().seed(history)
+            recompute_ms = (time.perf_counter() - start) / 5 * 1e3
+            print(f"{name:<14}{n:>9,}{seed_ms:>12.2f}{update_us:>13.2f}{recompute_ms:>21.2f}")
+
+
+if __name__ == "__main__":
+    main()
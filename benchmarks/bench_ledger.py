@@ -0,0 +1,47 @@
+"""Cost of logging one trade: rewriting config.json (the old save) versus appending to the ledger.
+
+Run from the repository root: python benchmarks/bench_ledger.py
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ledger import Ledger
+
+SIZES = (1_000, 10_000, 50_000)
+SAVES = 20
+
+
+def make_transactions(n):
+    rng = random.Random(11); start = datetime(2023, 1, 1)
+    return [{"date": (start + timedelta(minutes=i)).isoformat(), "symbol": rng.choice(("BTC", "ETH", "SOL", "BNB")),
+             "type": rng.choice(("Buy", "Sell")), "qty": rng.uniform(0.01, 2), "price": rng.uniform(10, 60000)} for i in range(n)]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in SIZES:
+            txs = make_transactions(n + SAVES); config = {"tracked_pairs": ["btcusdt", "ethusdt"], "transactions": txs[:n]}
+            path = os.path.join(tmp, f"config-{n}.json"); start = time.perf_counter()
+            for tx in txs[n:]:
+                config["transactions"].append(tx)
+                with open(path, "w") as f: json.dump(config, f, indent=4)
+            old = (time.perf_counter() - start) / SAVES
+            ledger = Ledger(os.path.join(tmp, f"ledger-{n}.db")); ledger.extend([(tx, None) for tx in txs[:n]], "bench")
+            start = time.perf_counter()
+            for tx in txs[n:]: ledger.append(tx)
+            new = (time.perf_counter() - start) / SAVES
+            day = datetime.fromisoformat(txs[n // 2]["date"][:10])
+            start = time.perf_counter(); found = ledger.query(symbol="ETH", since=day.isoformat(), until=(day + timedelta(days=1)).isoformat()); lookup = time.perf_counter() - start
+            print(f"{n:>7,} txs: config.json rewrite {old * 1000:8.2f} ms/trade, ledger append {new * 1000:6.2f} ms/trade, "
+                  f"symbol+day lookup {lookup * 1000:.2f} ms ({len(found)} rows)")
+            ledger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Instrumentation overhead on the frame path: BinanceAPI._on_message with METRICS off and on.
+
+Off, nothing is wrapped, so the numbers should match an uninstrumented build.
+On, each frame passes through the receive, decode and enqueue wrappers, klines
+also through alerts and closed klines through the store. Frames are a
+replay.synthesize session's websocket frames, half klines and half miniTickers. The queue is drained between rounds
+so it does not grow.
+Run from the repository root: python benchmarks/bench_metrics.py [frames]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from alerts import AlertEngine
+from core import BinanceAPI
+from metrics import METRICS
+from replay import synthesize
+
+PAIRS = 100
+ROUNDS = 5
+
+
+def per_frame_us(api, frames):
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for raw in frames: api.streams.on_message(raw)
+        best = min(best, (time.perf_counter() - start) / len(frames) * 1e6)
+        while not api.queue.empty(): api.queue.get_nowait()
+    return best
+
+
+def main(n=100_000):
+    symbols = [f"COIN{i}USDT" for i in range(PAIRS)]
+    # One kline and one miniTicker frame per pair and second
+    frames = [e["ws"] for e in synthesize(symbols, seconds=-(-n // (2 * PAIRS)), rate=1.0, seed=5) if "ws" in e][:n]
+    api = BinanceAPI(lambda type, data: None, print, lambda status: None, [s.lower() for s in symbols], alerts=AlertEngine())
+    off = per_frame_us(api, frames); METRICS.enable(); on = per_frame_us(api, frames); METRICS.disable(); off_again = per_frame_us(api, frames)
+    print(f"{len(frames):,} websocket frames over {PAIRS} pairs, best of {ROUNDS}")
+    print(f"metrics off:       {off:6.2f} us/frame")
+    print(f"metrics on:        {on:6.2f} us/frame (+{on - off:.2f} us)")
+    print(f"off again:         {off_again:6.2f} us/frame")
+    for stage, st in METRICS.snapshot()["stages"].items(): print(f"  {stage:<8} {st['count']:>9,} calls  p50 {st['p50'] * 1e6:6.1f} us  p99 {st['p99'] * 1e6:6.1f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
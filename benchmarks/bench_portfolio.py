@@ -0,0 +1,69 @@
+"""Compares the incremental PortfolioEngine with the old replay-on-every-change approach.
+
+Run from the repository root: python benchmarks/bench_portfolio.py [n_transactions]
+"""
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from portfolio import PortfolioEngine
+
+ASSETS = ["BTC", "ETH", "SOL", "BNB", "XRP", "ADA", "DOGE", "AVAX", "DOT", "LINK"]
+
+
+def make_transactions(n):
+    rng = random.Random(42)
+    return [{"date": f"2024-01-01T00:00:{i:09d}", "symbol": rng.choice(ASSETS), "type": "Buy" if rng.random() < 0.7 else "Sell",
+             "qty": rng.uniform(0.01, 2), "price": rng.uniform(1, 50000)} for i in range(n)]
+
+
+def replay(transactions, prices):
+    """The pre-engine recalculate_portfolio: sort and replay every transaction, then revalue every holding."""
+    holdings = defaultdict(lambda: {'qty': 0, 'cost': 0})
+    for tx in sorted(transactions, key=lambda x: x['date']):
+        if tx['type'] == 'Buy': holdings[tx['symbol']]['cost'] += tx['qty'] * tx['price']; holdings[tx['symbol']]['qty'] += tx['qty']
+        else: holdings[tx['symbol']]['qty'] -= tx['qty']
+    revalue(holdings, prices)
+    return holdings
+
+
+def revalue(holdings, prices):
+    """The pre-engine update_portfolio_values (minus the Treeview rebuild): revalue every holding on every tick."""
+    rows, total = [], 0
+    for symbol, data in holdings.items():
+        if data['qty'] <= 1e-9: continue
+        value = data['qty'] * prices.get(f"{symbol}USDT", 0); total += value; avg_cost = data['cost'] / data['qty']
+        rows.append((symbol, f"{data['qty']:.6f}", f"${avg_cost:,.2f}", f"${value:,.2f}", f"${value - data['qty'] * avg_cost:,.2f}"))
+    return total
+
+
+def bench(label, fn, repeat):
+    start = time.perf_counter()
+    for i in range(repeat): fn(i)
+    per_op = (time.perf_counter() - start) / repeat * 1e6
+    print(f"{label:<44}{per_op:>12.2f} us/op")
+    return per_op
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    transactions = make_transactions(n); prices = {f"{a}USDT": 100.0 for a in ASSETS}
+    print(f"{n:,} transactions, {len(ASSETS)} assets")
+    engine = PortfolioEngine(transactions, prices)
+    extra = make_transactions(50)
+    for i, tx in enumerate(extra): tx["date"] = f"2025-01-01T00:00:{i:09d}"
+    old_tx = bench("new transaction, full replay (old)", lambda i: replay(transactions + extra[:i + 1], prices), 5)
+    new_tx = bench("new transaction, PortfolioEngine", lambda i: engine.add_transaction(extra[i], None), len(extra))
+    ticks = [(f"{random.choice(ASSETS)}USDT", random.uniform(1, 50000)) for _ in range(1000)]
+    holdings = replay(transactions, prices)
+    old_tick = bench("price tick, revalue all holdings (old)", lambda i: (prices.__setitem__(*ticks[i]), revalue(holdings, prices)), len(ticks))
+    new_tick = bench("price tick, PortfolioEngine", lambda i: engine.apply_price(*ticks[i]), len(ticks))
+    print(f"speedup: transactions x{old_tx / new_tx:,.0f}, ticks x{old_tick / new_tick:,.1f}")
+    print(f"1k ticks/s costs {new_tick / 10:.3f}% of one core (old: {old_tick / 10:.3f}%, before Treeview rebuilds)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Symbol search benchmark at exchange scale: the old per-keystroke linear scan versus SymbolIndex.
+
+Generates 10,000 synthetic pairs over several quote assets (or takes a count on
+the command line) and times typing a few queries one keystroke at a time, plus
+building the index and loading it back from its JSON cache.
+Run from the repository root: python benchmarks/bench_search.py [symbols]
+"""
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from symbol_index import SymbolIndex
+
+QUOTES = ("USDT", "USDT", "USDT", "USDC", "FDUSD", "BTC", "ETH", "BNB", "TRY", "EUR")
+QUERIES = ("btcusdt", "eth", "sol/usdc", "doge")
+TRACKED = ["btcusdt", "ethusdt"]
+
+
+def make_markets(n):
+    rng = random.Random(5); bases = {"BTC", "ETH", "SOL", "DOGE"}; markets = set()
+    while len(bases) < n // 2: bases.add("".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rng.randint(2, 7))))
+    bases = sorted(bases)
+    for b in ("BTC", "ETH", "SOL", "DOGE"):
+        markets.update((b + q, b, q) for q in set(QUOTES) if q != b)
+    while len(markets) < n:
+        b, q = rng.choice(bases), rng.choice(QUOTES)
+        if b != q: markets.add((b + q, b, q))
+    return sorted(markets)
+
+
+def old_search(all_symbols, tracked_list, term):
+    """What MarketsTab._search did on every keystroke, minus the per-item Listbox inserts."""
+    tracked = set(s.lower() for s in tracked_list)
+    return [s for s in all_symbols if term.lower() in s.lower() and s.lower() not in tracked]
+
+
+def keystrokes():
+    return [q[:i] for q in QUERIES for i in range(1, len(q) + 1)]
+
+
+def main(n=10_000):
+    markets = make_markets(n); symbols = [m[0] for m in markets]; keys = keystrokes()
+    start = time.perf_counter(); index = SymbolIndex(markets); build = time.perf_counter() - start
+    cache = json.dumps(index.to_dict(), separators=(",", ":"))
+    start = time.perf_counter(); SymbolIndex.from_dict(json.loads(cache)); load = time.perf_counter() - start
+    print(f"{n:,} symbols: index build {build * 1000:.1f} ms, cache load {load * 1000:.1f} ms ({len(cache) / 1024:,.0f} KiB)")
+    start = time.perf_counter()
+    for k in keys: old_search(symbols, TRACKED, k)
+    old = (time.perf_counter() - start) / len(keys)
+    start = time.perf_counter()
+    for k in keys: index.search(k, exclude=TRACKED)
+    new = (time.perf_counter() - start) / len(keys)
+    print(f"{'linear scan':<28}{old * 1000:>8.2f} ms/keystroke")
+    print(f"{'SymbolIndex.search':<28}{new * 1000:>8.2f} ms/keystroke  x{old / new:.1f}")
+    start = time.perf_counter()
+    for k in keys: index.search(k, quote="USDT", exclude=TRACKED)
+    print(f"{'  limited to USDT':<28}{(time.perf_counter() - start) / len(keys) * 1000:>8.2f} ms/keystroke")
+    for q in QUERIES: print(f"  {q!r}: {len(index.search(q))} matches, first {index.search(q, limit=3)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
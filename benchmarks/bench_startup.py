@@ -0,0 +1,56 @@
+"""Startup benchmark: import cost of the GUI module and time to the first painted window.
+
+Each measurement runs in a fresh interpreter so module caches do not carry over.
+The window is only timed when a display is available (e.g. under xvfb-run);
+otherwise the import breakdown is reported on its own.
+Run from the repository root: python benchmarks/bench_startup.py [runs]
+"""
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIRST_WINDOW = """
+import os, time
+t0 = time.perf_counter()
+import tkinter as tk
+import crypto
+t1 = time.perf_counter()
+root = tk.Tk(); app = crypto.EliteCryptoDashboard(root); root.update()
+print(t1 - t0, time.perf_counter() - t0, flush=True)
+os._exit(0)  # Skip on_closing, which would save settings
+"""
+
+
+def import_profile():
+    """Returns (total_us, [(cumulative_us, module)]) for `import crypto` and the modules it imports directly."""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import crypto"], cwd=ROOT, capture_output=True, text=True).stderr
+    total, children = 0, []
+    for line in err.splitlines():
+        m = re.match(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)", line)
+        if not m: continue
+        if m.group(3) == "crypto" and not m.group(2): total = int(m.group(1))
+        elif len(m.group(2)) == 2: children.append((int(m.group(1)), m.group(3)))
+    return total, sorted(children, reverse=True)
+
+
+def has_display():
+    return sys.platform in ("win32", "darwin") or bool(os.environ.get("DISPLAY"))
+
+
+def main(runs=5):
+    totals = []
+    for _ in range(runs): total, rows = import_profile(); totals.append(total)
+    print(f"import crypto: median {sorted(totals)[len(totals) // 2] / 1000:.1f} ms over {runs} runs")
+    for us, name in rows[:8]: print(f"  {us / 1000:8.1f} ms  {name}")
+    if not has_display(): print("No display: skipping the first-window measurement (try xvfb-run)"); return
+    imports, windows = [], []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", FIRST_WINDOW], cwd=ROOT, capture_output=True, text=True).stdout.split()
+        imports.append(float(out[0])); windows.append(float(out[1]))
+    print(f"first window: median {sorted(windows)[runs // 2] * 1000:.1f} ms (imports {sorted(imports)[runs // 2] * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,59 @@
+"""Bandwidth and parse time per minute for 24h stats: the old full-market REST poll versus miniTicker streams.
+
+Before: /api/v3/ticker/24hr without a symbol filter every 30 s, parsed and copied
+into a dict keyed by symbol. After: one miniTicker frame per second per tracked
+symbol decoded by KlineDecoder (the REST snapshot at startup/reconnect is a
+one-off and not counted). Payloads are synthetic but shaped like Binance's.
+Run from the repository root: python benchmarks/bench_ticker.py [market_symbols]
+"""
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import decode
+from decode import KlineDecoder
+
+POLLS_PER_MINUTE = 2
+FRAMES_PER_MINUTE = 60  # Binance pushes miniTicker updates once per second
+TRACKED_COUNTS = (2, 10, 100)
+
+
+def rest_entry(rng, symbol, now):
+    p = rng.uniform(0.0001, 60000); f = lambda x: f"{x:.8f}"
+    return {"symbol": symbol, "priceChange": f(p * 0.01), "priceChangePercent": "1.000", "weightedAvgPrice": f(p), "prevClosePrice": f(p * 0.99),
+            "lastPrice": f(p), "lastQty": f(rng.uniform(0, 10)), "bidPrice": f(p * 0.9999), "bidQty": f(rng.uniform(0, 10)), "askPrice": f(p * 1.0001),
+            "askQty": f(rng.uniform(0, 10)), "openPrice": f(p * 0.99), "highPrice": f(p * 1.02), "lowPrice": f(p * 0.98), "volume": f(rng.uniform(0, 1e6)),
+            "quoteVolume": f(rng.uniform(0, 1e8)), "openTime": now - 86_400_000, "closeTime": now, "firstId": 1, "lastId": 100000, "count": 100000}
+
+
+def mini_frame(rng, symbol, now):
+    p = rng.uniform(0.0001, 60000); f = lambda x: f"{x:.8f}"
+    data = {"e": "24hrMiniTicker", "E": now, "s": symbol, "c": f(p), "o": f(p * 0.99), "h": f(p * 1.02), "l": f(p * 0.98),
+            "v": f(rng.uniform(0, 1e6)), "q": f(rng.uniform(0, 1e8))}
+    return json.dumps({"stream": f"{symbol.lower()}@miniTicker", "data": data}, separators=(",", ":"))
+
+
+def main(market=2600):
+    rng = random.Random(3); now = int(time.time() * 1000); symbols = [f"COIN{i}USDT" for i in range(market)]
+    body = json.dumps([rest_entry(rng, s, now) for s in symbols], separators=(",", ":"))
+    start = time.perf_counter()
+    for _ in range(POLLS_PER_MINUTE):
+        stats = {}
+        for ticker in json.loads(body): stats[ticker["symbol"]] = ticker
+    before_ms = (time.perf_counter() - start) * 1000
+    print(f"JSON backend: {'orjson' if decode.orjson else 'json'}; market of {market:,} symbols")
+    print(f"{'before (full-market poll)':<30}{POLLS_PER_MINUTE * len(body) / 1024:>10,.0f} KiB/min{before_ms:>10.1f} ms/min parse")
+    for n in TRACKED_COUNTS:
+        tracked = symbols[:n]; frames = [mini_frame(rng, s, now) for s in tracked for _ in range(FRAMES_PER_MINUTE)]
+        decoder = KlineDecoder(s.lower() for s in tracked)
+        start = time.perf_counter()
+        for raw in frames: decoder.decode(raw)
+        after_ms = (time.perf_counter() - start) * 1000
+        print(f"{f'after ({n} tracked, miniTicker)':<30}{sum(map(len, frames)) / 1024:>10,.0f} KiB/min{after_ms:>10.1f} ms/min parse")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2600)
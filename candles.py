@@ -0,0 +1,148 @@
+"""Multi-timeframe candles for every tracked symbol, resampled from the 1m kline stream.
+
+Each 1m tick updates the forming candle of every interval at once. Buckets are
+aligned like Binance's (open times are multiples of the interval since the
+epoch, UTC). A 1m tick carries its minute's running volume, so an interval's
+volume is the closed minutes of its bucket plus the current minute. Closed
+candles go into one flat array('d') ring per symbol and interval, 48 bytes per
+candle and only allocated as candles arrive, so hundreds of symbols x six
+intervals stay a few MB.
+
+A series is only served (`rows()`) once it is complete: seeded with REST
+history, then extended live without a missing minute. A bucket joined halfway,
+or a gap while a shard was down, makes it partial again until it is reseeded,
+so a chart never shows a candle built from part of its minutes. Switching
+symbol or interval on a complete series is then a memory lookup.
+
+A forming REST row counts an unknown part of the current minute, so seeding
+mid-bucket takes the bucket's volume from its 1m rows instead: closed minutes
+are exact, and the current minute's running volume is absolute, so the REST
+and stream values are simply the older and newer reading of it.
+"""
+from array import array
+import time
+
+FIELDS = 6  # open_time, open, high, low, close, volume
+_MINUTE_MS = 60_000
+
+
+class _Series:
+    """One interval of one symbol: closed candles in a flat ring, plus the forming candle as a list."""
+    __slots__ = ("ms", "closed", "head", "forming", "base", "complete", "skew")
+
+    def __init__(self, ms):
+        self.ms = ms; self.closed = array('d'); self.head = 0
+        self.forming = None  # [open_time, o, h, l, c, v]
+        self.base = 0.0  # Volume of the bucket's minutes before the current one
+        self.complete = False; self.skew = None  # skew: the seed's current minute; earlier stream minutes are already in base
+
+    def push(self, row, capacity):
+        if len(self.closed) < capacity * FIELDS: self.closed.extend(row); return
+        i = self.head * FIELDS; self.closed[i:i + FIELDS] = array('d', row); self.head = (self.head + 1) % capacity
+
+    def closed_rows(self):
+        i = self.head * FIELDS; data = self.closed[i:] + self.closed[:i]
+        return [data[j:j + FIELDS] for j in range(0, len(data), FIELDS)]
+
+    def row(self, values):
+        t = int(values[0]); return (t, *values[1:FIELDS], t + self.ms - 1)
+
+
+class _Symbol:
+    __slots__ = ("series", "minute_time", "minute_volume")
+
+    def __init__(self, intervals):
+        self.series = {name: _Series(ms) for name, ms in intervals.items()}; self.minute_time = None; self.minute_volume = 0.0
+
+
+class CandleAggregator:
+    def __init__(self, intervals, capacity):
+        """`intervals` maps names to lengths in ms (e.g. core.INTERVAL_MS); `capacity` candles are kept per series."""
+        self.intervals = {name: ms for name, ms in intervals.items() if ms % _MINUTE_MS == 0}
+        self.capacity = capacity; self.symbols = {}
+
+    def __contains__(self, symbol): return symbol.upper() in self.symbols
+
+    def discard(self, symbol): self.symbols.pop(symbol.upper(), None)
+
+    def add(self, rec):
+        """Folds one 1m KlineRecord into every interval of its symbol."""
+        sym = self.symbols.get(rec.symbol)
+        if sym is None: sym = self.symbols[rec.symbol] = _Symbol(self.intervals)
+        t, last = rec.open_time, sym.minute_time
+        if last is not None and t < last: return  # Late frame for a minute already passed
+        new_minute = last is not None and t != last; gap = new_minute and t - last > _MINUTE_MS
+        for s in sym.series.values():
+            bucket = t - t % s.ms; f = s.forming
+            if f is None or bucket > f[0]:
+                if f is not None: s.push(f, self.capacity)
+                prev = f[0] if f is not None else s.closed[(s.head - 1) * FIELDS] if s.closed else None
+                # A bucket first seen after its opening minute is missing volume and maybe its open, high or low
+                if gap or bucket != t or (prev is not None and bucket != prev + s.ms): s.complete = False
+                s.forming = [bucket, rec.open, rec.high, rec.low, rec.close, rec.volume]; s.base = 0.0; s.skew = None
+                continue
+            if bucket < f[0] or (s.skew is not None and t < s.skew): continue  # The seed's 1m rows already hold that minute
+            if s.skew == t: s.skew = None
+            elif new_minute:
+                s.base += sym.minute_volume
+                if gap: s.complete = False
+            if rec.high > f[2]: f[2] = rec.high
+            if rec.low < f[3]: f[3] = rec.low
+            f[4] = rec.close; f[5] = s.base + rec.volume
+        sym.minute_time, sym.minute_volume = t, rec.volume
+
+    def seed(self, symbol, interval, rows, minutes=None, now=None):
+        """Loads REST/store history, (open_time, o, h, l, c, v, close_time) rows oldest first, as the series' complete past.
+
+        A still-forming last row is rebuilt from `minutes`, the 1m rows of its bucket up to the current minute, and
+        merged with what the stream has already built of that bucket. Without them (or when the stream is already
+        past their last minute) the series stays partial.
+        """
+        symbol = symbol.upper(); ms = self.intervals.get(interval)
+        if ms is None or not rows: return
+        sym = self.symbols.get(symbol)
+        if sym is None: sym = self.symbols[symbol] = _Symbol(self.intervals)
+        s = sym.series[interval]; now = int(time.time() * 1000) if now is None else now
+        forming = rows[-1] if rows[-1][6] >= now else None; closed = rows[:-1] if forming else rows
+        live = s.forming
+        if live is not None and live[0] > rows[-1][0]: return  # The stream is already past this response; the next view refetches
+        s.closed = array('d'); s.head = 0
+        for row in closed[-self.capacity:]: s.push(row[:FIELDS], self.capacity)
+        if forming is None:
+            # Store rows served after a failed fetch end before the previous bucket: the gap keeps the series partial
+            s.forming = None; s.base = 0.0; s.skew = None; s.complete = closed[-1][0] >= now - now % ms - ms; return
+        minutes = [forming] if ms == _MINUTE_MS else [m for m in minutes or () if m[0] >= forming[0]]
+        current = minutes[-1][0] if minutes else None; streamed = sym.minute_time
+        o, h, l, c, v = forming[1:FIELDS]; base = 0.0
+        exact = bool(minutes) and minutes[0][0] == forming[0] and (streamed is None or streamed <= current)
+        if exact:
+            base = sum(m[5] for m in minutes[:-1]); v = minutes[-1][5]; c = minutes[-1][4]
+            h, l = max(h, *(m[2] for m in minutes)), min(l, *(m[3] for m in minutes))
+            if streamed == current: v = max(v, sym.minute_volume)  # Two readings of one running volume: the larger is newer
+        if live is not None and live[0] == forming[0]:
+            h, l = max(h, live[2]), min(l, live[3])
+            if streamed is not None and (current is None or streamed >= current): c = live[4]
+        s.base = base; s.skew = current if exact and streamed != current else None
+        s.forming = [forming[0], o, h, l, c, base + v]; s.complete = exact
+
+    def is_complete(self, symbol, interval):
+        sym = self.symbols.get(symbol.upper()); s = sym.series.get(interval) if sym else None
+        return s is not None and s.complete
+
+    def rows(self, symbol, interval, limit=None):
+        """The series as (open_time, o, h, l, c, v, close_time) rows oldest first, forming candle last; None unless complete."""
+        sym = self.symbols.get(symbol.upper()); s = sym.series.get(interval) if sym else None
+        if s is None or not s.complete: return None
+        rows = [s.row(r) for r in s.closed_rows()] + ([s.row(s.forming)] if s.forming else [])
+        return rows[-limit:] if limit else rows
+
+    def tail(self, symbol, interval):
+        """(last closed row, forming row) of a series, either None when absent; served even for partial series."""
+        sym = self.symbols.get(symbol.upper()); s = sym.series.get(interval) if sym else None
+        if s is None: return None, None
+        closed = s.row(s.closed[-FIELDS:] if s.head == 0 else s.closed[(s.head - 1) * FIELDS:s.head * FIELDS]) if s.closed else None
+        return closed, s.row(s.forming) if s.forming else None
+
+    def memory_bytes(self):
+        """Approximate bytes held in candle storage (closed rings and forming rows)."""
+        return sum(s.closed.buffer_info()[1] * s.closed.itemsize + (FIELDS * 8 if s.forming else 0) for sym in self.symbols.values() for s in sym.series.values())
@@ -0,0 +1,226 @@
+"""GUI-free core shared by the Tk dashboard and the headless collector.
+
+Nothing here imports tkinter, matplotlib or PIL: settings, the Binance REST and
+websocket layer, and the queue drain that batches updates for a consumer.
+"""
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+import requests
+
+from candles import CandleAggregator
+from decode import KlineDecoder, TickerRecord
+from kline_store import KlineStore
+from metrics import METRICS
+from rest_client import RestClient
+from streams import StreamManager
+from symbol_index import SymbolIndex
+
+CONFIG_FILE = "config.json"
+MAX_CHART_POINTS = 100
+MAX_DRAIN_BATCH = 5000  # Upper bound on queue items handled per drain
+REST_BASE_URL = os.environ.get("BINANCE_REST_URL", "https://api.binance.com")  # Overridable to point at a replay server
+KLINES_PAGE_LIMIT = 1000  # Binance's maximum candles per /klines request
+MAX_BACKFILL_PAGES = 20  # Gaps wider than this are not stitched; a fresh run is started instead
+HISTORY_DEPTHS = (MAX_CHART_POINTS, 1_000, 10_000)  # Candles the Live Chart can show; deeper than MAX_CHART_POINTS is backfilled into the store first
+TICKER_SYMBOLS_PER_REQUEST = 100  # Binance charges the full-market weight above 100 symbols per /ticker/24hr call
+SYMBOLS_CACHE_FILE = "symbols_cache.json"
+SYMBOLS_CACHE_TTL = 6 * 3600  # Seconds before cached exchange metadata is refreshed in the background
+INTERVAL_MS = {"1m": 60_000, "5m": 300_000, "15m": 900_000, "1h": 3_600_000, "4h": 14_400_000, "1d": 86_400_000}
+
+
+class SettingsManager:
+    """Small user settings in a JSON file; transactions live in the ledger (see ledger.py)."""
+    def __init__(self, fp, log_cb=None):
+        """`log_cb` receives problems with the file; by default they go to stderr, never into a consumer's stdout."""
+        self.fp = fp; self.log_cb = log_cb or (lambda msg: print(msg, file=sys.stderr)); self.config = self.load()
+    def load(self):
+        try:
+            with open(self.fp, 'r') as f: return json.load(f)
+        except FileNotFoundError: pass
+        except ValueError as e:
+            # Keep the unreadable file for recovery instead of overwriting it with defaults on the next save
+            backup = f"{self.fp}.corrupt-{int(time.time())}"
+            try: os.replace(self.fp, backup)
+            except OSError as err: self.log_cb(f"Settings file {self.fp} is unreadable ({e}) and could not be moved aside ({err}); started with defaults, which the next save writes over it.")
+            else: self.log_cb(f"Settings file {self.fp} is unreadable ({e}); moved it to {backup} and started with defaults.")
+        return {"tracked_pairs": ["btcusdt", "ethusdt"]}
+    def save(self):
+        """Writes the settings atomically: a crash mid-save leaves the previous file intact."""
+        tmp = self.fp + ".tmp"
+        with open(tmp, 'w') as f: json.dump(self.config, f, indent=4); f.flush(); os.fsync(f.fileno())
+        os.replace(tmp, self.fp)
+    def get(self, k): return self.config.get(k, [])
+    def set(self, k, v): self.config[k] = v
+
+
+class BinanceAPI:
+    def __init__(self, data_cb, log_cb, status_cb, tracked, store=None, alerts=None):
+        self.store = store if store is not None else KlineStore(":memory:"); self.alerts = alerts  # An AlertEngine checked on every kline
+        self.data_cb, self.log_cb, self.status_cb = data_cb, log_cb, status_cb
+        self.is_running = threading.Event()
+        self.queue = queue.Queue(); self.rest = RestClient(REST_BASE_URL)
+        self.tracked_pairs = set(p.lower() for p in tracked); self.decoder = KlineDecoder(self.tracked_pairs)
+        self.candles = CandleAggregator(INTERVAL_MS, MAX_CHART_POINTS)  # Every interval of every tracked symbol, from the 1m stream
+        self.streams = StreamManager(self._on_message, log_cb, status_cb, on_open=self._on_streams_open); self.streams.set_streams(self._stream_names())
+        self.drain_stats = {"queue_depth": 0, "max_queue_depth": 0, "drained": 0, "coalesced": 0, "drain_ms": 0.0, "max_drain_ms": 0.0}
+        self._instrument()
+    def _instrument(self):
+        # Timed only while METRICS is enabled; "receive" spans decode, alerts, store and enqueue for one frame
+        METRICS.register(self.streams, on_message="receive"); METRICS.register(self.decoder, decode="decode"); METRICS.register(self.queue, put="enqueue")
+        METRICS.register(self, process_queue="drain", data_cb="consume"); METRICS.register(self.rest, get="rest"); METRICS.register(self.store, add="store")
+        if self.alerts is not None: METRICS.register(self.alerts, check="alerts")
+        METRICS.add_collector("drain", lambda: dict(self.drain_stats, queue_depth=self.queue.qsize()))
+        METRICS.add_collector("decoder", lambda: self.decoder.stats); METRICS.add_collector("rest", lambda: self.rest.stats)
+        METRICS.add_collector("streams", lambda: {"shards": len(self.streams.shards), "connected": self.streams.connected_count()})
+    def connect(self):
+        if self.is_running.is_set(): return
+        self.is_running.set(); self.status_cb("Connecting..."); self.streams.start()
+    def disconnect(self):
+        if not self.is_running.is_set(): return
+        self.is_running.clear(); self.streams.stop()
+    def close(self):
+        self.disconnect(); self.rest.close()
+        METRICS.unregister(self, self.streams, self.decoder, self.queue, self.rest, self.store, self.alerts)
+    def process_queue(self):
+        """Drains everything pending, coalescing klines and tickers to the newest per symbol while keeping closed candles.
+
+        Candle history and ticks also go into `candles` here, on the consumer's thread, before the consumer sees them.
+        """
+        start = time.perf_counter(); depth = self.queue.qsize()
+        klines, tickers, others, drained = {}, {}, [], 0
+        while drained < MAX_DRAIN_BATCH:
+            try: type, data = self.queue.get_nowait()
+            except queue.Empty: break
+            drained += 1
+            if type == "ticker": tickers[data.symbol] = data; continue
+            if type != "kline": others.append((type, data)); continue
+            pending = klines.setdefault(data.symbol, [])
+            if pending and not pending[-1].closed: pending[-1] = data  # Forming candle superseded by a newer tick
+            else: pending.append(data)
+        batch = [msg for msgs in klines.values() for msg in msgs]
+        for item in others:
+            if item[0] == "history": self.candles.seed(*item[1])
+            self.data_cb(*item)
+        for rec in batch: self.candles.add(rec)
+        if tickers: self.data_cb("tickers", list(tickers.values()))
+        if batch: self.data_cb("klines", batch)
+        elapsed = (time.perf_counter() - start) * 1000; st = self.drain_stats
+        st["queue_depth"] = depth; st["max_queue_depth"] = max(st["max_queue_depth"], depth)
+        st["drained"] += drained; st["coalesced"] += drained - len(others) - len(tickers) - len(batch)
+        st["drain_ms"] = elapsed; st["max_drain_ms"] = max(st["max_drain_ms"], elapsed)
+    def _stream_names(self): return [name for p in self.tracked_pairs for name in (f"{p}@kline_1m", f"{p}@miniTicker")]
+    def _on_message(self, raw):
+        rec = self.decoder.decode(raw)  # None for other frames and symbols no longer tracked
+        if rec is None: return
+        if isinstance(rec, TickerRecord): self.queue.put(("ticker", rec)); return
+        if rec.closed: self.store.add(rec.symbol, rec.interval, [rec.row()])
+        if self.alerts is not None: self.alerts.check(rec)  # Before coalescing, so no tick is skipped
+        self.queue.put(("kline", rec))
+    def _on_streams_open(self, streams):
+        # Tickers missed while a shard was down are re-read once; the stream keeps them current afterwards
+        self.request_24h_stats(s.split('@')[0] for s in streams if s.endswith("@miniTicker"))
+    def update_tracked_pairs(self, new_pairs_list):
+        new_tracked = set(p.lower() for p in new_pairs_list)
+        added, removed = new_tracked - self.tracked_pairs, self.tracked_pairs - new_tracked
+        self.tracked_pairs = new_tracked; self.decoder.set_symbols(new_tracked); self.streams.set_streams(self._stream_names())
+        if added: self.log_cb(f"Subscribed to: {', '.join(sorted(added))}"); self.request_24h_stats(added)
+        if removed:
+            self.log_cb(f"Unsubscribed from: {', '.join(sorted(removed))}")
+            for p in removed: self.candles.discard(p)
+    def _submit_to_queue(self, key, type, fn, *args):
+        """Runs fn(*args) on the REST pool and posts the result to the UI queue; identical in-flight keys are merged."""
+        def run():
+            try: self.queue.put((type, fn(*args)))
+            except Exception as e: self.log_cb(f"Error in {type} request: {e!r}"); raise  # Nothing reads the future, so say it here
+        self.rest.submit(key, run)
+    def start_initial_fetch(self): self.request_24h_stats(self.tracked_pairs)
+    def request_24h_stats(self, pairs):
+        """Fetches a 24h ticker snapshot for `pairs` only; the miniTicker streams keep it current from then on."""
+        symbols = sorted(p.upper() for p in pairs)
+        for i in range(0, len(symbols), TICKER_SYMBOLS_PER_REQUEST):
+            chunk = tuple(symbols[i:i + TICKER_SYMBOLS_PER_REQUEST])
+            self.rest.submit(("24h_stats", chunk), self._fetch_24h_stats, chunk)
+    def _fetch_24h_stats(self, symbols):
+        try: stats = self.rest.get("/api/v3/ticker/24hr", {"symbols": json.dumps(symbols, separators=(',', ':'))})
+        except requests.RequestException as e: self.log_cb(f"Error fetching 24h stats: {e}"); return
+        self.queue.put(("tickers", [TickerRecord.from_rest(d) for d in stats]))
+    def get_symbol_index(self):
+        """Indexes every trading pair (all quote assets) from exchangeInfo and caches the index on disk; None on failure."""
+        try:
+            markets = [(s['symbol'], s['baseAsset'], s['quoteAsset']) for s in self.rest.get("/api/v3/exchangeInfo")['symbols'] if s['status'] == 'TRADING']
+        except requests.RequestException as e: self.log_cb(f"Error fetching symbols: {e}"); return None
+        index = SymbolIndex(markets)
+        try:
+            with open(SYMBOLS_CACHE_FILE + ".tmp", 'w') as f: json.dump({"fetched_at": time.time(), **index.to_dict()}, f, separators=(',', ':'))
+            os.replace(SYMBOLS_CACHE_FILE + ".tmp", SYMBOLS_CACHE_FILE)
+        except OSError as e: self.log_cb(f"Error caching symbols: {e}")
+        return index
+    def load_cached_index(self):
+        """Returns (index, fresh) from the on-disk cache, or (None, False) when there is none."""
+        try:
+            with open(SYMBOLS_CACHE_FILE, 'r') as f: cache = json.load(f)
+            return SymbolIndex.from_dict(cache), time.time() - cache['fetched_at'] < SYMBOLS_CACHE_TTL
+        except (OSError, ValueError, KeyError): return None, False
+    def request_symbol_index(self): self._submit_to_queue(("symbols",), "symbols", self.get_symbol_index)
+    def _get_klines(self, symbol, interval, **params):
+        rows = self.rest.get("/api/v3/klines", {"symbol": symbol.upper(), "interval": interval, **params})
+        return [(int(r[0]), float(r[1]), float(r[2]), float(r[3]), float(r[4]), float(r[5]), int(r[6])) for r in rows]
+    def _sync_klines(self, symbol, interval, limit):
+        """Fetches only candles newer than the last stored one; returns (forming candle rows, earliest open time to show)."""
+        last, since = self.store.last_open_time(symbol, interval), None
+        if last is None: rows = self._get_klines(symbol, interval, limit=min(limit, KLINES_PAGE_LIMIT))
+        else:
+            rows, start = [], last
+            for _ in range(MAX_BACKFILL_PAGES):
+                page = self._get_klines(symbol, interval, startTime=start, limit=KLINES_PAGE_LIMIT); rows += page
+                if len(page) < KLINES_PAGE_LIMIT: break
+                start = page[-1][0] + 1
+            else:
+                self.store.add(symbol, interval, rows)
+                rows = self._get_klines(symbol, interval, limit=min(limit, KLINES_PAGE_LIMIT)); since = rows[0][0] if rows else None
+        now = int(time.time() * 1000)
+        self.store.add(symbol, interval, [r for r in rows if r[6] < now])
+        return [r for r in rows if r[6] >= now][-1:], since
+    def _bucket_minutes(self, symbol, start):
+        """The 1m rows from `start` (a forming candle's open time) to the current minute."""
+        minutes = []
+        while True:
+            page = self._get_klines(symbol, "1m", startTime=start, limit=KLINES_PAGE_LIMIT); minutes += page
+            if len(page) < KLINES_PAGE_LIMIT: return minutes
+            start = page[-1][0] + 1
+    def _history(self, symbol, interval, limit=MAX_CHART_POINTS):
+        """(rows as get_historical_klines, 1m rows of the forming candle's bucket or None) for seeding `candles`."""
+        forming, since, minutes = [], None, None
+        try:
+            forming, since = self._sync_klines(symbol, interval, limit)
+            if forming and INTERVAL_MS.get(interval, 0) > 60_000: minutes = self._bucket_minutes(symbol, forming[0][0])
+        except requests.RequestException as e: self.log_cb(f"Error fetching klines for {symbol}: {e}")
+        return self.store.load(symbol, interval, limit - len(forming), since) + forming, minutes
+    def get_historical_klines(self, symbol, interval, limit=MAX_CHART_POINTS):
+        """Returns up to `limit` (open_time, o, h, l, c, v, close_time) rows, oldest first, served from the local store."""
+        return self._history(symbol, interval, limit)[0]
+    def request_historical_klines(self, symbol, interval, depth=MAX_CHART_POINTS):
+        """Posts ("history", (symbol, interval, rows, minutes)); beyond MAX_CHART_POINTS the store is backfilled to `depth` first."""
+        symbol = symbol.upper()
+        def fetch():
+            if depth > MAX_CHART_POINTS: self.backfill_klines(symbol, interval, depth)
+            return (symbol, interval, *self._history(symbol, interval, depth))
+        self._submit_to_queue(("history", symbol, interval, depth), "history", fetch)
+    def backfill_klines(self, symbol, interval, total):
+        """Extends stored history backwards until `total` closed candles are on disk (e.g. for 10k+ candle views)."""
+        try:
+            count = self.store.count(symbol, interval)
+            while count < total:
+                first = self.store.first_open_time(symbol, interval)
+                page = self._get_klines(symbol, interval, limit=KLINES_PAGE_LIMIT, **({"endTime": first - 1} if first else {}))
+                now = int(time.time() * 1000); closed = [r for r in page if r[6] < now]
+                if not closed: break
+                self.store.add(symbol, interval, closed)
+                prev, count = count, self.store.count(symbol, interval)
+                if count == prev: break
+        except requests.RequestException as e: self.log_cb(f"Error backfilling klines for {symbol}: {e}")
@@ -1,28 +1,30 @@
+import sys
+
+if __name__ == "__main__" and "--headless" in sys.argv:
+    # Run the collector before any GUI library is imported
+    from headless import main
+    sys.exit(main(sys.argv[1:]))
+
 import tkinter as tk
-from tkinter import ttk, font, messagebox
-import json
+from tkinter import ttk, font, messagebox, filedialog
+import math
 import os
-import queue
 import threading
 import time
-from collections import deque, defaultdict
+from collections import deque
 from datetime import datetime
 
-# --- Required 3rd-party libraries ---
-import requests
-from plyer import notification
-import matplotlib
-matplotlib.use("TkAgg")
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.gridspec import GridSpec
-import mplfinance as mpf
-import pandas as pd
-from PIL import Image, ImageDraw, ImageTk
-import websocket
+# Heavy 3rd-party libraries (matplotlib/numpy via live_chart and indicators) are imported on first use
+from alerts import AlertEngine, AlertNotifier
+from core import BinanceAPI, SettingsManager, CONFIG_FILE, HISTORY_DEPTHS, INTERVAL_MS, MAX_CHART_POINTS
+from kline_store import KlineStore, KLINE_DB_FILE
+from ledger import Ledger, LEDGER_DB_FILE
+from metrics import METRICS, SamplingProfiler
+from portfolio import PortfolioEngine
+from symbol_index import SymbolIndex
+from tree_render import TreeRenderer
 
 # --- Configuration & Theme ---
-CONFIG_FILE = "config.json"
-MAX_CHART_POINTS = 100
 
 # --- Theme Dictionaries ---
 THEME_DARK = {
@@ -33,13 +35,18 @@ THEME_DARK = {
 FONT_UI = ("Segoe UI", 10)
 FONT_UI_BOLD = ("Segoe UI", 10, "bold")
 FONT_TITLE = ("Segoe UI", 11, "bold")
+SEARCH_DEBOUNCE_MS = 120  # Keystrokes closer together than this trigger a single search
+HISTORY_RETRY_S, HISTORY_RETRY_MAX_S = 2.0, 60.0  # Reloads of a partial chart series back off while they keep failing
 
 # --- Helper function to create rounded images for buttons ---
 def create_rounded_image(width, height, radius, color):
-    image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(image)
-    draw.rounded_rectangle((0, 0, width - 1, height - 1), radius, fill=color)
-    return ImageTk.PhotoImage(image)
+    # Filled one row at a time by Tk itself (a new PhotoImage is transparent), so no imaging library loads before the first window
+    image = tk.PhotoImage(width=width, height=height)
+    for y in range(height):
+        edge = min(y, height - 1 - y)
+        inset = max(0, math.ceil(radius - math.sqrt((radius + 0.5) ** 2 - (radius - edge) ** 2))) if edge < radius else 0
+        image.put(color, to=(inset, y, width - inset, y + 1))
+    return image
 
 # --- Custom Widget with Placeholder Text ---
 class PlaceholderEntry(ttk.Entry):
@@ -61,16 +68,18 @@ class EliteCryptoDashboard:
     def __init__(self, root):
         self.root = root; self.current_theme = THEME_DARK
         self._setup_main_window()
-        self.settings = self.SettingsManager(CONFIG_FILE)
-        self.api = self.BinanceAPI(self.data_callback, self.log_callback, self.status_callback, list(self.settings.get("tracked_pairs")))
-        self.last_prices = {}; self.stats_24h = defaultdict(dict)
+        self.settings = SettingsManager(CONFIG_FILE, self.log_callback); METRICS.configure_from_env(self.log_callback)
+        self.ledger = Ledger(LEDGER_DB_FILE); self.ledger.migrate_config(self.settings)
+        self.alert_notifier = AlertNotifier(self.log_callback)
+        self.alerts = AlertEngine(self.settings.get("alerts"), on_fire=self._on_alerts)
+        self.api = BinanceAPI(self.data_callback, self.log_callback, self.status_callback, list(self.settings.get("tracked_pairs")), KlineStore(KLINE_DB_FILE), self.alerts)
+        self.last_prices = {}; self.stats_24h = {}
         self.selected_chart_coin = self.settings.get("tracked_pairs")[0].upper() if self.settings.get("tracked_pairs") else "BTCUSDT"
         self.selected_chart_interval = "5m"
         self._configure_styles(); self._create_layout()
         self.is_running = threading.Event(); self.is_running.set()
         self.root.after(100, self.process_ui_queue)
         self.api.start_initial_fetch()
-        self.api.start_24h_stats_updater()
 
     def _setup_main_window(self):
         self.root.overrideredirect(True); self.root.geometry("1400x850"); self.root.minsize(1200, 700)
@@ -143,25 +152,42 @@ class EliteCryptoDashboard:
         self.portfolio_tab = self.PortfolioTab(self.notebook, self)
         self.chart_tab = self.ChartingTab(self.notebook, self)
         self.markets_tab = self.MarketsTab(self.notebook, self)
+        self.alerts_tab = self.AlertsTab(self.notebook, self)
+        self.diagnostics_tab = self.DiagnosticsTab(self.notebook, self)
+        METRICS.register(self.dashboard_tab.renderer, render="tab.dashboard"); METRICS.add_collector("dashboard", lambda: self.dashboard_tab.renderer.stats)
+        METRICS.register(self.portfolio_tab, update_portfolio_values="tab.portfolio")
+        METRICS.register(self.chart_tab, append_live_data="tab.chart", on_history="tab.chart_history")
+        METRICS.register(self.markets_tab, populate_symbols="tab.markets"); METRICS.register(self.alerts_tab, on_fired="tab.alerts")
 
     def process_ui_queue(self):
         if not self.is_running.is_set(): return
         try: self.api.process_queue()
-        except queue.Empty: pass
         finally: self.root.after(100, self.process_ui_queue)
     def data_callback(self, type, data):
-        if type == "kline":
-            self.last_prices[data["s"]] = float(data["k"]["c"])
-            self.dashboard_tab.update_dashboard(data["s"])
-            self.portfolio_tab.update_portfolio_values()
-            self.chart_tab.append_live_data(data)
-        elif type == "24h_stats":
-            for ticker in data: self.stats_24h[ticker['symbol']] = ticker
-            self.dashboard_tab.populate_initial_data()
+        if type == "klines":
+            # One batched update per drain: newest price per symbol, every closed candle kept in order
+            for rec in data: self.last_prices[rec.symbol] = rec.close
+            for symbol in dict.fromkeys(rec.symbol for rec in data): self.dashboard_tab.update_dashboard(symbol)
+            self.portfolio_tab.update_portfolio_values({rec.symbol for rec in data})
+            for rec in data: self.chart_tab.append_live_data(rec)
+        elif type == "history": self.chart_tab.on_history(*data)
+        elif type == "symbols": self.markets_tab.populate_symbols(data)
+        elif type == "alerts": self.alerts_tab.on_fired(data)
+        elif type == "tickers":
+            # Only rows whose 24h stats actually moved are redrawn; stale REST snapshots never overwrite streamed values
+            for rec in data:
+                old = self.stats_24h.get(rec.symbol)
+                if old is not None and (rec.time < old.time or rec.values() == old.values()): continue
+                self.stats_24h[rec.symbol] = rec; self.dashboard_tab.update_dashboard(rec.symbol)
     def log_callback(self, msg): print(msg)
     def status_callback(self, status): self.connection_status_var.set(f"Status: {status}")
+    def _on_alerts(self, events):
+        # Called on the websocket thread: notifications go straight to the notifier, the table update through the UI queue
+        self.alert_notifier.submit(events); self.api.queue.put(("alerts", events))
     def on_closing(self):
-        self.is_running.clear(); self.settings.save(); self.api.disconnect()
+        self.is_running.clear(); self.settings.set("alerts", self.alerts.alerts); self.settings.save()
+        self.api.close(); self.ledger.close(); self.alert_notifier.stop(); METRICS.stop_dump()
+        METRICS.unregister(self.dashboard_tab.renderer, self.portfolio_tab, self.chart_tab, self.markets_tab, self.alerts_tab)
         time.sleep(0.1); self.root.destroy()
     def add_coin_to_tracker(self, symbol):
         symbol = symbol.lower()
@@ -182,85 +208,6 @@ class EliteCryptoDashboard:
             self.dashboard_tab.remove_coin(symbol.upper())
             self.log_callback(f"Removed {symbol.upper()} from tracker.")
 
-    class SettingsManager:
-        def __init__(self, fp): self.fp = fp; self.config = self.load()
-        def load(self):
-            try:
-                with open(self.fp, 'r') as f: return json.load(f)
-            except: return {"tracked_pairs": ["btcusdt", "ethusdt"], "transactions": []}
-        def save(self):
-            with open(self.fp, 'w') as f: json.dump(self.config, f, indent=4)
-        def get(self, k): return self.config.get(k, [])
-        def set(self, k, v): self.config[k] = v
-
-    class BinanceAPI:
-        def __init__(self, data_cb, log_cb, status_cb, tracked):
-            self.ws, self.ws_thread = None, None
-            self.data_cb, self.log_cb, self.status_cb = data_cb, log_cb, status_cb
-            self.is_connected, self.is_running = threading.Event(), threading.Event()
-            self.queue = queue.Queue()
-            self.tracked_pairs = set(p.lower() for p in tracked)
-        def connect(self):
-            if self.is_running.is_set(): return
-            self.is_running.set()
-            self.ws_thread = threading.Thread(target=self._run_websocket, daemon=True); self.ws_thread.start()
-            self.status_cb("Connecting...")
-        def disconnect(self):
-            if not self.is_running.is_set(): return
-            self.is_running.clear()
-            if self.ws: self.ws.close()
-        def process_queue(self): self.data_cb(*self.queue.get_nowait())
-        def _run_websocket(self):
-            self.ws = websocket.WebSocketApp("wss://stream.binance.com:9443/ws", on_open=self._on_open, on_message=self._on_message, on_error=self._on_error, on_close=self._on_close)
-            while self.is_running.is_set(): self.ws.run_forever(ping_interval=20, ping_timeout=10); time.sleep(1)
-        def _on_open(self, ws):
-            self.is_connected.set(); self.log_cb("WebSocket Connected"); self.status_cb("Connected")
-            self.subscribe(self.tracked_pairs)
-        def _on_message(self, ws, msg):
-            data = json.loads(msg)
-            if 'k' in data: self.queue.put(("kline", data))
-        def _on_error(self, ws, err): self.log_cb(f"WebSocket Error: {err}")
-        def _on_close(self, ws, code, msg):
-            self.is_connected.clear(); self.log_cb("WebSocket Closed"); self.status_cb("Disconnected")
-        def update_tracked_pairs(self, new_pairs_list):
-            new_tracked = set(p.lower() for p in new_pairs_list)
-            to_sub, to_unsub = new_tracked - self.tracked_pairs, self.tracked_pairs - new_tracked
-            self.subscribe(to_sub); self.unsubscribe(to_unsub)
-            self.tracked_pairs = new_tracked
-        def subscribe(self, pairs):
-            if not self.is_connected.is_set() or not pairs: return
-            msg = json.dumps({"method": "SUBSCRIBE", "params": [f"{p.lower()}@kline_1m" for p in pairs], "id": 1})
-            self.ws.send(msg); self.log_cb(f"Subscribed to: {', '.join(pairs)}")
-        def unsubscribe(self, pairs):
-            if not self.is_connected.is_set() or not pairs: return
-            msg = json.dumps({"method": "UNSUBSCRIBE", "params": [f"{p.lower()}@kline_1m" for p in pairs], "id": 2})
-            self.ws.send(msg); self.log_cb(f"Unsubscribed from: {', '.join(pairs)}")
-        def start_initial_fetch(self): threading.Thread(target=self._fetch_24h_stats, daemon=True).start()
-        def start_24h_stats_updater(self): threading.Thread(target=self._periodic_24h_stats_fetch, daemon=True).start()
-        def _fetch_24h_stats(self):
-            try:
-                res = requests.get("https://api.binance.com/api/v3/ticker/24hr", timeout=10)
-                res.raise_for_status(); self.queue.put(("24h_stats", res.json()))
-            except requests.RequestException as e: self.log_cb(f"Error fetching initial stats: {e}")
-        def _periodic_24h_stats_fetch(self):
-            time.sleep(30)
-            while self.is_running.is_set(): self._fetch_24h_stats(); time.sleep(30)
-        def get_all_usdt_symbols(self):
-            try:
-                res = requests.get("https://api.binance.com/api/v3/exchangeInfo", timeout=10)
-                res.raise_for_status()
-                return [s['symbol'] for s in res.json()['symbols'] if s['symbol'].endswith('USDT') and s['status'] == 'TRADING']
-            except requests.RequestException as e: self.log_cb(f"Error fetching symbols: {e}"); return []
-        def get_historical_klines(self, symbol, interval):
-            try:
-                res = requests.get(f"https://api.binance.com/api/v3/klines?symbol={symbol.upper()}&interval={interval}&limit=100", timeout=10)
-                res.raise_for_status()
-                df = pd.DataFrame(res.json(), columns=['timestamp', 'Open', 'High', 'Low', 'Close', 'Volume', 'ct', 'qav', 't', 'tbbav', 'tbqav', 'i'])
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms'); df.set_index('timestamp', inplace=True)
-                for col in ['Open', 'High', 'Low', 'Close', 'Volume']: df[col] = pd.to_numeric(df[col])
-                return df
-            except requests.RequestException as e: self.log_cb(f"Error fetching klines for {symbol}: {e}"); return pd.DataFrame()
-
     class DashboardTab(ttk.Frame):
         def __init__(self, parent, app):
             super().__init__(parent); self.app = app; parent.add(self, text="Dashboard", padding=10)
@@ -270,22 +217,26 @@ class EliteCryptoDashboard:
             cols = ("Symbol", "Price", "24h %", "24h High", "24h Low", "24h Volume", "Action")
             self.tree = ttk.Treeview(self, columns=cols, show="headings", style="Treeview")
             for col in cols: self.tree.heading(col, text=col); self.tree.column(col, anchor='center', width=100)
+            for col in cols[:-1]: self.tree.heading(col, command=lambda c=col: self.renderer.sort_by(c))
             self.tree.column("Action", width=50, anchor='center')
-            self.tree.pack(fill=tk.BOTH, expand=True)
+            scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview, style="Vertical.TScrollbar")
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y); self.tree.pack(fill=tk.BOTH, expand=True)
+            # Ticks only mark rows dirty; the renderer redraws changed visible cells a few times a second
+            price = lambda v: f"${v:,.4f}"
+            self.renderer = TreeRenderer(self.tree, cols, self._row_values, (str, lambda v: price(v) if v > 0 else "Loading...", lambda v: f"{v:.2f}%", price, price, lambda v: f"${v:,.0f}", str),
+                                         tag_fn=lambda raw: "up" if raw[2] > 0 else "down", scrollbar=scrollbar)
             self.tree.bind("<<TreeviewSelect>>", self._on_select)
             self.tree.bind("<Button-1>", self._on_tree_click)
+            self.populate_initial_data()
         def _open_add_coin_dialog(self): CoinSearchDialog(self.app.root, self.app)
         def populate_initial_data(self):
             for symbol in self.app.settings.get("tracked_pairs"): self.update_dashboard(symbol.upper())
-        def update_dashboard(self, symbol):
-            price = self.app.last_prices.get(symbol, 0)
-            stats = self.app.stats_24h.get(symbol, {})
-            change = float(stats.get('priceChangePercent', 0.0))
-            values = (symbol, f"${price:,.4f}" if price > 0 else "Loading...", f"{change:.2f}%", f"${float(stats.get('highPrice', 0)):,.4f}",
-                      f"${float(stats.get('lowPrice', 0)):,.4f}", f"${float(stats.get('quoteVolume', 0)):,.0f}", "❌")
-            tag = "up" if change > 0 else "down"
-            if self.tree.exists(symbol): self.tree.item(symbol, values=values, tags=(tag,))
-            else: self.tree.insert("", "end", iid=symbol, values=values, tags=(tag,))
+        def update_dashboard(self, symbol): self.renderer.mark(symbol)
+        def _row_values(self, symbol):
+            stats = self.app.stats_24h.get(symbol)
+            price = self.app.last_prices.get(symbol) or (stats.close if stats else 0)
+            change, high, low, volume = (stats.change_pct, stats.high, stats.low, stats.quote_volume) if stats else (0.0, 0, 0, 0)
+            return (symbol, price, change, high, low, volume, "❌")
         def _on_select(self, event):
             if not self.tree.selection(): return
             self.app.selected_chart_coin = self.tree.item(self.tree.selection()[0], "values")[0]
@@ -300,8 +251,7 @@ class EliteCryptoDashboard:
                     symbol = self.tree.item(item, "values")[0]
                     if messagebox.askyesno("Confirm", f"Are you sure you want to remove {symbol}?"):
                         self.app.remove_coin_from_tracker(symbol)
-        def remove_coin(self, symbol):
-            if self.tree.exists(symbol): self.tree.delete(symbol)
+        def remove_coin(self, symbol): self.renderer.remove(symbol)
 
     class PortfolioTab(ttk.Frame):
         def __init__(self, parent, app):
@@ -311,56 +261,98 @@ class EliteCryptoDashboard:
             form = ttk.Frame(self); form.pack(fill=tk.X, pady=10)
             theme = self.app.current_theme
             self.symbol_entry = PlaceholderEntry(form, "BTC", theme["placeholder"], width=12, style="TEntry"); self.symbol_entry.pack(side=tk.LEFT, padx=5, ipady=4)
-            self.type_combo = ttk.Combobox(form, values=['Buy', 'Sell'], width=5, style="TCombobox"); self.type_combo.set('Buy'); self.type_combo.pack(side=tk.LEFT, padx=5)
+            self.type_combo = ttk.Combobox(form, values=['Buy', 'Sell'], width=5, state="readonly", style="TCombobox"); self.type_combo.set('Buy'); self.type_combo.pack(side=tk.LEFT, padx=5)
             self.qty_entry = PlaceholderEntry(form, "Quantity", theme["placeholder"], width=15, style="TEntry"); self.qty_entry.pack(side=tk.LEFT, padx=5, ipady=4)
             self.price_entry = PlaceholderEntry(form, "Price per coin", theme["placeholder"], width=15, style="TEntry"); self.price_entry.pack(side=tk.LEFT, padx=5, ipady=4)
             self.app._create_rounded_button(form, "Log Tx", self.log_transaction).pack(side=tk.LEFT, padx=10)
+            self.app._create_rounded_button(form, "Import CSV", self.import_csv).pack(side=tk.LEFT)
             notebook = ttk.Notebook(self); notebook.pack(fill=tk.BOTH, expand=True, pady=10)
             summary_frame, history_frame = ttk.Frame(notebook), ttk.Frame(notebook)
             notebook.add(summary_frame, text="Summary"); notebook.add(history_frame, text="Transaction History")
-            cols_s = ("Asset", "Holdings", "Avg Buy Cost", "Value", "Unrealized P/L"); self.summary_tree = ttk.Treeview(summary_frame, columns=cols_s, show="headings"); self.summary_tree.pack(fill=tk.BOTH, expand=True)
+            cols_s = ("Asset", "Holdings", "Avg Buy Cost", "Value", "Unrealized P/L", "Realized P/L"); self.summary_tree = ttk.Treeview(summary_frame, columns=cols_s, show="headings"); self.summary_tree.pack(fill=tk.BOTH, expand=True)
             for col in cols_s: self.summary_tree.heading(col, text=col); self.summary_tree.column(col, anchor='center')
             cols_h = ("Date", "Symbol", "Type", "Quantity", "Price", "Total Value"); self.history_tree = ttk.Treeview(history_frame, columns=cols_h, show="headings"); self.history_tree.pack(fill=tk.BOTH, expand=True)
             for col in cols_h: self.history_tree.heading(col, text=col); self.history_tree.column(col, anchor='center')
         def log_transaction(self):
             try:
                 new_tx = {"date": datetime.now().isoformat(), "symbol": self.symbol_entry.get().upper(), "type": self.type_combo.get(), "qty": float(self.qty_entry.get()), "price": float(self.price_entry.get())}
-                self.app.settings.config['transactions'].append(new_tx); self.app.settings.save(); self.recalculate_portfolio()
-            except ValueError: messagebox.showerror("Error", "Invalid quantity or price.")
+            except ValueError: messagebox.showerror("Error", "Invalid quantity or price."); return
+            self.app.ledger.append(new_tx); in_order = new_tx['date'] >= self.engine.last_date
+            asset = self.engine.add_transaction(new_tx, () if in_order else self.app.ledger.all())  # Clock moved back: replay in date order
+            if in_order: self._refresh_rows([asset]); self._insert_history_row(new_tx); return
+            for stale in set(self.summary_tree.get_children()) - set(self.engine.positions): self.summary_tree.delete(stale)
+            self._refresh_rows(); self._rebuild_history(self.app.ledger.all())
+        def import_csv(self):
+            path = filedialog.askopenfilename(parent=self, title="Import trade history", filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+            if not path: return
+            try: imported, duplicates, skipped = self.app.ledger.import_csv(path)
+            except (OSError, ValueError) as e: messagebox.showerror("Import failed", str(e)); return
+            if imported: self.recalculate_portfolio()
+            messagebox.showinfo("Import complete", f"Imported {imported} trades ({duplicates} already in the ledger, {skipped} skipped: not USDT pairs or unreadable).")
         def recalculate_portfolio(self):
-            self.holdings = defaultdict(lambda: {'qty': 0, 'cost': 0}); self.history_tree.delete(*self.history_tree.get_children())
-            for tx in sorted(self.app.settings.get('transactions'), key=lambda x: x['date']):
-                s, q, p = tx['symbol'], tx['qty'], tx['price']
-                self.history_tree.insert("", "end", values=(datetime.fromisoformat(tx['date']).strftime("%y-%m-%d %H:%M"), s, tx['type'], f"{q:f}", f"${p:,.2f}", f"${q*p:,.2f}"))
-                if tx['type'] == 'Buy': self.holdings[s]['cost'] += q*p; self.holdings[s]['qty'] += q
-                else: self.holdings[s]['qty'] -= q
-            self.update_portfolio_values()
-        def update_portfolio_values(self):
-            total_value = 0; self.summary_tree.delete(*self.summary_tree.get_children())
-            for symbol, data in self.holdings.items():
-                if data['qty'] <= 1e-9: continue
-                price = self.app.last_prices.get(f"{symbol}USDT", 0); value = data['qty'] * price; total_value += value
-                avg_cost = (data['cost'] / data['qty']) if data['qty'] > 0 else 0
-                pnl = (value - (data['qty'] * avg_cost)) if avg_cost > 0 else 0
-                self.summary_tree.insert("", "end", values=(symbol, f"{data['qty']:.6f}", f"${avg_cost:,.2f}", f"${value:,.2f}", f"${pnl:,.2f}"))
-            self.app.total_value_var.set(f"${total_value:,.2f}")
+            transactions = self.app.ledger.all()
+            self.engine = PortfolioEngine(transactions, self.app.last_prices)
+            self._rebuild_history(transactions); self.summary_tree.delete(*self.summary_tree.get_children()); self._refresh_rows()
+        def _rebuild_history(self, transactions):
+            self.history_tree.delete(*self.history_tree.get_children())
+            for tx in transactions: self._insert_history_row(tx)
+        def _insert_history_row(self, tx):
+            q, p = tx['qty'], tx['price']
+            self.history_tree.insert("", "end", values=(datetime.fromisoformat(tx['date']).strftime("%y-%m-%d %H:%M"), tx['symbol'], tx['type'], f"{q:f}", f"${p:,.2f}", f"${q*p:,.2f}"))
+        def update_portfolio_values(self, symbols=None):
+            """Applies the latest prices for `symbols` (trading pairs) and redraws only the holdings they revalue."""
+            if symbols is None: self._refresh_rows(); return
+            changed = [asset for asset in (self.engine.apply_price(s, self.app.last_prices[s]) for s in symbols if s in self.app.last_prices) if asset]
+            if changed: self._refresh_rows(changed)
+        def _refresh_rows(self, assets=None):
+            for asset in (self.engine.positions if assets is None else assets):
+                pos = self.engine.positions[asset]
+                if not pos.is_open:
+                    if self.summary_tree.exists(asset): self.summary_tree.delete(asset)
+                    continue
+                values = (asset, f"{pos.qty:.6f}", f"${pos.avg_cost:,.2f}", f"${pos.value:,.2f}", f"${pos.unrealized:,.2f}", f"${pos.realized:,.2f}")
+                if self.summary_tree.exists(asset): self.summary_tree.item(asset, values=values)
+                else: self.summary_tree.insert("", "end", iid=asset, values=values)
+            self.app.total_value_var.set(f"${self.engine.total_value:,.2f}")
 
     class ChartingTab(ttk.Frame):
         def __init__(self, parent, app):
             super().__init__(parent); self.app = app; parent.add(self, text="Live Chart")
-            self.df = pd.DataFrame(); controls = ttk.Frame(self); controls.pack(fill=tk.X, pady=5)
+            controls = ttk.Frame(self); controls.pack(fill=tk.X, pady=5)
             self.coin_var = tk.StringVar(value=self.app.selected_chart_coin)
             self.coin_combo = ttk.Combobox(controls, textvariable=self.coin_var, state="readonly", width=15); self.coin_combo.pack(side=tk.LEFT, padx=10)
             self.coin_combo.bind("<<ComboboxSelected>>", self._on_coin_select)
             self.interval_var = tk.StringVar(value="5m")
-            self.interval_combo = ttk.Combobox(controls, textvariable=self.interval_var, values=["1m", "5m", "15m", "1h", "4h", "1d"], width=5); self.interval_combo.pack(side=tk.LEFT, padx=5)
+            self.interval_combo = ttk.Combobox(controls, textvariable=self.interval_var, values=list(INTERVAL_MS), state="readonly", width=5); self.interval_combo.pack(side=tk.LEFT, padx=5)
             self.interval_combo.bind("<<ComboboxSelected>>", lambda e: self.plot_chart())
-            self.app._create_rounded_button(controls, "Refresh", self.plot_chart).pack(side=tk.LEFT, padx=10)
-            self.fig = None; self.canvas = None
-            self.app.notebook.bind("<<NotebookTabChanged>>", lambda e: self.update_chart_selection() if str(self.app.notebook.select()) == str(self) else None)
-        def _get_mpf_style(self):
-            theme = self.app.current_theme
-            return mpf.make_mpf_style(base_mpf_style='nightclouds', facecolor=theme['content_bg'], edgecolor=theme['border'], figcolor=theme['root_bg'], y_on_right=True, gridcolor=theme['border'], rc={'text.color': theme['text'], 'axes.labelcolor': theme['text'], 'xtick.color': theme['text'], 'ytick.color': theme['text']})
+            self.depth_var = tk.StringVar(value=str(MAX_CHART_POINTS))  # Candles shown; deeper views are backfilled once, then open from disk
+            self.depth_combo = ttk.Combobox(controls, textvariable=self.depth_var, values=[str(d) for d in HISTORY_DEPTHS], state="readonly", width=6); self.depth_combo.pack(side=tk.LEFT, padx=5)
+            self.depth_combo.bind("<<ComboboxSelected>>", lambda e: self.plot_chart())
+            self.app._create_rounded_button(controls, "Refresh", lambda: self.plot_chart(refresh=True)).pack(side=tk.LEFT, padx=10)
+            self.overlay_var, self.oscillator_var = tk.StringVar(value="None"), tk.StringVar(value="RSI 14"); self.indicator_combos = []
+            for var in (self.overlay_var, self.oscillator_var):
+                combo = ttk.Combobox(controls, textvariable=var, state="readonly", width=12); combo.pack(side=tk.LEFT, padx=5)
+                combo.bind("<<ComboboxSelected>>", lambda e: self._apply_indicators()); self.indicator_combos.append(combo)
+            self.chart = None; self.chart_shown = False  # Built (with matplotlib) the first time the tab is shown
+            self.history_retry = {}  # (symbol, interval) -> (monotonic time of the next reload, current delay)
+            self.app.notebook.bind("<<NotebookTabChanged>>", lambda e: self._on_shown() if str(self.app.notebook.select()) == str(self) else None)
+        def _ensure_chart(self):
+            if self.chart is not None: return
+            from indicators import OVERLAYS, OSCILLATORS
+            from live_chart import LiveCandleChart
+            self.presets = (OVERLAYS, OSCILLATORS)
+            for combo, choices in zip(self.indicator_combos, self.presets): combo['values'] = ["None", *choices]
+            self.chart = LiveCandleChart(self, self.app.current_theme, MAX_CHART_POINTS); self._apply_indicators()
+            METRICS.register(self.chart, rebuild="chart.rebuild", _blit="chart.blit"); METRICS.register(self.chart.canvas, draw="chart.draw")
+        def destroy(self):
+            if self.chart is not None: METRICS.unregister(self.chart, self.chart.canvas)
+            super().destroy()
+        def _on_shown(self):
+            first = self.chart is None; self._ensure_chart(); self.update_chart_selection()
+            if first: self.plot_chart()
+        def _apply_indicators(self):
+            factories = [presets.get(var.get()) for presets, var in zip(self.presets, (self.overlay_var, self.oscillator_var))]
+            self.chart.set_indicators([factory() for factory in factories if factory])
         def _on_coin_select(self, event):
             self.app.selected_chart_coin = self.coin_var.get(); self.plot_chart()
         def update_chart_selection(self):
@@ -368,30 +360,36 @@ class EliteCryptoDashboard:
             self.coin_combo['values'] = tracked
             if self.app.selected_chart_coin in tracked: self.coin_var.set(self.app.selected_chart_coin)
             elif tracked: self.coin_var.set(tracked[0]); self.app.selected_chart_coin = tracked[0]; self.plot_chart()
-        def plot_chart(self):
-            self.app.selected_chart_interval = self.interval_var.get()
-            self.df = self.app.api.get_historical_klines(self.app.selected_chart_coin, self.app.selected_chart_interval); self.redraw_chart()
-        def redraw_chart(self):
-            if self.df.empty: return
-            if self.canvas: self.canvas.get_tk_widget().destroy()
-            fig, axlist = mpf.plot(self.df, type='candle', volume=True, style=self._get_mpf_style(), title=f"\n{self.app.selected_chart_coin} - {self.app.selected_chart_interval}", returnfig=True)
-            self.fig = fig
-            self.canvas = FigureCanvasTkAgg(self.fig, master=self)
-            self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-            self.canvas.draw()
-        def append_live_data(self, data):
-            if data['s'] != self.app.selected_chart_coin or self.df.empty or self.app.selected_chart_interval != '1m': return
-            k = data['k']
-            if k['x']:
-                new_candle = pd.DataFrame([{'Open': float(k['o']), 'High': float(k['h']), 'Low': float(k['l']), 'Close': float(k['c']), 'Volume': float(k['v'])}], index=[pd.to_datetime(k['t'], unit='ms')])
-                self.df = pd.concat([self.df.iloc[1:], new_candle]); self.redraw_chart()
+        def plot_chart(self, refresh=False):
+            """Shows the selection straight from the candle aggregator when it has the series; otherwise (or on Refresh) over REST."""
+            self.app.selected_chart_interval = self.interval_var.get(); symbol, interval, depth = self.app.selected_chart_coin, self.app.selected_chart_interval, int(self.depth_var.get())
+            rows = None if refresh or depth > MAX_CHART_POINTS else self.app.api.candles.rows(symbol, interval, MAX_CHART_POINTS)
+            if rows: self.on_history(symbol, interval, rows)
+            else: self.app.api.request_historical_klines(symbol, interval, depth)
+        def on_history(self, symbol, interval, rows, minutes=None):
+            if symbol != self.app.selected_chart_coin or interval != self.app.selected_chart_interval or not rows: return  # Stale or empty response
+            self._ensure_chart(); self.chart.set_data(rows, f"{symbol} - {interval}", int(self.depth_var.get()))
+            if not self.chart_shown: self.chart.widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10); self.chart_shown = True
+        def append_live_data(self, rec):
+            """Shows the selected interval's forming candle after a 1m tick (every tick, not only on close)."""
+            if self.chart is None or rec.symbol != self.app.selected_chart_coin: return
+            candles, interval = self.app.api.candles, self.app.selected_chart_interval
+            key = (rec.symbol, interval)
+            if candles.is_complete(rec.symbol, interval): self.history_retry.pop(key, None); self.chart.apply_tail(*candles.tail(rec.symbol, interval)); return
+            # A gap in the stream leaves the series partial: reload it, backing off while the reloads do not complete it
+            now = time.monotonic(); retry = self.history_retry.get(key)
+            if retry and now < retry[0]: return
+            delay = min(retry[1] * 2, HISTORY_RETRY_MAX_S) if retry else HISTORY_RETRY_S
+            self.history_retry[key] = (now + delay, delay); self.app.api.request_historical_klines(rec.symbol, interval, int(self.depth_var.get()))
 
     class MarketsTab(ttk.Frame):
         def __init__(self, parent, app):
             super().__init__(parent); self.app = app; parent.add(self, text="Markets", padding=10)
-            self.all_symbols = []; self._create_widgets()
+            self.index = None; self.populated = False; self.search_term = ""; self._search_job = None; self._create_widgets()
             self.loading_label.pack(pady=20)
-            threading.Thread(target=self._populate_symbols, daemon=True).start()
+            index, fresh = self.app.api.load_cached_index()  # First paint from cache, refreshed in the background when stale
+            if index: self.populate_symbols(index)
+            if not fresh: self.app.api.request_symbol_index()
         def _create_widgets(self):
             self.loading_label = ttk.Label(self, text="Loading symbols from Binance...")
             self.main_frame = ttk.Frame(self)
@@ -399,53 +397,188 @@ class EliteCryptoDashboard:
             available_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5); controls_frame.pack(side=tk.LEFT, fill=tk.Y, padx=10); tracked_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
             self.available_list = tk.Listbox(available_frame, bg=self.app.current_theme["content_bg"], fg=self.app.current_theme["text"], selectmode=tk.EXTENDED); self.available_list.pack(fill=tk.BOTH, expand=True)
             self.tracked_list = tk.Listbox(tracked_frame, bg=self.app.current_theme["content_bg"], fg=self.app.current_theme["text"], selectmode=tk.EXTENDED); self.tracked_list.pack(fill=tk.BOTH, expand=True)
-            search_var = tk.StringVar(); search_var.trace("w", lambda n, i, m, sv=search_var: self._search(sv.get()))
+            search_var = tk.StringVar(); search_var.trace("w", lambda n, i, m, sv=search_var: self._search(sv.get(), "Search..."))
             PlaceholderEntry(available_frame, "Search...", self.app.current_theme["placeholder"], textvariable=search_var).pack(fill=tk.X, pady=5, ipady=4, before=self.available_list)
+            self.quote_var = tk.StringVar(value="USDT")
+            self.quote_combo = ttk.Combobox(available_frame, textvariable=self.quote_var, state="readonly", width=8, style="TCombobox")
+            self.quote_combo.pack(fill=tk.X, pady=(0, 5), before=self.available_list); self.quote_combo.bind("<<ComboboxSelected>>", lambda e: self._refresh())
             self.app._create_rounded_button(controls_frame, ">>", self._add).pack(pady=5)
             self.app._create_rounded_button(controls_frame, "<<", self._remove).pack(pady=5)
             ttk.Label(tracked_frame, text="Tracked Pairs").pack(fill=tk.X)
             self.app._create_rounded_button(self, "Apply Changes", self._apply).pack(pady=10)
-        def _populate_symbols(self):
-            self.all_symbols = sorted(self.app.api.get_all_usdt_symbols())
-            self.loading_label.pack_forget(); self.main_frame.pack(fill=tk.BOTH, expand=True)
-            tracked = set(s.lower() for s in self.app.settings.get('tracked_pairs'))
-            for s in self.all_symbols:
-                if s.lower() not in tracked: self.available_list.insert(tk.END, s)
-            for s in sorted(list(tracked)): self.tracked_list.insert(tk.END, s.upper())
-        def _search(self, term):
-            self.available_list.delete(0, tk.END)
-            tracked = set(s.lower() for s in self.tracked_list.get(0, tk.END))
-            for s in self.all_symbols:
-                if term.lower() in s.lower() and s.lower() not in tracked: self.available_list.insert(tk.END, s)
+        def populate_symbols(self, index):
+            if index is None:
+                if self.populated: return  # Keep the cached list if a refresh failed
+                index = SymbolIndex([])
+            self.index = index
+            tracked = set(s.upper() for s in (self.tracked_list.get(0, tk.END) if self.populated else self.app.settings.get('tracked_pairs')))
+            if not self.populated: self.loading_label.pack_forget(); self.main_frame.pack(fill=tk.BOTH, expand=True); self.populated = True
+            self.quote_combo['values'] = ["All", *index.quote_assets()]
+            self.tracked_list.delete(0, tk.END); self.tracked_list.insert(tk.END, *sorted(tracked))
+            self._refresh()
+        def _search(self, term, placeholder):
+            self.search_term = "" if term == placeholder else term
+            if self._search_job: self.after_cancel(self._search_job)
+            self._search_job = self.after(SEARCH_DEBOUNCE_MS, self._refresh)
+        def _refresh(self):
+            """Refills the available list from the index in one bulk insert."""
+            self._search_job = None
+            if self.index is None: return
+            quote = self.quote_var.get()
+            matches = self.index.search(self.search_term, None if quote == "All" else quote, exclude=self.tracked_list.get(0, tk.END))
+            self.available_list.delete(0, tk.END); self.available_list.insert(tk.END, *matches)
         def _add(self):
             for i in self.available_list.curselection()[::-1]: self.tracked_list.insert(tk.END, self.available_list.get(i)); self.available_list.delete(i)
         def _remove(self):
-            for i in self.tracked_list.curselection()[::-1]: self.available_list.insert(tk.END, self.tracked_list.get(i)); self.tracked_list.delete(i); self._search('')
+            for i in self.tracked_list.curselection()[::-1]: self.tracked_list.delete(i)
+            self._refresh()
         def _apply(self):
             new_tracked = list(s.lower() for s in self.tracked_list.get(0, tk.END))
             self.app.api.update_tracked_pairs(new_tracked)
             self.app.settings.set("tracked_pairs", new_tracked); self.app.settings.save()
             messagebox.showinfo("Success", "Tracking list updated!")
 
+    class AlertsTab(ttk.Frame):
+        KINDS = {"Price crosses": "price", "% move": "move", "Volume spike (x avg)": "volume"}
+        def __init__(self, parent, app):
+            super().__init__(parent); self.app = app; parent.add(self, text="Alerts", padding=10)
+            form = ttk.Frame(self); form.pack(fill=tk.X, pady=10)
+            theme = self.app.current_theme
+            self.symbol_entry = PlaceholderEntry(form, "BTCUSDT", theme["placeholder"], width=12, style="TEntry"); self.symbol_entry.pack(side=tk.LEFT, padx=5, ipady=4)
+            self.kind_combo = ttk.Combobox(form, values=list(self.KINDS), width=18, state="readonly", style="TCombobox"); self.kind_combo.set("Price crosses"); self.kind_combo.pack(side=tk.LEFT, padx=5)
+            self.value_entry = PlaceholderEntry(form, "Price / % / multiple", theme["placeholder"], width=18, style="TEntry"); self.value_entry.pack(side=tk.LEFT, padx=5, ipady=4)
+            self.window_entry = PlaceholderEntry(form, "Window (min)", theme["placeholder"], width=12, style="TEntry"); self.window_entry.pack(side=tk.LEFT, padx=5, ipady=4)
+            self.cooldown_entry = PlaceholderEntry(form, "Cooldown (s)", theme["placeholder"], width=12, style="TEntry"); self.cooldown_entry.pack(side=tk.LEFT, padx=5, ipady=4)
+            self.app._create_rounded_button(form, "Add Alert", self.add_alert).pack(side=tk.LEFT, padx=10)
+            self.app._create_rounded_button(form, "Remove", self.remove_selected).pack(side=tk.LEFT)
+            cols = ("Symbol", "Condition", "Cooldown", "Last Triggered"); self.tree = ttk.Treeview(self, columns=cols, show="headings"); self.tree.pack(fill=tk.BOTH, expand=True)
+            for col in cols: self.tree.heading(col, text=col); self.tree.column(col, anchor='center')
+            for alert in self.app.alerts.alerts: self._insert_row(alert)
+        @staticmethod
+        def _entry_value(entry, default=None):
+            text = entry.get().strip()
+            return default if not text or entry['foreground'] == entry.placeholder_color else text
+        @staticmethod
+        def _describe(alert):
+            if alert['kind'] == "price": return f"Price crosses {alert['value']:,.8g}"
+            if alert['kind'] == "move": return f"{alert['value']:+g}% within {alert['window']}m"
+            return f"Volume ≥ {alert['value']:g}x average"
+        def _insert_row(self, alert):
+            fired = datetime.fromtimestamp(alert['last_fired']).strftime("%y-%m-%d %H:%M:%S") if alert.get('last_fired') else "Never"
+            self.tree.insert("", "end", iid=str(alert['id']), values=(alert['symbol'], self._describe(alert), f"{alert['cooldown']:g}s", fired))
+        def add_alert(self):
+            symbol = (self._entry_value(self.symbol_entry) or "").upper()
+            index = self.app.markets_tab.index
+            if not symbol or (index and len(index) and symbol not in index.symbols): messagebox.showerror("Error", f"Unknown symbol: {symbol or '(empty)'}"); return
+            try:
+                alert = self.app.alerts.add({"symbol": symbol, "kind": self.KINDS[self.kind_combo.get()], "value": float(self._entry_value(self.value_entry)),
+                                             "window": int(self._entry_value(self.window_entry, 0)), "cooldown": float(self._entry_value(self.cooldown_entry, 300))})
+            except (TypeError, ValueError) as e: messagebox.showerror("Error", f"Invalid alert: {e}"); return
+            self._insert_row(alert); self._save()
+            if symbol.lower() not in self.app.settings.get("tracked_pairs"): self.app.add_coin_to_tracker(symbol)  # Alerts are checked on tracked streams
+        def remove_selected(self):
+            for iid in self.tree.selection(): self.app.alerts.remove(int(iid)); self.tree.delete(iid)
+            self._save()
+        def _save(self): self.app.settings.set("alerts", self.app.alerts.alerts); self.app.settings.save()
+        def on_fired(self, events):
+            for e in events:
+                if self.tree.exists(str(e['id'])): self.tree.set(str(e['id']), "Last Triggered", datetime.fromtimestamp(e['time']).strftime("%y-%m-%d %H:%M:%S"))
+
+    class DiagnosticsTab(ttk.Frame):
+        """Stage timings and counters from METRICS, refreshed while the tab is showing, plus exports and a sampling profile."""
+        REFRESH_MS, HEARTBEAT_MS, PROFILE_S = 1000, 50, 10
+        def __init__(self, parent, app):
+            super().__init__(parent); self.app = app; parent.add(self, text="Diagnostics", padding=10)
+            controls = ttk.Frame(self); controls.pack(fill=tk.X, pady=10)
+            self.app._create_rounded_button(controls, "On / Off", self.toggle).pack(side=tk.LEFT, padx=5)
+            self.app._create_rounded_button(controls, "Reset", self.reset).pack(side=tk.LEFT, padx=5)
+            self.app._create_rounded_button(controls, "Export...", self.export).pack(side=tk.LEFT, padx=5)
+            self.app._create_rounded_button(controls, f"Profile {self.PROFILE_S}s", self.profile).pack(side=tk.LEFT, padx=5)
+            self.status_var = tk.StringVar(); ttk.Label(controls, textvariable=self.status_var).pack(side=tk.LEFT, padx=15)
+            tables = ttk.Frame(self); tables.pack(fill=tk.BOTH, expand=True)
+            cols = ("Stage", "Calls", "Per sec", "Mean ms", "p50 ms", "p95 ms", "p99 ms", "Max ms")
+            self.stage_tree = ttk.Treeview(tables, columns=cols, show="headings"); self.stage_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            for col in cols: self.stage_tree.heading(col, text=col); self.stage_tree.column(col, anchor='center', width=80)
+            self.counter_tree = ttk.Treeview(tables, columns=("Counter", "Value"), show="headings"); self.counter_tree.pack(side=tk.RIGHT, fill=tk.Y, padx=(10, 0))
+            for col in ("Counter", "Value"): self.counter_tree.heading(col, text=col); self.counter_tree.column(col, anchor='center', width=160)
+            theme = self.app.current_theme
+            self.profile_text = tk.Text(self, height=12, bg=theme["content_bg"], fg=theme["text"], font=("Consolas", 9), relief=tk.FLAT, state=tk.DISABLED)
+            self.profile_text.pack(fill=tk.X, pady=(10, 0))
+            self.last_counts, self.last_refresh, self.profiler, self._heartbeat_job = {}, time.monotonic(), None, None
+            self._update_status(); self.after(self.REFRESH_MS, self._refresh_loop)
+            if METRICS.enabled: self._schedule_heartbeat()
+        def _update_status(self):
+            self.status_var.set(f"Instrumentation {'on' if METRICS.enabled else 'off'}{' - profiling...' if self.profiler else ''}")
+        def toggle(self):
+            if METRICS.enabled:
+                METRICS.disable()
+                if self._heartbeat_job: self.after_cancel(self._heartbeat_job); self._heartbeat_job = None
+            else: METRICS.enable(); self._schedule_heartbeat()
+            self._update_status()
+        def _schedule_heartbeat(self):
+            self._heartbeat_due = time.monotonic() + self.HEARTBEAT_MS / 1000; self._heartbeat_job = self.after(self.HEARTBEAT_MS, self._heartbeat)
+        def _heartbeat(self):
+            # How late a short timer fires is how long the main loop was busy: the lag the user feels
+            METRICS.observe("ui.loop_lag", max(0.0, time.monotonic() - self._heartbeat_due)); self._schedule_heartbeat()
+        def _refresh_loop(self):
+            if str(self.app.notebook.select()) == str(self): self.refresh()
+            self.after(self.REFRESH_MS, self._refresh_loop)
+        def refresh(self):
+            snap = METRICS.snapshot(); now = time.monotonic(); elapsed = max(now - self.last_refresh, 1e-3); self.last_refresh = now
+            for stage, st in snap["stages"].items():
+                rate = (st["count"] - self.last_counts.get(stage, st["count"])) / elapsed; self.last_counts[stage] = st["count"]
+                values = (stage, f"{st['count']:,}", f"{rate:,.1f}", *(f"{st[k] * 1000:.3f}" for k in ("mean", "p50", "p95", "p99", "max")))
+                if self.stage_tree.exists(stage): self.stage_tree.item(stage, values=values)
+                else: self.stage_tree.insert("", "end", iid=stage, values=values)
+            for group, counters in snap["counters"].items():
+                for key, value in counters.items():
+                    iid = f"{group}.{key}"; values = (iid, f"{value:,.2f}" if isinstance(value, float) else f"{value:,}" if isinstance(value, int) else value)
+                    if self.counter_tree.exists(iid): self.counter_tree.item(iid, values=values)
+                    else: self.counter_tree.insert("", "end", iid=iid, values=values)
+        def reset(self):
+            METRICS.reset(); self.last_counts.clear(); self.stage_tree.delete(*self.stage_tree.get_children()); self.refresh()
+        def export(self):
+            path = filedialog.asksaveasfilename(parent=self, title="Export metrics", defaultextension=".prom",
+                                                filetypes=[("Prometheus text", "*.prom"), ("JSON", "*.json")])
+            if not path: return
+            try: METRICS.dump(path)
+            except OSError as e: messagebox.showerror("Export failed", str(e)); return
+            self.app.log_callback(f"Metrics written to {path}")
+        def profile(self):
+            if self.profiler: return
+            self.profiler = SamplingProfiler().start(); self._update_status(); self.after(self.PROFILE_S * 1000, self._finish_profile)
+        def _finish_profile(self):
+            profiler = self.profiler.stop(); self.profiler = None; self._update_status()
+            path = f"profile-{datetime.now():%Y%m%d-%H%M%S}.folded"
+            try:
+                with open(path, 'w') as f: f.write(profiler.folded())
+                saved = f"all threads saved to {path}"
+            except OSError as e: saved = f"could not save {path}: {e}"
+            lines = [f"Main thread, {profiler.samples} samples over {self.PROFILE_S}s ({saved})", f"{'own %':>7} {'incl %':>7}  function"]
+            samples = max(profiler.samples, 1)
+            lines += [f"{own / samples:>7.1%} {inclusive / samples:>7.1%}  {fn}" for fn, own, inclusive in profiler.top(15, thread="MainThread")]
+            self.profile_text.config(state=tk.NORMAL); self.profile_text.delete("1.0", tk.END)
+            self.profile_text.insert(tk.END, "\n".join(lines)); self.profile_text.config(state=tk.DISABLED)
+
 class CoinSearchDialog(tk.Toplevel):
     def __init__(self, parent, app):
         super().__init__(parent); self.app = app
         self.transient(parent); self.grab_set(); self.title("Add Coin to Tracker"); self.geometry("300x400"); self.configure(bg=self.app.current_theme["root_bg"])
-        self.all_symbols = self.app.markets_tab.all_symbols
+        self.index = self.app.markets_tab.index or SymbolIndex([]); self._search_job = None
         self.listbox = tk.Listbox(self, bg=self.app.current_theme["content_bg"], fg=self.app.current_theme["text"], selectmode=tk.SINGLE, highlightthickness=0)
         self.listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
         self.listbox.bind("<Double-Button-1>", self._on_select)
-        search_var = tk.StringVar(); search_var.trace("w", lambda n, i, m, sv=search_var: self._on_search(sv.get()))
-        PlaceholderEntry(self, "Search Coin (e.g., SOLUSDT)", self.app.current_theme["placeholder"], textvariable=search_var).pack(fill=tk.X, padx=10, pady=10, ipady=4, before=self.listbox)
-        self._populate_list(self.all_symbols)
-    def _populate_list(self, symbols):
+        placeholder = "Search Coin (e.g., SOLUSDT)"
+        search_var = tk.StringVar(); search_var.trace("w", lambda n, i, m, sv=search_var: self._on_search("" if sv.get() == placeholder else sv.get()))
+        PlaceholderEntry(self, placeholder, self.app.current_theme["placeholder"], textvariable=search_var).pack(fill=tk.X, padx=10, pady=10, ipady=4, before=self.listbox)
+        self._populate_list("")
+    def _populate_list(self, term):
+        self._search_job = None
         self.listbox.delete(0, tk.END)
-        tracked = self.app.settings.get("tracked_pairs")
-        for symbol in symbols:
-            if symbol.lower() not in tracked: self.listbox.insert(tk.END, symbol)
+        self.listbox.insert(tk.END, *self.index.search(term, exclude=self.app.settings.get("tracked_pairs")))
     def _on_search(self, term):
-        filtered_symbols = [s for s in self.all_symbols if term.lower() in s.lower()] if term else self.all_symbols
-        self._populate_list(filtered_symbols)
+        if self._search_job: self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DEBOUNCE_MS, self._populate_list, term)
     def _on_select(self, event):
         if not self.listbox.curselection(): return
         self.app.add_coin_to_tracker(self.listbox.get(self.listbox.curselection()[0])); self.destroy()
@@ -0,0 +1,100 @@
+"""Fast decoding of Binance kline and 24h mini-ticker frames into compact records.
+
+For combined-stream frames the stream name sits at a fixed offset, so frames
+for symbols nobody displays are dropped before any JSON is parsed at all.
+Wanted frames are decoded with `orjson` when it is installed. Without it, a
+precompiled pattern matching Binance's fixed kline field order is tried first
+and the standard `json` module handles anything that does not match.
+"""
+import json
+import re
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    orjson = None
+    loads = json.loads
+
+_STREAM_PREFIX = '{"stream":"'
+_KLINE_RE = re.compile(r'"k":\{"t":(\d+),"T":(\d+),"s":"(\w+)","i":"(\w+)",.*?"o":"([\d.]+)","c":"([\d.]+)","h":"([\d.]+)",'
+                       r'"l":"([\d.]+)","v":"([\d.]+)",.*?"x":(true|false)')
+_TICKER_RE = re.compile(r'"E":(\d+),"s":"(\w+)","c":"([\d.]+)","o":"([\d.]+)","h":"([\d.]+)","l":"([\d.]+)","v":"([\d.]+)","q":"([\d.]+)"')
+
+
+class KlineRecord:
+    """The fields of a kline event the app uses, with prices already converted to floats."""
+    __slots__ = ("symbol", "interval", "open_time", "close_time", "open", "high", "low", "close", "volume", "closed")
+
+    def __init__(self, symbol, interval, open_time, close_time, open, high, low, close, volume, closed):
+        self.symbol, self.interval, self.open_time, self.close_time = symbol, interval, open_time, close_time
+        self.open, self.high, self.low, self.close, self.volume, self.closed = open, high, low, close, volume, closed
+
+    def row(self):
+        """The candle in KlineStore's (open_time, o, h, l, c, v, close_time) layout."""
+        return (self.open_time, self.open, self.high, self.low, self.close, self.volume, self.close_time)
+
+    def __repr__(self): return f"KlineRecord({self.symbol} {self.interval} t={self.open_time} c={self.close} closed={self.closed})"
+
+    @classmethod
+    def from_event(cls, data):
+        k = data['k']
+        return cls(data['s'], k['i'], k['t'], k['T'], float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v']), k['x'])
+
+
+class TickerRecord:
+    """Rolling 24h statistics for one symbol, from a miniTicker event or a /ticker/24hr REST entry."""
+    __slots__ = ("symbol", "time", "close", "open", "high", "low", "volume", "quote_volume")
+
+    def __init__(self, symbol, time, close, open, high, low, volume, quote_volume):
+        self.symbol, self.time, self.close, self.open = symbol, time, close, open
+        self.high, self.low, self.volume, self.quote_volume = high, low, volume, quote_volume
+
+    @property
+    def change_pct(self): return (self.close - self.open) / self.open * 100 if self.open else 0.0
+
+    def values(self): return (self.close, self.open, self.high, self.low, self.volume, self.quote_volume)
+
+    def __repr__(self): return f"TickerRecord({self.symbol} c={self.close} {self.change_pct:+.2f}%)"
+
+    @classmethod
+    def from_event(cls, data):
+        return cls(data['s'], data['E'], float(data['c']), float(data['o']), float(data['h']), float(data['l']), float(data['v']), float(data['q']))
+
+    @classmethod
+    def from_rest(cls, d):
+        return cls(d['symbol'], d['closeTime'], float(d['lastPrice']), float(d['openPrice']), float(d['highPrice']), float(d['lowPrice']),
+                   float(d['volume']), float(d['quoteVolume']))
+
+
+class KlineDecoder:
+    """Turns raw stream frames into KlineRecord / TickerRecord objects for the wanted symbols."""
+
+    def __init__(self, symbols=()):
+        self.set_symbols(symbols); self.stats = {"decoded": 0, "dropped": 0}
+
+    def set_symbols(self, symbols):
+        """Replaces the set of wanted symbols; safe to call while another thread decodes."""
+        self.wanted = frozenset(s.lower() for s in symbols)
+
+    def decode(self, raw):
+        """Returns a KlineRecord or TickerRecord for a wanted frame (combined-stream or raw), otherwise None."""
+        if raw.startswith(_STREAM_PREFIX):
+            at = raw.find('@', len(_STREAM_PREFIX))
+            if at > 0 and raw[len(_STREAM_PREFIX):at] not in self.wanted: self.stats["dropped"] += 1; return None
+            if orjson is None:
+                if raw.startswith("kline_", at + 1):
+                    m = _KLINE_RE.search(raw)
+                    if m:
+                        t, T, s, i, o, c, h, l, v, x = m.groups(); self.stats["decoded"] += 1
+                        return KlineRecord(s, i, int(t), int(T), float(o), float(h), float(l), float(c), float(v), x == "true")
+                elif raw.startswith("miniTicker", at + 1):
+                    m = _TICKER_RE.search(raw)
+                    if m:
+                        E, s, c, o, h, l, v, q = m.groups(); self.stats["decoded"] += 1
+                        return TickerRecord(s, int(E), float(c), float(o), float(h), float(l), float(v), float(q))
+        msg = loads(raw); data = msg.get('data', msg)
+        if 'k' not in data and data.get('e') != "24hrMiniTicker": return None
+        if data['s'].lower() not in self.wanted: self.stats["dropped"] += 1; return None
+        self.stats["decoded"] += 1
+        return KlineRecord.from_event(data) if 'k' in data else TickerRecord.from_event(data)
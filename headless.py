@@ -0,0 +1,116 @@
+"""Headless collector: runs the tracker's data path without any GUI libraries.
+
+Closed candles (and optionally every coalesced tick) are written as JSON lines to
+stdout or a file, closed candles also land in the local kline store, alerts
+stored with the settings are written as they fire, and the portfolio value from
+the transaction ledger is reported periodically.
+
+    python crypto.py --headless --pairs btcusdt,ethusdt --out ticks.jsonl --ticks
+    python headless.py --portfolio-every 60 --metrics-out metrics.prom
+
+With --metrics-out the hot-path timings are written every --metrics-every
+seconds, and SIGUSR1 records a sampling profile of all threads to a
+folded-stack file next to it.
+"""
+import argparse
+import json
+import signal
+import sys
+import time
+
+from alerts import AlertEngine
+from core import BinanceAPI, SettingsManager, CONFIG_FILE
+from kline_store import KlineStore, KLINE_DB_FILE
+from ledger import Ledger, LEDGER_DB_FILE
+from metrics import METRICS, SamplingProfiler
+from portfolio import PortfolioEngine
+
+DRAIN_INTERVAL = 0.1
+PROFILE_S = 10.0
+
+
+class Collector:
+    def __init__(self, args):
+        self.args, self.running = args, True
+        self.settings = SettingsManager(args.config, self.log_callback)
+        pairs = [p.strip().lower() for p in args.pairs.split(",")] if args.pairs else self.settings.get("tracked_pairs")
+        self.out = sys.stdout if args.out == "-" else open(args.out, "a", buffering=1)
+        ledger = Ledger(args.ledger); ledger.migrate_config(self.settings)
+        self.portfolio = PortfolioEngine(ledger.all()); ledger.close()
+        self.alerts = AlertEngine(self.settings.get("alerts"), on_fire=lambda events: self.api.queue.put(("alerts", events)))
+        self.api = BinanceAPI(self.data_callback, self.log_callback, self.status_callback, pairs, KlineStore(args.db), self.alerts)
+        self.next_portfolio = self.next_stats = 0.0; self.profiler, self.profile_until = None, 0.0
+        METRICS.configure_from_env(self.log_callback)
+        if args.metrics_out: METRICS.enable(); METRICS.start_dump(args.metrics_out, args.metrics_every, self.log_callback)  # Replaces a CRYPTO_METRICS_DUMP dumper
+
+    def log_callback(self, msg): print(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {msg}", file=sys.stderr, flush=True)
+    def status_callback(self, status): self.log_callback(f"Status: {status}")
+
+    def emit(self, record): self.out.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def data_callback(self, type, data):
+        if type == "alerts":
+            for e in data: self.emit({"type": "alert", "id": e["id"], "symbol": e["symbol"], "ts": int(e["time"] * 1000), "price": e["price"], "message": e["message"]})
+        if type != "klines": return  # REST snapshots are not needed by the collector
+        for rec in data:
+            self.portfolio.apply_price(rec.symbol, rec.close)
+            if rec.closed or self.args.ticks:
+                self.emit({"type": "candle" if rec.closed else "tick", "symbol": rec.symbol, "interval": rec.interval, "t": rec.open_time,
+                           "o": rec.open, "h": rec.high, "l": rec.low, "c": rec.close, "v": rec.volume})
+
+    def _periodic(self, now):
+        if self.args.portfolio_every and now >= self.next_portfolio and self.portfolio.positions:
+            self.next_portfolio = now + self.args.portfolio_every
+            self.emit({"type": "portfolio", "ts": int(time.time() * 1000), "value": round(self.portfolio.total_value, 2),
+                       "unrealized": round(self.portfolio.unrealized, 2), "realized": round(self.portfolio.realized, 2)})
+        if self.args.stats_every and now >= self.next_stats:
+            self.next_stats = now + self.args.stats_every
+            self.log_callback(f"Drain {self.api.drain_stats} decoder {self.api.decoder.stats}")
+        if self.profiler and now >= self.profile_until: self._finish_profile()
+
+    def profile(self, *args):
+        """SIGUSR1: samples every thread for PROFILE_S seconds, then writes the stacks in folded format."""
+        if not self.profiler: self.profiler = SamplingProfiler().start(); self.profile_until = time.monotonic() + PROFILE_S
+
+    def _finish_profile(self):
+        profiler = self.profiler.stop(); self.profiler = None
+        path = f"profile-{time.strftime('%Y%m%d-%H%M%S')}.folded"
+        try:
+            with open(path, "w") as f: f.write(profiler.folded())
+        except OSError as e: self.log_callback(f"Could not write profile {path}: {e}"); return
+        top = ", ".join(f"{fn} {own / max(profiler.samples, 1):.0%}" for fn, own, _ in profiler.top(5))
+        self.log_callback(f"Profile of {profiler.samples} samples written to {path}; top: {top}")
+
+    def stop(self, *args): self.running = False
+
+    def run(self):
+        signal.signal(signal.SIGINT, self.stop); signal.signal(signal.SIGTERM, self.stop)
+        if hasattr(signal, "SIGUSR1"): signal.signal(signal.SIGUSR1, self.profile)  # Not available on Windows
+        self.api.connect()
+        try:
+            while self.running:
+                self.api.process_queue(); self._periodic(time.monotonic()); time.sleep(DRAIN_INTERVAL)
+        finally:
+            self.api.close(); self.api.process_queue(); self.out.flush()
+            if self.out is not sys.stdout: self.out.close()
+        return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record Binance klines and portfolio value without the GUI.")
+    parser.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--pairs", help="comma-separated pairs to track (default: tracked_pairs from the config)")
+    parser.add_argument("--config", default=CONFIG_FILE, help="settings file with the tracked pairs")
+    parser.add_argument("--ledger", default=LEDGER_DB_FILE, help="transaction ledger the portfolio is computed from")
+    parser.add_argument("--out", default="-", help="JSON-lines output file, appended to ('-' for stdout)")
+    parser.add_argument("--db", default=KLINE_DB_FILE, help="SQLite kline store that closed candles are written to")
+    parser.add_argument("--ticks", action="store_true", help="also write forming-candle ticks, not only closed candles")
+    parser.add_argument("--portfolio-every", type=float, default=60.0, help="seconds between portfolio lines (0 disables)")
+    parser.add_argument("--stats-every", type=float, default=300.0, help="seconds between queue statistics on stderr (0 disables)")
+    parser.add_argument("--metrics-out", help="enable instrumentation and write it to this .prom (Prometheus text) or .json file")
+    parser.add_argument("--metrics-every", type=float, default=10.0, help="seconds between metrics writes")
+    return Collector(parser.parse_args(argv)).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
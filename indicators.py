@@ -0,0 +1,221 @@
+"""Technical indicators over OHLCV data, usable from the chart or headless code.
+
+Every indicator has two paths with identical results:
+
+* `seed(data)` computes the whole series with NumPy from a (6, n) OHLCV block
+  (as returned by `OHLCVBuffer.view()`) and leaves rolling state behind;
+* `update(row)` folds in one more closed candle in O(1) from that state.
+
+Outputs are float arrays with NaN during each indicator's warm-up period.
+"""
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ohlcv import TIME, HIGH, LOW, CLOSE, VOLUME
+
+DAY_MS = 86_400_000
+RESYNC_EVERY = 1024  # Running sums are recomputed this often to stop float drift
+
+
+def _ema_series(x, alpha, y0):
+    """y[i] = alpha * x[i] + (1 - alpha) * y[i-1] with y[-1] = y0, vectorized in blocks short enough to stay finite."""
+    out = np.empty(len(x)); decay = 1.0 - alpha
+    block = max(1, min(1024, int(200 / -math.log(decay)) if 0 < decay < 1 else 1024))
+    prev = y0
+    for start in range(0, len(x), block):
+        chunk = x[start:start + block]; j = np.arange(1, len(chunk) + 1)
+        weights = decay ** -j
+        out[start:start + len(chunk)] = decay ** j * (prev + alpha * np.cumsum(chunk * weights))
+        prev = out[start + len(chunk) - 1]
+    return out
+
+
+def _nan(n): return np.full(n, np.nan)
+
+
+class Indicator(ABC):
+    name, outputs, overlay = "", (), True
+
+    @abstractmethod
+    def seed(self, data):
+        """Computes the full (len(outputs), n) series from an OHLCV block and keeps the rolling state."""
+
+    @abstractmethod
+    def update(self, row):
+        """Folds in one closed candle and returns the newest value of each output."""
+
+
+class SMA(Indicator):
+    def __init__(self, period=20):
+        self.period = period; self.name = f"SMA {period}"; self.outputs = (self.name,)
+
+    def seed(self, data):
+        c = data[CLOSE]; out = _nan(len(c))
+        if len(c) >= self.period:
+            cs = np.concatenate(([0.0], np.cumsum(c))); out[self.period - 1:] = (cs[self.period:] - cs[:-self.period]) / self.period
+        self.window = deque(c[-self.period:], maxlen=self.period); self.total = float(np.sum(self.window)); self.updates = 0
+        return out[None, :]
+
+    def update(self, row):
+        c = row[CLOSE]
+        if len(self.window) == self.period: self.total -= self.window[0]
+        self.window.append(c); self.total += c; self.updates += 1
+        if self.updates % RESYNC_EVERY == 0: self.total = sum(self.window)
+        return (self.total / self.period if len(self.window) == self.period else math.nan,)
+
+
+class EMA(Indicator):
+    def __init__(self, period=50):
+        self.period = period; self.alpha = 2 / (period + 1); self.name = f"EMA {period}"; self.outputs = (self.name,)
+
+    def seed(self, data):
+        c = data[CLOSE]; self.value = None
+        if not len(c): return _nan(0)[None, :]
+        out = _ema_series(c, self.alpha, c[0]); self.value = out[-1]
+        return out[None, :]
+
+    def update(self, row):
+        c = row[CLOSE]
+        self.value = c if self.value is None else self.value + self.alpha * (c - self.value)
+        return (self.value,)
+
+
+class Bollinger(Indicator):
+    def __init__(self, period=20, width=2.0):
+        self.period, self.width = period, width; self.name = f"BB {period}"
+        self.outputs = ("BB upper", "BB mid", "BB lower")
+
+    def seed(self, data):
+        c = data[CLOSE]; mid, std = _nan(len(c)), _nan(len(c))
+        if len(c) >= self.period:
+            windows = sliding_window_view(c, self.period); mid[self.period - 1:] = windows.mean(axis=1); std[self.period - 1:] = windows.std(axis=1)
+        self.window = deque(c[-self.period:], maxlen=self.period); self._resync(); self.updates = 0
+        return np.vstack((mid + self.width * std, mid, mid - self.width * std))
+
+    def _resync(self): self.total = float(sum(self.window)); self.total_sq = float(sum(x * x for x in self.window))
+
+    def update(self, row):
+        c = row[CLOSE]
+        if len(self.window) == self.period: old = self.window[0]; self.total -= old; self.total_sq -= old * old
+        self.window.append(c); self.total += c; self.total_sq += c * c; self.updates += 1
+        if self.updates % RESYNC_EVERY == 0: self._resync()
+        if len(self.window) < self.period: return (math.nan,) * 3
+        mid = self.total / self.period; std = math.sqrt(max(self.total_sq / self.period - mid * mid, 0.0))
+        return (mid + self.width * std, mid, mid - self.width * std)
+
+
+class VWAP(Indicator):
+    """Volume-weighted average of the typical price, reset at each UTC day like exchange session VWAP."""
+    name, outputs = "VWAP", ("VWAP",)
+
+    def seed(self, data):
+        n = data.shape[1]; self.day, self.pv, self.vol = None, 0.0, 0.0
+        if not n: return _nan(0)[None, :]
+        typical = (data[HIGH] + data[LOW] + data[CLOSE]) / 3; pv, v = typical * data[VOLUME], data[VOLUME]
+        day = data[TIME] // DAY_MS; starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+        cum_pv, cum_v = np.cumsum(pv), np.cumsum(v)
+        # Subtract the running totals reached before each session started
+        lengths = np.diff(np.r_[starts, n])
+        base_pv = np.repeat(np.r_[0.0, cum_pv[starts[1:] - 1]], lengths); base_v = np.repeat(np.r_[0.0, cum_v[starts[1:] - 1]], lengths)
+        session_pv, session_v = cum_pv - base_pv, cum_v - base_v
+        with np.errstate(invalid="ignore", divide="ignore"): out = np.where(session_v > 0, session_pv / session_v, np.nan)
+        self.day, self.pv, self.vol = day[-1], session_pv[-1], session_v[-1]
+        return out[None, :]
+
+    def update(self, row):
+        day = row[TIME] // DAY_MS
+        if day != self.day: self.day, self.pv, self.vol = day, 0.0, 0.0
+        self.pv += (row[HIGH] + row[LOW] + row[CLOSE]) / 3 * row[VOLUME]; self.vol += row[VOLUME]
+        return (self.pv / self.vol if self.vol > 0 else math.nan,)
+
+
+class RSI(Indicator):
+    """Wilder's RSI: average gain/loss seeded with a simple mean, then smoothed with alpha = 1/period."""
+    overlay = False
+
+    def __init__(self, period=14):
+        self.period = period; self.name = f"RSI {period}"; self.outputs = (self.name,)
+
+    def seed(self, data):
+        c = data[CLOSE]; out = _nan(len(c)); self.prev = c[-1] if len(c) else None; self.avg_gain = self.avg_loss = None
+        self.warmup = []
+        if len(c) <= self.period: self.warmup = list(np.diff(c)); return out[None, :]
+        diff = np.diff(c); gains, losses = np.clip(diff, 0, None), np.clip(-diff, 0, None)
+        first_gain, first_loss = gains[:self.period].mean(), losses[:self.period].mean()
+        avg_gain = np.r_[first_gain, _ema_series(gains[self.period:], 1 / self.period, first_gain)]
+        avg_loss = np.r_[first_loss, _ema_series(losses[self.period:], 1 / self.period, first_loss)]
+        out[self.period:] = self._rsi(avg_gain, avg_loss); self.avg_gain, self.avg_loss = avg_gain[-1], avg_loss[-1]
+        return out[None, :]
+
+    @staticmethod
+    def _rsi(gain, loss):
+        with np.errstate(invalid="ignore", divide="ignore"): return np.where(loss > 0, 100 - 100 / (1 + gain / np.where(loss > 0, loss, 1)), 100.0)
+
+    def update(self, row):
+        c = row[CLOSE]
+        if self.prev is None: self.prev = c; return (math.nan,)
+        diff = c - self.prev; self.prev = c; gain, loss = max(diff, 0.0), max(-diff, 0.0)
+        if self.avg_gain is None:
+            self.warmup.append(diff)
+            if len(self.warmup) < self.period: return (math.nan,)
+            w = np.asarray(self.warmup); self.avg_gain, self.avg_loss = np.clip(w, 0, None).mean(), np.clip(-w, 0, None).mean()
+        else:
+            self.avg_gain += (gain - self.avg_gain) / self.period; self.avg_loss += (loss - self.avg_loss) / self.period
+        return (100 - 100 / (1 + self.avg_gain / self.avg_loss) if self.avg_loss > 0 else 100.0,)
+
+
+class MACD(Indicator):
+    overlay = False
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast, self.slow, self.signal = EMA(fast), EMA(slow), EMA(signal)
+        self.name = f"MACD {fast}/{slow}/{signal}"; self.outputs = ("MACD", "Signal", "Hist")
+
+    def seed(self, data):
+        macd = self.fast.seed(data)[0] - self.slow.seed(data)[0]
+        signal_data = np.zeros((6, len(macd))); signal_data[CLOSE] = macd
+        signal = self.signal.seed(signal_data)[0]
+        return np.vstack((macd, signal, macd - signal))
+
+    def update(self, row):
+        macd = self.fast.update(row)[0] - self.slow.update(row)[0]
+        signal = self.signal.update((0, 0, 0, 0, macd, 0))[0]
+        return (macd, signal, macd - signal)
+
+
+class ATR(Indicator):
+    """Wilder's Average True Range."""
+    overlay = False
+
+    def __init__(self, period=14):
+        self.period = period; self.name = f"ATR {period}"; self.outputs = (self.name,)
+
+    def seed(self, data):
+        h, l, c = data[HIGH], data[LOW], data[CLOSE]; n = len(c); out = _nan(n)
+        self.prev_close = c[-1] if n else None; self.value = None; self.warmup = []
+        if not n: return out[None, :]
+        prev = np.r_[c[0], c[:-1]]
+        tr = np.maximum(h - l, np.maximum(np.abs(h - prev), np.abs(l - prev))); tr[0] = h[0] - l[0]
+        if n < self.period: self.warmup = list(tr); return out[None, :]
+        first = tr[:self.period].mean()
+        out[self.period - 1:] = np.r_[first, _ema_series(tr[self.period:], 1 / self.period, first)]; self.value = out[-1]
+        return out[None, :]
+
+    def update(self, row):
+        h, l, c = row[HIGH], row[LOW], row[CLOSE]
+        tr = h - l if self.prev_close is None else max(h - l, abs(h - self.prev_close), abs(l - self.prev_close)); self.prev_close = c
+        if self.value is None:
+            self.warmup.append(tr)
+            if len(self.warmup) < self.period: return (math.nan,)
+            self.value = sum(self.warmup) / self.period
+        else: self.value += (tr - self.value) / self.period
+        return (self.value,)
+
+
+# Named presets offered by the Live Chart tab
+OVERLAYS = {"SMA 20": lambda: SMA(20), "EMA 50": lambda: EMA(50), "Bollinger 20": lambda: Bollinger(20, 2.0), "VWAP": VWAP}
+OSCILLATORS = {"RSI 14": lambda: RSI(14), "MACD": lambda: MACD(12, 26, 9), "ATR 14": lambda: ATR(14)}
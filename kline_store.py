@@ -0,0 +1,57 @@
+"""On-disk candle store keyed by (symbol, interval), backed by SQLite in WAL mode.
+
+Only closed candles are stored; the forming candle is always taken from the
+network. Rows are (open_time, open, high, low, close, volume, close_time) with
+times in epoch milliseconds, matching Binance's kline layout.
+"""
+import sqlite3
+import threading
+
+KLINE_DB_FILE = "klines.db"
+
+_SCHEMA = """CREATE TABLE IF NOT EXISTS klines (
+    symbol TEXT NOT NULL, interval TEXT NOT NULL, open_time INTEGER NOT NULL,
+    open REAL NOT NULL, high REAL NOT NULL, low REAL NOT NULL, close REAL NOT NULL, volume REAL NOT NULL,
+    close_time INTEGER NOT NULL,
+    PRIMARY KEY (symbol, interval, open_time)
+) WITHOUT ROWID"""
+
+
+class KlineStore:
+    def __init__(self, fp=KLINE_DB_FILE):
+        self.fp = fp; self.lock = threading.Lock()
+        self.conn = sqlite3.connect(fp, check_same_thread=False)
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL"); self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(_SCHEMA); self.conn.commit()
+
+    def add(self, symbol, interval, rows):
+        """Inserts or replaces closed candles; `rows` are (open_time, o, h, l, c, v, close_time) tuples."""
+        if not rows: return
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO klines VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                  [(symbol.upper(), interval, *row) for row in rows])
+            self.conn.commit()
+
+    def last_open_time(self, symbol, interval):
+        with self.lock:
+            return self.conn.execute("SELECT MAX(open_time) FROM klines WHERE symbol=? AND interval=?", (symbol.upper(), interval)).fetchone()[0]
+
+    def first_open_time(self, symbol, interval):
+        with self.lock:
+            return self.conn.execute("SELECT MIN(open_time) FROM klines WHERE symbol=? AND interval=?", (symbol.upper(), interval)).fetchone()[0]
+
+    def count(self, symbol, interval):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM klines WHERE symbol=? AND interval=?", (symbol.upper(), interval)).fetchone()[0]
+
+    def load(self, symbol, interval, limit, since=None):
+        """Returns the newest `limit` candles (oldest first), optionally only those opened at or after `since`."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT open_time, open, high, low, close, volume, close_time FROM klines WHERE symbol=? AND interval=? AND open_time>=? "
+                "ORDER BY open_time DESC LIMIT ?", (symbol.upper(), interval, since or 0, limit)).fetchall()
+        rows.reverse(); return rows
+
+    def close(self):
+        with self.lock: self.conn.close()
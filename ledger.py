@@ -0,0 +1,125 @@
+"""Append-only transaction ledger, backed by SQLite in WAL mode.
+
+Each logged trade is one INSERT committed on its own, so saving costs the same
+with ten transactions or a hundred thousand and a crash can at worst lose the
+trade being written, never the ones before it. Rows are never updated or
+deleted; lookups by symbol and date use indexes. Transactions come back as the
+dicts the rest of the app uses: {"date", "symbol", "type", "qty", "price"}, with
+`symbol` the base asset (e.g. "BTC") and `date` an ISO-8601 string.
+
+Exchange trade-history exports can be bulk imported from CSV; importing the
+same file twice adds nothing the second time.
+"""
+import csv
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+from portfolio import QUOTE_ASSET
+
+LEDGER_DB_FILE = "ledger.db"
+
+_SCHEMA = ("""CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY, date TEXT NOT NULL, symbol TEXT NOT NULL, type TEXT NOT NULL CHECK (type IN ('Buy', 'Sell')),
+    qty REAL NOT NULL, price REAL NOT NULL, source TEXT NOT NULL DEFAULT 'manual', external_id TEXT,
+    UNIQUE (source, external_id)
+)""", "CREATE INDEX IF NOT EXISTS transactions_symbol_date ON transactions (symbol, date)",
+    "CREATE INDEX IF NOT EXISTS transactions_date ON transactions (date)")
+_COLUMNS = "date, symbol, type, qty, price"
+_NUMBER = re.compile(r"[-+]?[\d,]*\.?\d+(?:[eE][-+]?\d+)?")
+
+# Header names used by Binance's spot trade-history exports (old and new layouts)
+_CSV_FIELDS = {"date": ("Date(UTC)", "Date(UTC+0)", "Date"), "pair": ("Pair", "Market", "Symbol"), "side": ("Side", "Type"),
+               "price": ("Price",), "qty": ("Executed", "Amount", "Quantity")}
+
+
+def _tx_row(tx): return (tx['date'], tx['symbol'].upper(), tx['type'], float(tx['qty']), float(tx['price']))
+
+
+class Ledger:
+    def __init__(self, fp=LEDGER_DB_FILE):
+        self.fp = fp; self.lock = threading.Lock()
+        self.conn = sqlite3.connect(fp, check_same_thread=False)
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL"); self.conn.execute("PRAGMA synchronous=FULL")  # A logged trade must survive power loss
+            for statement in _SCHEMA: self.conn.execute(statement)
+            self.conn.commit()
+
+    def __len__(self):
+        with self.lock: return self.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def append(self, tx, source="manual", external_id=None):
+        """Durably records one transaction; returns False if (source, external_id) was already recorded."""
+        return self.extend([(tx, external_id)], source) == 1
+
+    def extend(self, entries, source):
+        """Records (tx, external_id) pairs in a single atomic commit; returns how many were new."""
+        with self.lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(f"INSERT OR IGNORE INTO transactions ({_COLUMNS}, source, external_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                  [(*_tx_row(tx), source, ext) for tx, ext in entries])
+            return self.conn.total_changes - before
+
+    def query(self, symbol=None, since=None, until=None):
+        """Transactions oldest first, optionally for one asset and/or with `since` <= date < `until` (ISO strings)."""
+        where, args = [], []
+        if symbol: where.append("symbol = ?"); args.append(symbol.upper())
+        if since: where.append("date >= ?"); args.append(since)
+        if until: where.append("date < ?"); args.append(until)
+        sql = f"SELECT {_COLUMNS} FROM transactions{' WHERE ' + ' AND '.join(where) if where else ''} ORDER BY date, id"
+        with self.lock: rows = self.conn.execute(sql, args).fetchall()
+        return [{"date": d, "symbol": s, "type": t, "qty": q, "price": p} for d, s, t, q, p in rows]
+
+    def all(self): return self.query()
+
+    def symbols(self):
+        with self.lock: return [r[0] for r in self.conn.execute("SELECT DISTINCT symbol FROM transactions ORDER BY symbol")]
+
+    def migrate_config(self, settings):
+        """Moves the `transactions` list out of a SettingsManager's config into the ledger; returns how many were new.
+
+        Rows are keyed by their content, so a migration interrupted before the config was rewritten can simply run again.
+        """
+        transactions = settings.config.get("transactions")
+        if transactions is None: return 0
+        entries = [(tx, f"{i}:{hashlib.sha1(json.dumps(tx, sort_keys=True).encode()).hexdigest()}") for i, tx in enumerate(transactions)]
+        added = self.extend(entries, "config")
+        del settings.config["transactions"]; settings.save()
+        return added
+
+    def import_csv(self, path, quote=QUOTE_ASSET):
+        """Imports a trade-history CSV; returns (imported, duplicates, skipped).
+
+        Rows for pairs not quoted in `quote` are skipped because the portfolio values holdings in that asset only.
+        """
+        entries, skipped, seen = [], 0, {}
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            columns = {key: next((h for h in names if h in (reader.fieldnames or ())), None) for key, names in _CSV_FIELDS.items()}
+            missing = [key for key, header in columns.items() if header is None]
+            if missing: raise ValueError(f"{path}: no column for {', '.join(missing)} (found {', '.join(reader.fieldnames or ())})")
+            for row in reader:
+                tx = self._parse_csv_row(row, columns, quote)
+                if tx is None: skipped += 1; continue
+                # Identical fills in one export stay distinct through their occurrence count
+                digest = hashlib.sha1("\x1f".join(row[h] or "" for h in reader.fieldnames).encode()).hexdigest()
+                seen[digest] = seen.get(digest, 0) + 1; entries.append((tx, f"{digest}#{seen[digest]}"))
+        imported = self.extend(entries, "csv")
+        return imported, len(entries) - imported, skipped
+
+    @staticmethod
+    def _parse_csv_row(row, columns, quote):
+        pair = (row[columns["pair"]] or "").upper().replace("/", "").replace("-", "").strip()
+        side = (row[columns["side"]] or "").strip().capitalize()
+        if side not in ("Buy", "Sell") or not pair.endswith(quote) or len(pair) == len(quote): return None
+        price, qty = (_NUMBER.search(row[columns[k]] or "") for k in ("price", "qty"))  # Binance appends the asset, e.g. "0.5BTC"
+        if price is None or qty is None: return None
+        try: date = datetime.fromisoformat(row[columns["date"]].strip()).isoformat()
+        except ValueError: return None
+        return {"date": date, "symbol": pair[:-len(quote)], "type": side, "qty": float(qty.group().replace(",", "")), "price": float(price.group().replace(",", ""))}
+
+    def close(self):
+        with self.lock: self.conn.close()
@@ -0,0 +1,147 @@
+"""Retained-figure candlestick chart for the Live Chart tab.
+
+The figure, axes and artists are created once. Loading history rebuilds the
+closed-candle collections in place, and ticks on the forming candle only touch
+three animated artists that are blitted over a cached background, so a tick
+costs a partial repaint instead of a new figure. Indicator lines are seeded
+once per history load and extended in O(1) whenever a candle closes.
+"""
+from datetime import datetime, timezone
+
+import numpy as np
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.gridspec import GridSpec
+from matplotlib.lines import Line2D
+from matplotlib.patches import Rectangle
+from matplotlib.ticker import FuncFormatter, MaxNLocator
+
+from ohlcv import OHLCVBuffer, RingBuffer, TIME, OPEN, HIGH, LOW, CLOSE, VOLUME
+
+# Same market colours as mplfinance's 'nightclouds' style used previously
+COLOR_UP, COLOR_DOWN = "#FFFFFF", "#0095FF"
+BODY_WIDTH = 0.6
+Y_MARGIN = 0.05
+LINE_COLORS = ("#F5A623", "#BD10E0", "#50E3C2", "#B8E986", "#F8E71C")
+
+
+class LiveCandleChart:
+    def __init__(self, master, theme, capacity):
+        self.theme = theme; self.buffer = OHLCVBuffer(capacity); self.background = None; self.indicators = []
+        self.fig = Figure(figsize=(10, 6), facecolor=theme['root_bg'])
+        gs = GridSpec(6, 1, figure=self.fig, hspace=0.05, left=0.03, right=0.92, top=0.93, bottom=0.08)
+        self.ax_price = self.fig.add_subplot(gs[:4]); self.ax_vol = self.fig.add_subplot(gs[4], sharex=self.ax_price)
+        self.ax_ind = self.fig.add_subplot(gs[5], sharex=self.ax_price)
+        for ax in (self.ax_price, self.ax_vol, self.ax_ind):
+            ax.set_facecolor(theme['content_bg']); ax.yaxis.tick_right(); ax.grid(True, color=theme['border'], linewidth=0.5)
+            ax.tick_params(colors=theme['text'], labelsize=8)
+            for spine in ax.spines.values(): spine.set_color(theme['border'])
+        self.ax_price.tick_params(labelbottom=False); self.ax_vol.tick_params(labelbottom=False)
+        self.ax_ind.xaxis.set_major_locator(MaxNLocator(8, integer=True)); self.ax_ind.xaxis.set_major_formatter(FuncFormatter(self._format_time))
+        self.title = self.ax_price.set_title("", color=theme['text'], fontsize=11)
+        self.wicks = self.ax_price.add_collection(LineCollection([], linewidths=1, zorder=1))
+        self.bodies = self.ax_price.add_collection(PolyCollection([], linewidths=0.5, zorder=2))
+        self.vol_bars = self.ax_vol.add_collection(PolyCollection([], linewidths=0))
+        # The forming candle is drawn separately so ticks can be blitted
+        self.live_wick = self.ax_price.add_line(Line2D([], [], linewidth=1, animated=True))
+        self.live_body = self.ax_price.add_patch(Rectangle((0, 0), BODY_WIDTH, 0, linewidth=0.5, animated=True))
+        self.live_vol = self.ax_vol.add_patch(Rectangle((0, 0), BODY_WIDTH, 0, linewidth=0, animated=True))
+        self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def widget(self): return self.canvas.get_tk_widget()
+
+    def _format_time(self, x, pos=None):
+        i = int(round(x)); times = self.buffer.view(TIME)
+        if not 0 <= i < len(times): return ""
+        return datetime.fromtimestamp(times[i] / 1000, tz=timezone.utc).strftime("%m-%d %H:%M")
+
+    def set_data(self, rows, title, capacity=None):
+        """Replaces the series with `rows` of (open_time_ms, o, h, l, c, v) and redraws once; `capacity` resizes the window."""
+        if capacity is not None and capacity != self.buffer.capacity:
+            self.buffer = OHLCVBuffer(capacity); self.indicators = [(ind, RingBuffer(capacity, len(ind.outputs)), lines) for ind, _, lines in self.indicators]
+        self.buffer.load(rows); self.title.set_text(title); self._seed_indicators(); self.rebuild()
+
+    def set_indicators(self, indicators):
+        """Shows `indicators` (see indicators.py): overlays on the price pane, the rest in the bottom pane."""
+        for _, _, lines in self.indicators:
+            for line in lines: line.remove()
+        self.indicators = []; colors = 0
+        for ind in indicators:
+            ax = self.ax_price if ind.overlay else self.ax_ind
+            lines = [ax.plot([], [], linewidth=1, label=name, color=LINE_COLORS[(colors + j) % len(LINE_COLORS)])[0] for j, name in enumerate(ind.outputs)]
+            colors += len(lines)
+            self.indicators.append((ind, RingBuffer(self.buffer.capacity, len(ind.outputs)), lines))
+        self._seed_indicators(); self.rebuild()
+
+    def _seed_indicators(self):
+        # Indicators cover closed candles only; the forming candle's slot holds NaN until it closes
+        closed = self.buffer.view()[:, :-1]
+        for ind, values, _ in self.indicators:
+            values.load([*ind.seed(closed).T, [np.nan] * len(ind.outputs)] if len(self.buffer) else [])
+
+    def apply_tail(self, closed, forming):
+        """Applies the forming candle from candles.CandleAggregator.tail(); when it opens a new candle, the
+        final values of the one it replaces (`closed`) are applied first."""
+        if not len(self.buffer) or forming is None: return
+        last = self.buffer.last(TIME)
+        if closed is not None and closed[0] == last < forming[0]: self.update(*closed[:6])
+        self.update(*forming[:6])
+
+    def update(self, t, o, h, l, c, v):
+        """Applies a tick to the forming candle; closes it and starts a new one when `t` is newer."""
+        if not len(self.buffer): return
+        appended = self.buffer.upsert(t, o, h, l, c, v)
+        if appended:
+            closed = self.buffer.view()[:, -2]
+            for ind, values, _ in self.indicators: values.update_last(*ind.update(closed)); values.append(*[np.nan] * len(ind.outputs))
+        ymin, ymax = self.ax_price.get_ylim()
+        if appended or h > ymax or l < ymin or v > self.ax_vol.get_ylim()[1]: self.rebuild(); return
+        self._update_live(); self._blit()
+
+    def rebuild(self):
+        data = self.buffer.view(); n = data.shape[1]
+        if not n: return
+        x = np.arange(n - 1); o, h, l, c, v = data[OPEN, :-1], data[HIGH, :-1], data[LOW, :-1], data[CLOSE, :-1], data[VOLUME, :-1]
+        colors = np.where(c >= o, COLOR_UP, COLOR_DOWN)
+        left, right = x - BODY_WIDTH / 2, x + BODY_WIDTH / 2
+        bottom, top = np.minimum(o, c), np.maximum(o, c)
+        self.bodies.set_verts(np.stack([np.column_stack(p) for p in ((left, bottom), (left, top), (right, top), (right, bottom))], axis=1))
+        self.bodies.set_facecolors(colors); self.bodies.set_edgecolors(colors)
+        self.wicks.set_segments(np.stack([np.column_stack((x, l)), np.column_stack((x, h))], axis=1)); self.wicks.set_colors(colors)
+        zeros = np.zeros_like(v)
+        self.vol_bars.set_verts(np.stack([np.column_stack(p) for p in ((left, zeros), (left, v), (right, v), (right, zeros))], axis=1))
+        self.vol_bars.set_facecolors(colors)
+        x = np.arange(n); overlays, osc = [data[LOW], data[HIGH]], []
+        for ind, values, lines in self.indicators:
+            for j, line in enumerate(lines): line.set_data(x, values.view(j))
+            (overlays if ind.overlay else osc).append(values.view().ravel())
+        lo, hi = self._finite_range(overlays); pad = (hi - lo) * Y_MARGIN or hi * Y_MARGIN or 1
+        self.ax_price.set_xlim(-1, n); self.ax_price.set_ylim(lo - pad, hi + pad * 3)
+        self.ax_vol.set_ylim(0, (data[VOLUME].max() or 1) * 1.2)
+        if osc: lo, hi = self._finite_range(osc); pad = (hi - lo) * Y_MARGIN or 1; self.ax_ind.set_ylim(lo - pad, hi + pad)
+        self._update_live(); self.canvas.draw_idle()
+
+    @staticmethod
+    def _finite_range(blocks):
+        values = np.concatenate(blocks); values = values[np.isfinite(values)]
+        return (values.min(), values.max()) if values.size else (0.0, 1.0)
+
+    def _update_live(self):
+        x = len(self.buffer) - 1; o, h, l, c, v = (self.buffer.last(f) for f in (OPEN, HIGH, LOW, CLOSE, VOLUME))
+        color = COLOR_UP if c >= o else COLOR_DOWN
+        self.live_wick.set_data([x, x], [l, h]); self.live_wick.set_color(color)
+        self.live_body.set_bounds(x - BODY_WIDTH / 2, min(o, c), BODY_WIDTH, abs(c - o)); self.live_body.set_color(color)
+        self.live_vol.set_bounds(x - BODY_WIDTH / 2, 0, BODY_WIDTH, v); self.live_vol.set_color(color)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox); self._draw_live()
+
+    def _draw_live(self):
+        for artist in (self.live_wick, self.live_body): self.ax_price.draw_artist(artist)
+        self.ax_vol.draw_artist(self.live_vol)
+
+    def _blit(self):
+        if self.background is None: self.canvas.draw_idle(); return
+        self.canvas.restore_region(self.background); self._draw_live(); self.canvas.blit(self.fig.bbox)
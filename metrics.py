@@ -0,0 +1,234 @@
+"""Hot-path instrumentation: per-stage latency histograms, counters and a sampling profiler.
+
+Components register the methods worth timing once, at construction:
+
+    METRICS.register(api.decoder, decode="decode")
+
+Nothing is wrapped while instrumentation is off, so the hot path then runs the
+original methods with no added cost at all. `enable()` swaps each registered
+method for a timed wrapper on that instance (and `disable()` puts the original
+back); every call then lands in a fixed-bucket histogram for its stage, from
+which counts, rates and percentiles are derived. Collectors expose counters the
+components already keep (drain, decoder and REST stats) at snapshot time.
+
+Snapshots can be exported as Prometheus text (e.g. for node_exporter's textfile
+collector) or JSON, once or periodically, and `SamplingProfiler` records the
+stacks of every thread on demand, which cProfile (one thread only) cannot.
+Set CRYPTO_METRICS=1 to start with instrumentation on, and CRYPTO_METRICS_DUMP
+to a .prom or .json path to dump every CRYPTO_METRICS_EVERY seconds.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+# Upper bucket bounds in seconds, from a fast decode to a stalled REST call; one more bucket catches the rest
+BUCKETS = (5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DUMP_EVERY = 10.0
+PROFILE_INTERVAL = 0.005  # Seconds between stack samples
+PREFIX = "crypto"
+
+
+class Histogram:
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds; self.lock = threading.Lock(); self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1); self.count = 0; self.sum = 0.0; self.max = 0.0
+
+    def observe(self, seconds):
+        i = bisect_left(self.bounds, seconds)
+        with self.lock:
+            self.counts[i] += 1; self.count += 1; self.sum += seconds
+            if seconds > self.max: self.max = seconds
+
+    def quantile(self, q):
+        """Estimated from the buckets, interpolating linearly inside the one holding the q-th observation."""
+        with self.lock: counts, total, top = list(self.counts), self.count, self.max
+        if not total: return 0.0
+        rank, seen = q * total, 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                lo = self.bounds[i - 1] if i else 0.0; hi = self.bounds[i] if i < len(self.bounds) else top
+                return min(lo + (hi - lo) * (rank - seen) / n, top)
+            seen += n
+        return top
+
+    def summary(self):
+        with self.lock: count, total, top = self.count, self.sum, self.max
+        return {"count": count, "mean": total / count if count else 0.0, "p50": self.quantile(0.5), "p95": self.quantile(0.95),
+                "p99": self.quantile(0.99), "max": top, "sum": total}
+
+
+def _process_stats():
+    stats = {"threads": threading.active_count()}
+    try:
+        with open("/proc/self/status") as f: stats["rss_bytes"] = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmRSS:"))
+    except (OSError, StopIteration): pass  # Not Linux: RSS is left out rather than reported as the peak
+    return stats
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False; self.lock = threading.RLock()
+        self.histograms, self.collectors, self.points = {}, {"process": _process_stats}, []  # points: [obj, attr, stage, original]
+        self.started = time.monotonic(); self.dumper, self.dumper_stopped = None, None
+
+    def histogram(self, stage):
+        hist = self.histograms.get(stage)
+        if hist is None:
+            with self.lock: hist = self.histograms.setdefault(stage, Histogram())
+        return hist
+
+    def observe(self, stage, seconds):
+        if self.enabled: self.histogram(stage).observe(seconds)
+
+    def register(self, obj, **stages):
+        """Registers methods of `obj` to be timed while enabled, as attr=stage; wrapped right away if already enabled."""
+        with self.lock:
+            for attr, stage in stages.items():
+                point = [obj, attr, stage, None]; self.points.append(point)
+                if self.enabled: self._wrap(point)
+
+    def unregister(self, *objs):
+        """Drops every point registered on `objs` (restoring their methods if wrapped), e.g. when a component is closed."""
+        with self.lock:
+            for point in [p for p in self.points if any(p[0] is obj for obj in objs)]:
+                if point[3] is not None: self._unwrap(point)
+                self.points.remove(point)
+
+    def add_collector(self, name, fn):
+        """`fn()` returns a dict of numbers, read at snapshot time only."""
+        self.collectors[name] = fn
+
+    def _wrap(self, point):
+        obj, attr, stage, _ = point; fn = getattr(obj, attr); hist = self.histogram(stage); clock = time.perf_counter
+        def timed(*args, **kwargs):
+            start = clock()
+            try: return fn(*args, **kwargs)
+            finally: hist.observe(clock() - start)
+        point[3] = (fn, attr in vars(obj)); setattr(obj, attr, timed)
+
+    def _unwrap(self, point):
+        obj, attr, _, (fn, own) = point; point[3] = None
+        if own: setattr(obj, attr, fn)
+        else: delattr(obj, attr)  # Back to the class method
+
+    def enable(self):
+        with self.lock:
+            if self.enabled: return
+            self.enabled = True
+            for point in self.points: self._wrap(point)
+
+    def disable(self):
+        with self.lock:
+            if not self.enabled: return
+            self.enabled = False
+            for point in self.points: self._unwrap(point)
+
+    def reset(self):
+        for hist in list(self.histograms.values()):
+            with hist.lock: hist.reset()
+        self.started = time.monotonic()
+
+    def snapshot(self):
+        """Per-stage summaries (seconds) and collector values, as plain dicts."""
+        counters = {}
+        for name, fn in list(self.collectors.items()):
+            try: counters[name] = {k: v for k, v in fn().items() if isinstance(v, (int, float))}
+            except Exception as e: counters[name] = {"error": str(e)}  # A broken collector must not take the export down
+        return {"time": time.time(), "uptime": time.monotonic() - self.started, "enabled": self.enabled,
+                "stages": {stage: hist.summary() for stage, hist in sorted(self.histograms.items())}, "counters": counters}
+
+    def prometheus(self):
+        """The current state in the Prometheus text exposition format."""
+        lines = [f"# TYPE {PREFIX}_stage_seconds histogram"]
+        for stage, hist in sorted(self.histograms.items()):
+            with hist.lock: counts, count, total = list(hist.counts), hist.count, hist.sum
+            cumulative = 0
+            for bound, n in zip((*hist.bounds, "+Inf"), counts):
+                cumulative += n; lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines += [f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {total}', f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {count}']
+        for name, values in self.snapshot()["counters"].items():
+            lines += [f"{PREFIX}_{name}_{key} {value}" for key, value in sorted(values.items()) if isinstance(value, (int, float))]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """Writes Prometheus text (for a .prom path) or JSON atomically, so scrapers never read half a file."""
+        text = self.prometheus() if path.endswith(".prom") else json.dumps(self.snapshot(), indent=1)
+        with open(path + ".tmp", "w") as f: f.write(text)
+        os.replace(path + ".tmp", path)
+
+    def start_dump(self, path, every=DUMP_EVERY, log_cb=print):
+        """Dumps to `path` every `every` seconds on a background thread, replacing any dumper already running."""
+        stopped = threading.Event()
+        def run():
+            while not stopped.wait(every):
+                try: self.dump(path)
+                except OSError as e: log_cb(f"Metrics dump to {path} failed: {e}")
+        with self.lock:
+            self.stop_dump(); self.dumper_stopped = stopped
+            self.dumper = threading.Thread(target=run, daemon=True, name="metrics-dump"); self.dumper.start()
+
+    def stop_dump(self):
+        with self.lock:
+            if self.dumper_stopped is not None: self.dumper_stopped.set()
+            self.dumper, self.dumper_stopped = None, None
+
+    def configure_from_env(self, log_cb=print):
+        if os.environ.get("CRYPTO_METRICS", "") not in ("", "0"): self.enable()
+        path = os.environ.get("CRYPTO_METRICS_DUMP")
+        if not path: return
+        raw = os.environ.get("CRYPTO_METRICS_EVERY", ""); every = DUMP_EVERY
+        if raw:
+            try: every = float(raw)
+            except ValueError: every = None
+            if every is None or not 0 < every < float("inf"):
+                log_cb(f"Ignoring CRYPTO_METRICS_EVERY={raw!r}, not a positive number of seconds; dumping every {DUMP_EVERY:g}s"); every = DUMP_EVERY
+        self.enable(); self.start_dump(path, every, log_cb)
+
+
+class SamplingProfiler:
+    """Samples the stack of every thread each `interval` seconds from a background thread."""
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval; self.stacks = Counter(); self.samples = 0; self.running = False; self.thread = None
+
+    def start(self):
+        self.running = True; self.thread = threading.Thread(target=self._run, daemon=True, name="profiler"); self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False; self.thread.join()
+        return self
+
+    def _run(self):
+        me = threading.get_ident()
+        while self.running:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me: continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code; stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"); frame = frame.f_back
+                self.stacks[(names.get(ident, str(ident)), tuple(reversed(stack)))] += 1
+            self.samples += 1; time.sleep(self.interval)
+
+    def folded(self):
+        """"thread;outer;...;inner count" lines, the input format of flamegraph.pl and speedscope."""
+        return "".join(f"{';'.join((thread, *stack))} {n}\n" for (thread, stack), n in self.stacks.most_common())
+
+    def top(self, n=20, thread=None):
+        """[(function, own samples, inclusive samples)] by own samples, optionally for one thread name."""
+        own, inclusive = Counter(), Counter()
+        for (name, stack), count in self.stacks.items():
+            if thread and name != thread or not stack: continue
+            own[stack[-1]] += count
+            for fn in set(stack): inclusive[fn] += count
+        return [(fn, count, inclusive[fn]) for fn, count in own.most_common(n)]
+
+
+METRICS = Metrics()  # Shared by everything in the process
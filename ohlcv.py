@@ -0,0 +1,50 @@
+"""Preallocated OHLCV ring buffer shared by the live chart and indicator code."""
+import numpy as np
+
+TIME, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+
+class RingBuffer:
+    """Fixed-capacity buffer of rows with `fields` float columns.
+
+    Each row is written twice, at slot i and i + capacity, so the newest rows
+    are always one contiguous NumPy view and appending never copies or shifts.
+    """
+
+    def __init__(self, capacity, fields):
+        self.capacity = capacity; self.data = np.zeros((fields, 2 * capacity))
+        self.head = 0; self.size = 0
+
+    def __len__(self): return self.size
+
+    def clear(self): self.head = self.size = 0
+
+    def load(self, rows):
+        self.clear()
+        for row in rows[-self.capacity:]: self.append(*row[:self.data.shape[0]])
+
+    def append(self, *row):
+        i = self.head; self.data[:, i] = self.data[:, i + self.capacity] = row
+        self.head = (i + 1) % self.capacity; self.size = min(self.size + 1, self.capacity)
+
+    def update_last(self, *row):
+        i = (self.head - 1) % self.capacity; self.data[:, i] = self.data[:, i + self.capacity] = row
+
+    def last(self, field): return self.data[field, (self.head - 1) % self.capacity]
+
+    def view(self, field=None):
+        """Rows oldest-first as a zero-copy view, either one field or the full (fields, size) block."""
+        end = self.head + self.capacity; block = self.data[:, end - self.size:end]
+        return block if field is None else block[field]
+
+
+class OHLCVBuffer(RingBuffer):
+    """Ring buffer of (open_time, open, high, low, close, volume) rows, open_time in epoch ms."""
+
+    def __init__(self, capacity): super().__init__(capacity, 6)
+
+    def upsert(self, t, o, h, l, c, v):
+        """Replaces the newest row if it has the same open time, appends if newer; returns True when a row was appended."""
+        if self.size and t == self.last(TIME): self.update_last(t, o, h, l, c, v); return False
+        if self.size and t < self.last(TIME): return False
+        self.append(t, o, h, l, c, v); return True
@@ -0,0 +1,73 @@
+"""Incremental portfolio accounting, shared by the dashboard and headless tooling.
+
+Positions use the average-cost method: buys add to the cost basis, sells release
+cost at the current average and book the difference as realized P/L. Every new
+transaction and every price tick is applied in O(1); only out-of-order
+transactions (dated before the newest one seen) fall back to a full replay.
+"""
+
+QUOTE_ASSET = "USDT"
+DUST = 1e-9  # Quantities at or below this are treated as a closed position
+
+
+class Position:
+    __slots__ = ("qty", "cost", "realized", "price")
+
+    def __init__(self): self.qty = self.cost = self.realized = self.price = 0.0
+
+    @property
+    def is_open(self): return self.qty > DUST
+    @property
+    def avg_cost(self): return self.cost / self.qty if self.is_open else 0.0
+    @property
+    def value(self): return self.qty * self.price if self.is_open else 0.0
+    @property
+    def unrealized(self): return self.value - self.cost if self.is_open and self.price > 0 else 0.0
+
+
+class PortfolioEngine:
+    def __init__(self, transactions=(), prices=None, quote=QUOTE_ASSET):
+        self.quote = quote; self.prices = dict(prices or {})
+        self._load(transactions)
+
+    def _load(self, transactions):
+        self.positions, self.total_value, self.last_date = {}, 0.0, ""
+        for tx in sorted(transactions, key=lambda x: x['date']): self._apply(tx)
+
+    def _position(self, asset):
+        pos = self.positions.get(asset)
+        if pos is None:
+            pos = self.positions[asset] = Position()
+            pos.price = self.prices.get(f"{asset}{self.quote}", 0.0)
+        return pos
+
+    def _apply(self, tx):
+        pos = self._position(tx['symbol']); old_value = pos.value
+        q, p = tx['qty'], tx['price']
+        if tx['type'] == 'Buy': pos.cost += q * p; pos.qty += q
+        else:
+            sold, avg = min(q, max(pos.qty, 0.0)), pos.avg_cost
+            pos.realized += sold * (p - avg); pos.cost -= sold * avg; pos.qty -= q
+            if not pos.is_open: pos.cost = 0.0
+        self.total_value += pos.value - old_value; self.last_date = max(self.last_date, tx['date'])
+
+    def add_transaction(self, tx, history):
+        """Applies one new transaction; `history` is the full list (including tx) used only for out-of-order replay."""
+        if tx['date'] >= self.last_date: self._apply(tx)
+        else: self._load(history)
+        return tx['symbol']
+
+    def apply_price(self, pair, price):
+        """Records a price tick for a trading pair and returns the held asset it revalued, if any."""
+        self.prices[pair] = price
+        if not pair.endswith(self.quote): return None
+        pos = self.positions.get(pair[:-len(self.quote)])
+        if pos is None: return None
+        old_value = pos.value; pos.price = price
+        self.total_value += pos.value - old_value
+        return pair[:-len(self.quote)]
+
+    @property
+    def realized(self): return sum(pos.realized for pos in self.positions.values())
+    @property
+    def unrealized(self): return sum(pos.unrealized for pos in self.positions.values())
@@ -0,0 +1,295 @@
+"""Record and replay Binance traffic so the app can be tested and benchmarked offline.
+
+A session is a JSON-lines file. Each line is either a websocket frame,
+{"t": seconds since start, "ws": "<raw frame>"}, or a REST response,
+{"t": ..., "path": "/api/v3/klines", "params": {...}, "body": <decoded JSON>}.
+
+* `Recorder` attaches to a BinanceAPI and appends everything it receives;
+* `ReplayServer` serves a session on one local port, REST over HTTP and
+  combined streams over a websocket, at 1x, accelerated or maximum speed;
+* `synthesize()` generates a session for any number of pairs, for load tests.
+
+The app is pointed at a replay server through BINANCE_REST_URL / BINANCE_WS_URL:
+
+    python replay.py record --pairs btcusdt,ethusdt --seconds 120 --out session.jsonl
+    python replay.py serve session.jsonl --speed 10 --port 8765
+    BINANCE_REST_URL=http://127.0.0.1:8765 BINANCE_WS_URL=ws://127.0.0.1:8765 python crypto.py
+
+The server only uses the standard library, so it runs on CI boxes without
+network access or extra packages.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import struct
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+HISTORY_INTERVALS = {"1m": 60_000, "5m": 300_000}  # Chart history included in synthetic sessions
+HISTORY_ROWS = 100
+_STREAM_NAME = re.compile(r'\{"stream":"([^"]+)"')
+_EVENT_TIME = re.compile(r'"E":\d+')
+_MATCH_KEYS = ("symbol", "interval")  # Recorded REST entries only stand in for requests with the same values
+
+
+def load_session(path):
+    with open(path) as f: return [json.loads(line) for line in f if line.strip()]
+
+
+def save_session(session, path):
+    with open(path, "w") as f:
+        for entry in session: f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+
+class Recorder:
+    """Appends raw websocket frames and REST responses, with their arrival times, to a session file."""
+
+    def __init__(self, path):
+        self.out = open(path, "a", buffering=1); self.start = time.monotonic(); self.lock = threading.Lock()
+        self.counts = {"ws": 0, "rest": 0}
+
+    def write(self, kind, entry):
+        line = json.dumps({"t": round(time.monotonic() - self.start, 6), **entry}, separators=(",", ":"))
+        with self.lock: self.out.write(line + "\n"); self.counts[kind] += 1
+
+    def attach(self, api):
+        """Wraps `api`'s stream and REST entry points so every frame and response is recorded as it arrives."""
+        on_message, get = api.streams.on_message, api.rest.get
+        def record_frame(raw): self.write("ws", {"ws": raw}); on_message(raw)
+        def record_get(path, params=None):
+            body = get(path, params); self.write("rest", {"path": path, "params": params or {}, "body": body})
+            return body
+        api.streams.on_message, api.rest.get = record_frame, record_get
+        return self
+
+    def close(self):
+        with self.lock: self.out.close()
+
+
+class _WebSocket:
+    """The server side of one RFC 6455 connection: unmasked text frames out, masked client frames in."""
+
+    def __init__(self, sock, rfile):
+        self.sock, self.rfile, self.lock, self.open = sock, rfile, threading.Lock(), True
+
+    def send(self, data, opcode=0x1):
+        if isinstance(data, str): data = data.encode()
+        n = len(data)
+        header = bytes((0x80 | opcode, n)) if n < 126 else struct.pack("!BBH", 0x80 | opcode, 126, n) if n < 65536 else struct.pack("!BBQ", 0x80 | opcode, 127, n)
+        with self.lock: self.sock.sendall(header + data)
+
+    def recv(self):
+        """Returns (opcode, payload) of the next client frame."""
+        b1, b2 = self._read(2); n = b2 & 0x7F
+        if n == 126: n = struct.unpack("!H", self._read(2))[0]
+        elif n == 127: n = struct.unpack("!Q", self._read(8))[0]
+        mask = self._read(4) if b2 & 0x80 else b"\0\0\0\0"
+        return b1 & 0x0F, bytes(b ^ mask[i % 4] for i, b in enumerate(self._read(n)))
+
+    def _read(self, n):
+        data = self.rfile.read(n)
+        if len(data) < n: raise ConnectionError("client closed the connection")
+        return data
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    replay = None  # Set on a per-server subclass
+
+    def log_message(self, *args): pass
+
+    def do_GET(self):
+        url = urlsplit(self.path); params = dict(parse_qsl(url.query))
+        if self.headers.get("Upgrade", "").lower() == "websocket": self._stream(params); return
+        body = self.replay.find_response(url.path, params); status = 200
+        if body is None: status, body = 404, {"code": -1, "msg": f"{url.path} is not in the replayed session"}
+        data = json.dumps(body, separators=(",", ":")).encode()
+        self.send_response(status); self.send_header("Content-Type", "application/json"); self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-MBX-USED-WEIGHT-1M", "1"); self.end_headers(); self.wfile.write(data)
+
+    def _stream(self, params):
+        accept = base64.b64encode(hashlib.sha1((self.headers["Sec-WebSocket-Key"] + WS_GUID).encode()).digest()).decode()
+        self.send_response(101); self.send_header("Upgrade", "websocket"); self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept); self.end_headers(); self.wfile.flush(); self.close_connection = True
+        ws, streams = _WebSocket(self.connection, self.rfile), set(filter(None, params.get("streams", "").split("/")))
+        threading.Thread(target=self.replay.control_loop, args=(ws, streams), daemon=True, name="replay-control").start()
+        self.replay.play(ws, streams)
+
+
+class ReplayServer:
+    """Serves a session on one local port: REST responses over HTTP and combined streams over a websocket.
+
+    `speed` scales the recorded timing (1 = real time, 10 = ten times faster, 0 = as fast as possible). Every
+    websocket connection plays the frames from the start, filtered to the streams it subscribed to. With `stamp`,
+    each frame's event time "E" is rewritten to the moment it is sent, so clients can measure end-to-end latency.
+    """
+
+    def __init__(self, session, speed=1.0, host="127.0.0.1", port=0, loop=False, stamp=True):
+        self.speed, self.loop, self.stamp, self.running = speed, loop, stamp, False
+        self.frames = sorted((e["t"], m.group(1), e["ws"]) for e in session if "ws" in e for m in [_STREAM_NAME.match(e["ws"])] if m)
+        self.rest = {}
+        for e in session:
+            if "path" in e: self.rest.setdefault(e["path"], []).append(({k: str(v) for k, v in e.get("params", {}).items()}, e["body"]))
+        self.stats = {"connections": 0, "frames_sent": 0, "bytes_sent": 0, "rest_requests": 0}
+        self.httpd = ThreadingHTTPServer((host, port), type("Handler", (_Handler,), {"replay": self})); self.httpd.daemon_threads = True
+
+    @property
+    def rest_url(self): return "http://%s:%d" % self.httpd.server_address[:2]
+    @property
+    def ws_url(self): return "ws://%s:%d" % self.httpd.server_address[:2]
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True, name="replay-server").start()
+        return self
+
+    def stop(self):
+        self.running = False; self.httpd.shutdown(); self.httpd.server_close()
+
+    def find_response(self, path, params):
+        """The recorded body standing in for a request: same symbol/interval, most other params in common, latest wins."""
+        self.stats["rest_requests"] += 1; best, best_score = None, -1
+        for recorded, body in self.rest.get(path, ()):
+            if any(k in recorded and k in params and recorded[k] != params[k] for k in _MATCH_KEYS): continue
+            score = sum(params.get(k) == v for k, v in recorded.items())
+            if score >= best_score: best, best_score = body, score
+        if isinstance(best, list) and best and isinstance(best[0], dict) and "symbol" in best[0]:
+            wanted = set(json.loads(params["symbols"])) if "symbols" in params else {params["symbol"]} if "symbol" in params else None
+            if wanted is not None: best = [d for d in best if d["symbol"] in wanted]
+        elif isinstance(best, list) and params.get("limit", "").isdigit(): best = best[-int(params["limit"]):]
+        return best
+
+    def play(self, ws, streams):
+        self.stats["connections"] += 1
+        try:
+            while self.running and ws.open:
+                start = time.monotonic()
+                for t, stream, raw in self.frames:
+                    if not (self.running and ws.open): return
+                    if self.speed:
+                        delay = start + t / self.speed - time.monotonic()
+                        if delay > 0: time.sleep(delay)
+                    if stream not in streams: continue
+                    if self.stamp: raw = _EVENT_TIME.sub(f'"E":{int(time.time() * 1000)}', raw, count=1)
+                    ws.send(raw); self.stats["frames_sent"] += 1; self.stats["bytes_sent"] += len(raw)
+                if not self.loop: break
+            while self.running and ws.open: time.sleep(0.2)  # Stay connected like a quiet market
+        except OSError: pass
+        finally: ws.open = False
+
+    def control_loop(self, ws, streams):
+        """Answers pings and SUBSCRIBE/UNSUBSCRIBE frames the way Binance does."""
+        try:
+            while ws.open:
+                opcode, payload = ws.recv()
+                if opcode == 0x8: break
+                if opcode == 0x9: ws.send(payload, 0xA); continue
+                if opcode != 0x1: continue
+                msg = json.loads(payload)
+                if msg.get("method") == "SUBSCRIBE": streams.update(msg.get("params") or ())
+                elif msg.get("method") == "UNSUBSCRIBE": streams.difference_update(msg.get("params") or ())
+                ws.send(json.dumps({"result": None, "id": msg.get("id")}))
+        except (OSError, ConnectionError, ValueError): pass
+        finally: ws.open = False
+
+
+def _f(x): return f"{x:.8f}"
+
+
+def synthesize(pairs, seconds=60.0, rate=1.0, seed=1):
+    """A session for `pairs`: exchange info, 24h stats and chart history over REST, then per pair `rate` kline
+    frames and one miniTicker frame per second for `seconds`, as a random walk starting now."""
+    rng = random.Random(seed); now = int(time.time() * 1000); session = []
+    symbols = [p.upper() for p in pairs]; prices = {s: rng.uniform(0.01, 50_000) for s in symbols}
+    session.append({"t": 0, "path": "/api/v3/exchangeInfo", "params": {}, "body": {"symbols": [
+        {"symbol": s, "baseAsset": s[:-4] if s.endswith("USDT") else s[:-3], "quoteAsset": "USDT" if s.endswith("USDT") else s[-3:], "status": "TRADING"}
+        for s in symbols]}})
+    session.append({"t": 0, "path": "/api/v3/ticker/24hr", "params": {}, "body": [
+        {"symbol": s, "closeTime": now, "lastPrice": _f(p), "openPrice": _f(p * 0.98), "highPrice": _f(p * 1.03), "lowPrice": _f(p * 0.97),
+         "volume": _f(rng.uniform(1e3, 1e6)), "quoteVolume": _f(rng.uniform(1e6, 1e9))} for s, p in prices.items()]})
+    for s, p in prices.items():
+        for interval, ms in HISTORY_INTERVALS.items():
+            rows, close = [], p; first = now - now % ms - (HISTORY_ROWS - 1) * ms
+            for i in range(HISTORY_ROWS):
+                o = close; close = o * (1 + rng.gauss(0, 0.002)); t = first + i * ms
+                rows.append([t, _f(o), _f(max(o, close) * 1.001), _f(min(o, close) * 0.999), _f(close), _f(rng.uniform(1, 100)), t + ms - 1, "0", 100, "0", "0", "0"])
+            session.append({"t": 0, "path": "/api/v3/klines", "params": {"symbol": s, "interval": interval}, "body": rows})
+    frames = []
+    for s in symbols:
+        name, price, candle = s.lower(), prices[s], None
+        times = sorted(rng.uniform(0, seconds) for _ in range(int(seconds * rate)))
+        for i, t in enumerate(times):
+            event = now + int(t * 1000); open_time = event - event % 60_000
+            price *= 1 + rng.gauss(0, 0.0005)
+            if candle is None or candle[0] != open_time: candle = [open_time, price, price, price, 0.0]
+            candle[2], candle[3] = max(candle[2], price), min(candle[3], price); candle[4] += rng.expovariate(1.0)
+            closed = i + 1 == len(times) or now + int(times[i + 1] * 1000) - open_time >= 60_000
+            frames.append((t, f'{{"stream":"{name}@kline_1m","data":{{"e":"kline","E":{event},"s":"{s}","k":{{"t":{open_time},"T":{open_time + 59_999},'
+                              f'"s":"{s}","i":"1m","f":1,"L":2,"o":"{_f(candle[1])}","c":"{_f(price)}","h":"{_f(candle[2])}","l":"{_f(candle[3])}",'
+                              f'"v":"{_f(candle[4])}","n":2,"x":{"true" if closed else "false"},"q":"0","V":"0","Q":"0","B":"0"}}}}}}'))
+        for sec in range(int(seconds)):
+            p = prices[s] * (1 + rng.gauss(0, 0.01))
+            frames.append((sec + rng.random(), f'{{"stream":"{name}@miniTicker","data":{{"e":"24hrMiniTicker","E":{now + sec * 1000},"s":"{s}",'
+                                               f'"c":"{_f(p)}","o":"{_f(prices[s] * 0.98)}","h":"{_f(p * 1.01)}","l":"{_f(p * 0.97)}","v":"1000.0","q":"1000000.0"}}}}'))
+    frames.sort(key=lambda f: f[0])
+    session += [{"t": round(t, 6), "ws": raw} for t, raw in frames]
+    return session
+
+
+def _record(args):
+    from core import BinanceAPI
+    pairs = [p.strip().lower() for p in args.pairs.split(",")]
+    api = BinanceAPI(lambda type, data: None, lambda msg: print(msg, file=sys.stderr), lambda status: None, pairs)
+    recorder = Recorder(args.out).attach(api)
+    api.start_initial_fetch(); api.request_symbol_index()
+    for p in pairs:
+        for interval in HISTORY_INTERVALS: api.request_historical_klines(p, interval)
+    api.connect(); end = time.monotonic() + args.seconds
+    try:
+        while time.monotonic() < end: api.process_queue(); time.sleep(0.1)
+    except KeyboardInterrupt: pass
+    finally: api.close(); recorder.close()
+    print(f"Recorded {recorder.counts['ws']:,} frames and {recorder.counts['rest']:,} REST responses to {args.out}")
+
+
+def _serve(args):
+    server = ReplayServer(load_session(args.session), args.speed, args.host, args.port, args.loop).start()
+    print(f"Replaying {len(server.frames):,} frames at {'max' if not args.speed else f'{args.speed:g}x'} speed\n"
+          f"  BINANCE_REST_URL={server.rest_url} BINANCE_WS_URL={server.ws_url}", flush=True)
+    try:
+        while True: time.sleep(1)
+    except KeyboardInterrupt: server.stop()
+
+
+def _synth(args):
+    pairs = [f"coin{i}usdt" for i in range(int(args.pairs))] if args.pairs.isdigit() else [p.strip().lower() for p in args.pairs.split(",")]
+    session = synthesize(pairs, args.seconds, args.rate, args.seed); save_session(session, args.out)
+    print(f"Wrote {sum('ws' in e for e in session):,} frames for {len(pairs)} pairs to {args.out}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record, synthesize and replay Binance sessions for offline testing.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="record live frames and REST responses")
+    rec.add_argument("--pairs", default="btcusdt,ethusdt"); rec.add_argument("--seconds", type=float, default=60.0); rec.add_argument("--out", default="session.jsonl")
+    serve = sub.add_parser("serve", help="replay a session on a local port")
+    serve.add_argument("session"); serve.add_argument("--speed", type=float, default=1.0, help="1 = real time, 0 = as fast as possible")
+    serve.add_argument("--host", default="127.0.0.1"); serve.add_argument("--port", type=int, default=8765); serve.add_argument("--loop", action="store_true")
+    synth = sub.add_parser("synth", help="generate a synthetic session")
+    synth.add_argument("--pairs", default="10", help="a pair count or a comma-separated list"); synth.add_argument("--seconds", type=float, default=60.0)
+    synth.add_argument("--rate", type=float, default=1.0, help="kline frames per second per pair"); synth.add_argument("--seed", type=int, default=1)
+    synth.add_argument("--out", default="session.jsonl")
+    args = parser.parse_args(argv)
+    {"record": _record, "serve": _serve, "synth": _synth}[args.command](args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
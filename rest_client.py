@@ -0,0 +1,74 @@
+"""Pooled, weight-aware REST client for the Binance public API.
+
+One `requests.Session` keeps keep-alive connections to the API host and a small
+thread pool runs calls off the Tk main loop. Identical calls that are still in
+flight share a single future, so repeated Refresh clicks cost one round trip.
+Binance's used-weight headers are tracked and requests pause before the
+per-minute budget would be exceeded; 429/418 responses honour Retry-After.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+REST_WORKERS = 4
+WEIGHT_LIMIT_1M = 6000  # Binance's default REQUEST_WEIGHT limit per minute
+WEIGHT_HEADROOM = 0.9  # Pause once this fraction of the minute's budget is used
+
+
+class RestClient:
+    def __init__(self, base_url, workers=REST_WORKERS, weight_limit=WEIGHT_LIMIT_1M, timeout=10):
+        self.base_url, self.timeout, self.weight_limit = base_url, timeout, weight_limit
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("https://", adapter); self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rest")
+        self.lock = threading.Lock(); self.in_flight = {}
+        self.used_weight, self.weight_window, self.blocked_until = 0, 0, 0.0
+        self.stats = {"requests": 0, "coalesced": 0, "throttled_s": 0.0}
+
+    def _wait_for_budget(self):
+        while True:
+            with self.lock:
+                now = time.time(); window = int(now // 60)
+                if window != self.weight_window: self.weight_window, self.used_weight = window, 0
+                delay = max(self.blocked_until - now, 0.0)
+                if not delay and self.used_weight >= self.weight_limit * WEIGHT_HEADROOM: delay = (window + 1) * 60 - now
+                if not delay: return
+                self.stats["throttled_s"] += delay
+            time.sleep(delay)
+
+    def get(self, path, params=None):
+        """Blocking GET returning the decoded JSON body; raises requests.RequestException on failure."""
+        self._wait_for_budget()
+        res = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+        with self.lock:
+            self.stats["requests"] += 1
+            used = res.headers.get("X-MBX-USED-WEIGHT-1M")
+            if used and used.isdigit(): self.used_weight, self.weight_window = int(used), int(time.time() // 60)
+            if res.status_code in (418, 429):
+                retry_after = res.headers.get("Retry-After", "60")
+                self.blocked_until = time.time() + (int(retry_after) if retry_after.isdigit() else 60)
+        res.raise_for_status()
+        return res.json()
+
+    def submit(self, key, fn, *args):
+        """Runs fn(*args) on the pool, sharing the future with any in-flight call under the same key."""
+        with self.lock:
+            future = self.in_flight.get(key)
+            if future is not None: self.stats["coalesced"] += 1; return future
+            future = self.in_flight[key] = self.executor.submit(fn, *args)
+        future.add_done_callback(lambda f: self._release(key, f))
+        return future
+
+    def _release(self, key, future):
+        with self.lock:
+            if self.in_flight.get(key) is future: del self.in_flight[key]
+
+    def submit_get(self, path, params=None):
+        return self.submit(("GET", path, tuple(sorted((params or {}).items()))), self.get, path, params)
+
+    def close(self):
+        self.executor.shutdown(wait=False); self.session.close()
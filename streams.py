@@ -0,0 +1,197 @@
+"""Sharded websocket stream manager for Binance market streams.
+
+Streams are spread over several combined-stream connections (`/stream?streams=`)
+so no single socket exceeds Binance's per-connection stream limit, and one slow
+or dropped socket only affects its own share. Socket I/O (control frames,
+closes) never happens under the manager lock, so a stalled socket cannot hold
+up the other shards or a caller changing the stream set. Each shard connects with its
+streams already in the URL; later changes are sent as SUBSCRIBE/UNSUBSCRIBE
+frames, paced below the per-connection control-message limit and tracked by
+request id until Binance acknowledges them. A dropped shard reconnects on its
+own with exponential backoff and resubscribes only its own streams.
+"""
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+
+WS_BASE_URL = os.environ.get("BINANCE_WS_URL", "wss://stream.binance.com:9443")  # Overridable to point at a replay server
+MAX_STREAMS_PER_SHARD = 200  # Binance allows 1024; smaller shards keep URLs short and failures contained
+MAX_PARAMS_PER_FRAME = 50
+CONTROL_MSGS_PER_SEC = 4  # Binance disconnects above 5 incoming messages per second per connection
+BACKOFF_INITIAL, BACKOFF_MAX = 1.0, 60.0
+
+
+class _Shard:
+    def __init__(self, manager, index):
+        self.manager, self.index = manager, index
+        self.streams = set()  # Streams this shard should carry
+        self.requested = set()  # Streams in the connect URL or in SUBSCRIBE frames not since unsubscribed
+        self.active = set()  # Streams Binance has confirmed
+        self.pending, self.outbox = {}, deque()
+        self.ws, self.thread, self.stopped = None, None, None  # stopped: the current run's token, set to end that run
+        self.open_ws = None  # self.ws once its handshake is done; closing it earlier leaks the half-made socket
+        self.connected = threading.Event(); self.backoff = BACKOFF_INITIAL; self.next_send = 0.0
+
+    @property
+    def running(self): return self.stopped is not None and not self.stopped.is_set()
+
+    def start(self):
+        # Each run gets its own token, so a thread still winding down from an earlier stop() cannot touch this one
+        with self.manager.lock:
+            if self.running: return
+            self.stopped = threading.Event(); self.thread = threading.Thread(target=self._run, args=(self.stopped,), daemon=True, name=f"ws-shard-{self.index}")
+            self.thread.start()
+
+    def stop(self):
+        """Ends the current run and returns its open socket, for the caller to close once it has released the manager lock.
+
+        A socket still connecting is closed by _on_open instead.
+        """
+        with self.manager.lock:
+            if self.stopped: self.stopped.set()
+            self.connected.clear()  # The old socket's _on_close no longer counts once a new run has replaced self.ws
+            ws, self.open_ws = self.open_ws, None
+            return ws
+
+    def _run(self, stopped):
+        import websocket  # Deferred until the first connection so startup does not pay for it
+        while True:
+            with self.manager.lock:
+                streams = sorted(self.streams)
+                if stopped.is_set() or not streams: break
+                self.requested, self.active = set(streams), set(); self.pending.clear(); self.outbox.clear()
+                ws = self.ws = websocket.WebSocketApp(f"{self.manager.base_url}/stream?streams={'/'.join(streams)}", on_open=lambda ws: self._on_open(ws, stopped),
+                                                      on_message=self._on_message, on_error=self._on_error, on_close=self._on_close)
+            ws.run_forever(ping_interval=20, ping_timeout=10)
+            if stopped.is_set(): break
+            delay = self.backoff * random.uniform(0.5, 1.0); self.backoff = min(self.backoff * 2, BACKOFF_MAX)
+            self.manager.log_cb(f"WebSocket shard {self.index} reconnecting in {delay:.1f}s")
+            if stopped.wait(delay): break
+        stopped.set()  # Ends only this run; a newer one has its own token
+
+    def _on_open(self, ws, stopped):
+        with self.manager.lock:
+            # By its run's own token: after a stop() and start(), self.running is the next run's and would keep this socket
+            stale = ws is not self.ws or stopped.is_set()
+            if not stale: self.open_ws = ws; self.active = set(self.requested); self.backoff = BACKOFF_INITIAL; self._sync(); streams = sorted(self.active)
+        if stale: ws.close(); return  # stop() came while this socket was still connecting
+        self.connected.set(); self.manager.log_cb(f"WebSocket shard {self.index} connected ({len(streams)} streams)"); self.manager._report_status()
+        if self.manager.on_open: self.manager.on_open(streams)
+
+    def _on_message(self, ws, msg):
+        # Market data goes out undecoded so the consumer can filter it before parsing
+        if msg.startswith('{"stream"'): self.manager.on_message(msg); return
+        data = json.loads(msg)
+        if 'id' in data and ('result' in data or 'error' in data): self._on_ack(data); return
+        self.manager.on_message(msg)
+
+    def _on_ack(self, data):
+        with self.manager.lock:
+            method, streams = self.pending.pop(data['id'], (None, []))
+            if 'error' in data: self.manager.log_cb(f"WebSocket shard {self.index} {method} {', '.join(streams)} failed: {data['error']}")
+            elif method == "SUBSCRIBE": self.active.update(streams)
+            elif method == "UNSUBSCRIBE": self.active.difference_update(streams)
+
+    def _on_error(self, ws, err):
+        if ws is self.ws and self.running: self.manager.log_cb(f"WebSocket shard {self.index} error: {err}")
+
+    def _on_close(self, ws, code, msg):
+        with self.manager.lock:
+            if ws is self.open_ws: self.open_ws = None
+        if ws is not self.ws: return
+        self.connected.clear(); self.manager.log_cb(f"WebSocket shard {self.index} closed"); self.manager._report_status()
+
+    def _sync(self):
+        """Queues control frames that move `requested` towards `streams`; caller holds the manager lock."""
+        for method, streams in (("SUBSCRIBE", self.streams - self.requested), ("UNSUBSCRIBE", self.requested - self.streams)):
+            streams = sorted(streams)
+            for i in range(0, len(streams), MAX_PARAMS_PER_FRAME): self.outbox.append((method, streams[i:i + MAX_PARAMS_PER_FRAME]))
+        self.requested = set(self.streams)
+
+    def next_frame(self, now):
+        """Takes at most one queued control frame if this shard's rate allows, as (socket, text) to send outside the
+        manager lock; caller holds it. The frame is in `pending` already, so its ack can never arrive first."""
+        if not self.outbox or not self.connected.is_set() or now < self.next_send: return None
+        method, streams = self.outbox.popleft(); req_id = next(self.manager.ids)
+        self.pending[req_id] = (method, streams); self.next_send = now + 1 / CONTROL_MSGS_PER_SEC
+        return self.ws, json.dumps({"method": method, "params": streams, "id": req_id})
+
+
+class StreamManager:
+    """Keeps a set of streams subscribed across shards; `on_message` receives each market-data frame as raw text.
+
+    `on_open`, if given, is called with a shard's streams each time that shard (re)connects, so callers can
+    refresh anything the stream may have missed while it was down.
+    """
+
+    def __init__(self, on_message, log_cb, status_cb, base_url=WS_BASE_URL, max_streams_per_shard=MAX_STREAMS_PER_SHARD, on_open=None):
+        self.on_message, self.log_cb, self.status_cb, self.on_open = on_message, log_cb, status_cb, on_open
+        self.base_url, self.max_streams_per_shard = base_url, max_streams_per_shard
+        self.lock = threading.RLock(); self.ids = itertools.count(1)
+        self.shards, self.owner = [], {}  # owner: stream name -> shard
+        self.running = False; self.sender = None; self.sender_stopped = None
+
+    def set_streams(self, streams):
+        """Makes the set of subscribed streams equal to `streams`, touching only shards whose share changes."""
+        streams = set(streams); touched = set(); closing = []
+        with self.lock:
+            for name in set(self.owner) - streams:
+                shard = self.owner.pop(name); shard.streams.discard(name); touched.add(shard)
+            for name in streams - set(self.owner):
+                shard = min((s for s in self.shards if len(s.streams) < self.max_streams_per_shard), key=lambda s: len(s.streams), default=None)
+                if shard is None: shard = _Shard(self, len(self.shards)); self.shards.append(shard)
+                shard.streams.add(name); self.owner[name] = shard; touched.add(shard)
+            for shard in touched:
+                if not self.running: continue
+                if not shard.streams: closing.append(shard.stop())
+                elif shard.running: shard._sync()
+                else: shard.start()
+        self._close(closing)
+
+    def start(self):
+        with self.lock:
+            if self.running: return
+            self.running = True
+            for shard in self.shards:
+                if shard.streams: shard.start()
+            self.sender_stopped = threading.Event()
+            self.sender = threading.Thread(target=self._send_loop, args=(self.sender_stopped,), daemon=True, name="ws-control"); self.sender.start()
+        self._report_status()
+
+    def stop(self):
+        with self.lock:
+            self.running = False
+            closing = [shard.stop() for shard in self.shards]
+            sender, self.sender = self.sender, None
+            if self.sender_stopped: self.sender_stopped.set()
+        self._close(closing)
+        # Outside the lock, which the loop takes; bounded, as a send stuck on a dead socket only ends that loop late
+        if sender and sender is not threading.current_thread(): sender.join(1.0)
+        self.status_cb("Disconnected")
+
+    @staticmethod
+    def _close(sockets):
+        for ws in sockets:
+            if ws is not None: ws.close()
+
+    def _send_loop(self, stopped):
+        from websocket import WebSocketException
+        while not stopped.is_set():
+            with self.lock:
+                now = time.monotonic(); frames = [(shard, shard.next_frame(now)) for shard in self.shards]
+            for shard, frame in frames:
+                if frame is None: continue
+                try: frame[0].send(frame[1])
+                except WebSocketException as e: self.log_cb(f"WebSocket shard {shard.index} send failed: {e}")
+            stopped.wait(0.05)
+
+    def connected_count(self): return sum(1 for s in self.shards if s.connected.is_set())
+
+    def _report_status(self):
+        if not self.running: return
+        total = sum(1 for s in self.shards if s.streams); up = self.connected_count()
+        self.status_cb("Connected" if total and up >= total else f"Connecting ({up}/{total} shards)")
@@ -0,0 +1,72 @@
+"""Prebuilt search index over exchange symbols for the Markets tab and the Add Coin dialog.
+
+Every 1-, 2- and 3-character substring of each symbol maps to the sorted ids of
+the symbols containing it. A query of up to three characters is a single
+lookup; longer queries intersect the posting lists of their trigrams, starting
+with the rarest, and verify the few survivors. Prefix matches come from a
+bisect over the sorted symbols and are listed first. Queries may name the pair
+as "BTC/USDT", "btc-usdt" or "btc usdt", and results can be limited to one
+quote asset.
+
+The index is plain lists and dicts so it can be cached as JSON next to the
+exchange metadata it was built from.
+"""
+from bisect import bisect_left
+
+MAX_GRAM = 3
+SEPARATORS = str.maketrans("", "", "/-_ ")
+
+
+def normalize(term): return term.upper().translate(SEPARATORS)
+
+
+class SymbolIndex:
+    def __init__(self, markets, grams=None):
+        """`markets` is a list of (symbol, base, quote); `grams` is a posting table from `to_dict()`, rebuilt when omitted."""
+        self.markets = sorted(tuple(m) for m in markets)
+        self.symbols = [m[0] for m in self.markets]
+        self.quotes = {}
+        for i, (_, _, quote) in enumerate(self.markets): self.quotes.setdefault(quote, []).append(i)
+        self.grams = grams if grams is not None else self._build()
+
+    def _build(self):
+        grams = {}
+        for i, symbol in enumerate(self.symbols):
+            seen = {symbol[j:j + n] for n in range(1, MAX_GRAM + 1) for j in range(len(symbol) - n + 1)}
+            for gram in seen: grams.setdefault(gram, []).append(i)  # Ids arrive in order, so postings stay sorted
+        return grams
+
+    def __len__(self): return len(self.symbols)
+
+    def quote_assets(self):
+        """Quote assets ordered by how many symbols use them, most common first."""
+        return sorted(self.quotes, key=lambda q: (-len(self.quotes[q]), q))
+
+    def _matches(self, term):
+        if len(term) <= MAX_GRAM: return self.grams.get(term, [])
+        postings = sorted((self.grams.get(term[j:j + MAX_GRAM], []) for j in range(len(term) - MAX_GRAM + 1)), key=len)
+        ids = set(postings[0])
+        for p in postings[1:]:
+            ids.intersection_update(p)
+            if not ids: return []
+        return sorted(i for i in ids if term in self.symbols[i])
+
+    def search(self, term, quote=None, exclude=(), limit=None):
+        """Symbols containing `term` (prefix matches first, then alphabetical), optionally only those quoted in `quote`."""
+        term = normalize(term); exclude = {s.upper() for s in exclude}
+        if not term: ids = self.quotes.get(quote, []) if quote else range(len(self.symbols))
+        else:
+            start = bisect_left(self.symbols, term); end = bisect_left(self.symbols, term + "\uffff")
+            ids = [*range(start, end), *(i for i in self._matches(term) if not start <= i < end)]
+        out = []
+        for i in ids:
+            if quote and self.markets[i][2] != quote: continue
+            if self.symbols[i] in exclude: continue
+            out.append(self.symbols[i])
+            if limit and len(out) >= limit: break
+        return out
+
+    def to_dict(self): return {"markets": self.markets, "grams": self.grams}
+
+    @classmethod
+    def from_dict(cls, data): return cls(data["markets"], data.get("grams"))
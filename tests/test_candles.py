@@ -0,0 +1,66 @@
+"""CandleAggregator against a direct resample of the same synthetic 1m stream."""
+from candles import CandleAggregator
+from core import INTERVAL_MS, MAX_CHART_POINTS
+from decode import KlineRecord
+
+START = 20_000 * 86_400_000  # UTC midnight
+TICKS_PER_MINUTE = 3
+
+
+def stream(minutes):
+    """1m KlineRecords from START, TICKS_PER_MINUTE per minute with running volume, the last one closing the minute."""
+    recs, price = [], 100.0
+    for m in range(minutes):
+        t = START + m * 60_000; o = h = l = price; v = 0.0
+        for k in range(TICKS_PER_MINUTE):
+            price += 0.5 if (m + k) % 2 else -0.3; h, l = max(h, price), min(l, price); v += 1.0 + m * 0.1 + k * 0.3
+            recs.append(KlineRecord("BTCUSDT", "1m", t, t + 59_999, o, h, l, price, v, k == TICKS_PER_MINUTE - 1))
+    return recs
+
+
+def minute_rows(recs):
+    """What /klines?interval=1m returns after `recs`: each minute's latest tick."""
+    last = {r.open_time: r for r in recs}
+    return [(t, r.open, r.high, r.low, r.close, r.volume, t + 59_999) for t, r in sorted(last.items())]
+
+
+def resample(minutes, ms):
+    out = {}
+    for t, o, h, l, c, v, _ in minutes:
+        b = t - t % ms; r = out.get(b)
+        out[b] = [b, o, h, l, c, v, b + ms - 1] if r is None else [b, r[1], max(r[2], h), min(r[3], l), c, r[5] + v, r[6]]
+    return [tuple(r) for _, r in sorted(out.items())]
+
+
+def assert_rows(got, want):
+    assert len(got) == len(want)
+    for g, w in zip(got, want): assert all(abs(a - b) < 1e-9 for a, b in zip(g, w)), (g, w)
+
+
+def test_mid_bucket_seed_with_lagged_response_keeps_volume():
+    recs = stream(12); join, snapshot = 2 * TICKS_PER_MINUTE, 3 * TICKS_PER_MINUTE + 1  # Joined at minute 2, REST read in minute 3
+    agg = CandleAggregator(INTERVAL_MS, MAX_CHART_POINTS)
+    for rec in recs[join:snapshot + 2]: agg.add(rec)  # The stream is a tick ahead of the response when it is seeded
+    assert not agg.is_complete("BTCUSDT", "5m")
+    seen = recs[:snapshot + 1]; now = START + 3 * 60_000 + 30_000
+    for interval in ("1m", "5m", "15m"):
+        agg.seed("BTCUSDT", interval, resample(minute_rows(seen), INTERVAL_MS[interval]), minutes=minute_rows(seen), now=now)
+        assert agg.is_complete("BTCUSDT", interval)
+    for rec in recs[snapshot + 2:]: agg.add(rec)
+    for interval in ("1m", "5m", "15m"):
+        assert_rows(agg.rows("BTCUSDT", interval), resample(minute_rows(recs), INTERVAL_MS[interval]))
+
+
+def test_mid_bucket_seed_without_minutes_stays_partial():
+    recs = stream(4); agg = CandleAggregator(INTERVAL_MS, MAX_CHART_POINTS)
+    for rec in recs[TICKS_PER_MINUTE:]: agg.add(rec)
+    agg.seed("BTCUSDT", "5m", resample(minute_rows(recs), 300_000), now=START + 3 * 60_000 + 30_000)
+    assert not agg.is_complete("BTCUSDT", "5m") and agg.rows("BTCUSDT", "5m") is None
+
+
+def test_stale_store_rows_stay_partial():
+    closed = resample(minute_rows(stream(10)), 300_000); agg = CandleAggregator(INTERVAL_MS, MAX_CHART_POINTS)
+    agg.seed("BTCUSDT", "5m", closed, now=START + 10 * 60_000 + 5_000)
+    assert agg.is_complete("BTCUSDT", "5m")
+    agg.seed("BTCUSDT", "5m", closed, now=START + 30 * 60_000)  # A failed fetch: the store ends four buckets back
+    assert not agg.is_complete("BTCUSDT", "5m")
@@ -0,0 +1,84 @@
+"""Kline history against a local HTTP stand-in for /api/v3/klines: incremental sync and backfill."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+
+from core import BinanceAPI, INTERVAL_MS, KLINES_PAGE_LIMIT, MAX_CHART_POINTS
+from rest_client import RestClient
+
+HISTORY = 20_000  # Candles the stand-in knows per interval, the newest one forming
+
+
+class KlinesServer(ThreadingHTTPServer):
+    """Answers startTime / endTime / limit the way Binance does, from candles generated around the current time."""
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler); self.requests = []
+
+    def klines(self, params):
+        ms = INTERVAL_MS[params["interval"]]; now = int(time.time() * 1000); last = now - now % ms; limit = int(params.get("limit", 500))
+        if "startTime" in params: first = max(int(params["startTime"]), last - (HISTORY - 1) * ms); first += -first % ms
+        else: first = max(min(int(params.get("endTime", now)), last) // ms * ms - (limit - 1) * ms, last - (HISTORY - 1) * ms)
+        return [[t, "1", "2", "0.5", "1.5", "10", t + ms - 1] for t in range(first, min(first + limit * ms, last + 1), ms)]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args): pass
+
+    def do_GET(self):
+        url = urlsplit(self.path); params = dict(parse_qsl(url.query)); self.server.requests.append(params)
+        body = json.dumps(self.server.klines(params)).encode()
+        self.send_response(200); self.send_header("Content-Type", "application/json"); self.send_header("Content-Length", str(len(body))); self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = KlinesServer(); threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown(); httpd.server_close()
+
+
+@pytest.fixture
+def api(server):
+    api = BinanceAPI(lambda *a: None, lambda msg: None, lambda status: None, ["btcusdt"])
+    api.rest.close(); api.rest = RestClient("http://%s:%d" % server.server_address[:2])
+    yield api
+    api.close()
+
+
+def requests_for(server, interval): return [p for p in server.requests if p["interval"] == interval]
+
+
+def assert_contiguous(rows, interval):
+    assert all(b[0] - a[0] == INTERVAL_MS[interval] for a, b in zip(rows, rows[1:]))
+
+
+def test_second_sync_fetches_only_candles_after_the_store(server, api):
+    rows = api.get_historical_klines("BTCUSDT", "5m")
+    assert len(rows) == MAX_CHART_POINTS and requests_for(server, "5m") == [{"symbol": "BTCUSDT", "interval": "5m", "limit": str(MAX_CHART_POINTS)}]
+    assert_contiguous(rows, "5m"); stored = api.store.last_open_time("BTCUSDT", "5m")
+    assert stored == rows[-2][0] and api.store.count("BTCUSDT", "5m") == MAX_CHART_POINTS - 1  # The forming candle is never stored
+    server.requests.clear()
+    again = api.get_historical_klines("BTCUSDT", "5m")
+    (sync,) = requests_for(server, "5m")
+    assert int(sync["startTime"]) == stored and len(again) == MAX_CHART_POINTS and again[0][0] >= rows[0][0]
+    assert_contiguous(again, "5m")
+
+
+def test_deep_history_is_backfilled_then_served_from_the_store(server, api):
+    got = []; api.data_cb = lambda type, data: got.append(data) if type == "history" else None
+    depth = 2_500; api.request_historical_klines("BTCUSDT", "5m", depth)
+    deadline = time.monotonic() + 10
+    while not got and time.monotonic() < deadline: api.process_queue(); time.sleep(0.01)
+    symbol, interval, rows, minutes = got[0]
+    assert (symbol, interval, len(rows)) == ("BTCUSDT", "5m", depth) and minutes
+    assert_contiguous(rows, "5m"); assert api.candles.is_complete("BTCUSDT", "5m")
+    pages = requests_for(server, "5m")
+    assert all(int(p["limit"]) <= KLINES_PAGE_LIMIT for p in pages) and sum("endTime" in p for p in pages) == 2
+    server.requests.clear()
+    assert len(api.get_historical_klines("BTCUSDT", "5m", depth)) == depth
+    assert [set(p) for p in requests_for(server, "5m")] == [{"symbol", "interval", "startTime", "limit"}]  # Reopening only syncs the tail
@@ -0,0 +1,40 @@
+"""Metrics registry: unregistering, one dumper at a time, and CRYPTO_METRICS_EVERY parsing."""
+import threading
+import time
+
+from metrics import DUMP_EVERY, Metrics
+
+
+class Stage:
+    def work(self): return 1
+
+
+def dumpers(): return sum(1 for t in threading.enumerate() if t.name == "metrics-dump" and t.is_alive())
+
+
+def test_unregister_restores_methods_and_drops_points():
+    m = Metrics(); a, b = Stage(), Stage()
+    m.register(a, work="work"); m.register(b, work="work"); m.enable()
+    assert "work" in vars(a) and a.work() == 1 and m.histogram("work").count == 1
+    m.unregister(a)
+    assert "work" not in vars(a) and [p[0] for p in m.points] == [b]
+    m.disable(); m.enable(); a.work()
+    assert "work" not in vars(a) and m.histogram("work").count == 1
+
+
+def test_second_dumper_replaces_the_first(tmp_path):
+    m = Metrics(); before = dumpers()
+    m.start_dump(str(tmp_path / "a.json"), every=0.05); first = m.dumper
+    m.start_dump(str(tmp_path / "b.json"), every=0.05)
+    first.join(1); time.sleep(0.2)
+    assert not first.is_alive() and dumpers() == before + 1 and (tmp_path / "b.json").exists()
+    m.stop_dump(); time.sleep(0.1); assert dumpers() == before
+
+
+def test_bad_dump_interval_from_env_falls_back(tmp_path, monkeypatch):
+    for raw in ("ten", "0", "-5", "nan", "inf"):
+        m = Metrics(); log = []
+        monkeypatch.setenv("CRYPTO_METRICS_DUMP", str(tmp_path / "m.prom")); monkeypatch.setenv("CRYPTO_METRICS_EVERY", raw)
+        m.configure_from_env(log.append)
+        assert m.enabled and m.dumper is not None and len(log) == 1 and f"every {DUMP_EVERY:g}s" in log[0]
+        m.stop_dump()
@@ -0,0 +1,76 @@
+"""RestClient against a local HTTP stand-in: in-flight coalescing, 429 Retry-After and the used-weight header."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from rest_client import RestClient, WEIGHT_HEADROOM
+
+WEIGHT_LIMIT = 1000
+
+
+class StandIn(ThreadingHTTPServer):
+    """Serves the scripted (status, headers) responses in order, then 200s; /slow waits for `release`."""
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.paths, self.script, self.weight, self.release = [], [], 1, threading.Event()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args): pass
+
+    def do_GET(self):
+        srv = self.server; srv.paths.append(self.path)
+        if self.path.startswith("/slow"): srv.release.wait(5)
+        status, headers = srv.script.pop(0) if srv.script else (200, {})
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(status); self.send_header("Content-Length", str(len(body))); self.send_header("X-MBX-USED-WEIGHT-1M", str(srv.weight))
+        for k, v in headers.items(): self.send_header(k, v)
+        self.end_headers(); self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = StandIn(); threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.release.set(); httpd.shutdown(); httpd.server_close()
+
+
+@pytest.fixture
+def client(server):
+    c = RestClient("http://%s:%d" % server.server_address[:2], weight_limit=WEIGHT_LIMIT)
+    yield c
+    c.close()
+
+
+def test_identical_calls_in_flight_share_one_request(server, client):
+    futures = [client.submit_get("/slow", {"symbol": "BTCUSDT", "limit": 5}) for _ in range(5)]
+    other = client.submit_get("/slow", {"symbol": "ETHUSDT", "limit": 5})
+    assert all(f is futures[0] for f in futures) and other is not futures[0] and client.stats["coalesced"] == 4
+    server.release.set()
+    assert futures[0].result(5) == {"path": "/slow?symbol=BTCUSDT&limit=5"} and other.result(5)
+    assert len(server.paths) == 2
+    deadline = time.monotonic() + 2
+    while client.in_flight and time.monotonic() < deadline: time.sleep(0.01)
+    client.submit_get("/slow", {"symbol": "BTCUSDT", "limit": 5}).result(5)  # Finished calls are not reused
+    assert len(server.paths) == 3
+
+
+def test_429_blocks_requests_until_retry_after(server, client):
+    server.script = [(429, {"Retry-After": "1"})]
+    with pytest.raises(requests.HTTPError): client.get("/a")
+    start = time.monotonic(); assert client.get("/b") == {"path": "/b"}
+    assert time.monotonic() - start >= 0.9 and client.stats["throttled_s"] > 0.9 and server.paths == ["/a", "/b"]
+
+
+def test_used_weight_header_pauses_before_the_budget(server, client):
+    if time.time() % 60 > 55: time.sleep(61 - time.time() % 60)  # The budget resets each minute
+    server.weight = int(WEIGHT_LIMIT * WEIGHT_HEADROOM) - 1
+    client.get("/a"); assert client.used_weight == server.weight
+    server.weight += 1; client.get("/b")  # Under the headroom when sent; its reply reaches it
+    assert client.used_weight == WEIGHT_LIMIT * WEIGHT_HEADROOM
+    threading.Thread(target=client.get, args=("/c",), daemon=True).start(); time.sleep(0.3)
+    assert server.paths == ["/a", "/b"] and client.stats["throttled_s"] > 0
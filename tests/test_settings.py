@@ -0,0 +1,24 @@
+"""SettingsManager: an unreadable settings file is kept aside and reported through log_cb, never on stdout."""
+import os
+
+from core import SettingsManager
+
+DEFAULTS = {"tracked_pairs": ["btcusdt", "ethusdt"]}
+
+
+def test_unreadable_file_is_moved_aside_and_logged(tmp_path, capsys):
+    fp = tmp_path / "config.json"; fp.write_text("{not json")
+    log = []; settings = SettingsManager(str(fp), log.append)
+    assert settings.config == DEFAULTS and not fp.exists()
+    (backup,) = [p for p in tmp_path.iterdir() if p.name.startswith("config.json.corrupt-")]
+    assert backup.read_text() == "{not json" and str(backup) in log[0]
+    assert capsys.readouterr().out == ""
+
+
+def test_failed_rename_is_logged_not_raised(tmp_path, monkeypatch, capsys):
+    fp = tmp_path / "config.json"; fp.write_text("{not json")
+    def deny(src, dst): raise PermissionError(13, "Permission denied")
+    monkeypatch.setattr(os, "replace", deny)
+    settings = SettingsManager(str(fp))  # Default log_cb: stderr
+    assert settings.config == DEFAULTS and fp.exists()
+    out = capsys.readouterr(); assert out.out == "" and "could not be moved aside" in out.err
@@ -0,0 +1,68 @@
+"""StreamManager against replay.ReplayServer, a local stand-in for Binance's combined-stream endpoint."""
+import threading
+import time
+
+import pytest
+
+from replay import ReplayServer, synthesize
+from streams import StreamManager
+
+
+def wait_for(condition, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end: return False
+        time.sleep(0.02)
+    return True
+
+
+def alive(name): return sum(1 for t in threading.enumerate() if t.name == name and t.is_alive())
+
+
+@pytest.fixture
+def server():
+    srv = ReplayServer(synthesize(["btcusdt", "ethusdt"], seconds=30, rate=20), speed=1, loop=True).start()
+    yield srv
+    srv.stop()
+
+
+@pytest.fixture
+def manager(server):
+    frames, log = [], []
+    m = StreamManager(frames.append, log.append, lambda status: None, base_url=server.ws_url)
+    m.frames, m.messages = frames, log
+    yield m
+    m.stop()
+
+
+def test_subscribes_added_streams(manager):
+    manager.set_streams({"btcusdt@kline_1m"}); manager.start()
+    assert wait_for(lambda: any('"btcusdt@kline_1m"' in f for f in manager.frames))
+    manager.set_streams({"btcusdt@kline_1m", "ethusdt@kline_1m"})
+    assert wait_for(lambda: "ethusdt@kline_1m" in manager.shards[0].active)
+    assert wait_for(lambda: any('"ethusdt@kline_1m"' in f for f in manager.frames))
+
+
+def test_quick_restart_leaves_one_connection(server, manager):
+    manager.set_streams({"btcusdt@kline_1m"}); manager.start()
+    assert wait_for(lambda: manager.connected_count() == 1)
+    for _ in range(5): manager.stop(); manager.start()
+    manager.set_streams(set()); manager.set_streams({"btcusdt@kline_1m"})
+    # Runs stopped while connecting close their socket as soon as it opens; only the newest stays
+    assert wait_for(lambda: manager.connected_count() == 1 and alive("replay-control") == 1, timeout=15)
+    assert alive("ws-control") == 1
+    connections = server.stats["connections"]; time.sleep(1.5)  # No thread of an earlier run reconnects
+    assert server.stats["connections"] == connections and alive("replay-control") == 1
+    assert not any("reconnecting" in m for m in manager.messages)
+
+
+def test_stalled_socket_does_not_hold_the_lock(manager):
+    manager.set_streams({"btcusdt@kline_1m"}); manager.start()
+    assert wait_for(lambda: manager.connected_count() == 1)
+    shard = manager.shards[0]; sending = threading.Event()
+    shard.ws.send = lambda *args: (sending.set(), time.sleep(2))  # A control frame stuck on a dead socket
+    manager.set_streams({"btcusdt@kline_1m", "ethusdt@kline_1m"})
+    assert sending.wait(2)
+    start = time.monotonic(); manager.set_streams({"btcusdt@kline_1m"})
+    with manager.lock: pass
+    assert time.monotonic() - start < 0.5
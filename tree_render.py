@@ -0,0 +1,119 @@
+"""Frame-budgeted, diff-based rendering for a ttk.Treeview fed by a live stream.
+
+Updates only mark rows dirty; at most `hz` times a second one frame draws them.
+A frame reads each dirty row's raw values, formats only the cells whose raw value
+changed (formatted strings are cached per cell) and sends only the cells whose
+text changed, one `tree.set` each. Rows scrolled out of view, or on a hidden tab,
+stay dirty until they are shown. A sorted table is kept sorted by moving only
+the rows outside the longest run already in order, never by reinserting them.
+The Tk main loop therefore does work proportional to what visibly changes,
+whatever the row count or tick rate.
+"""
+import math
+import time
+from bisect import bisect_left
+
+RENDER_HZ = 5  # Frames per second at most; 4-10 keeps prices readable and the main loop free
+MOVE_LIMIT = 32  # Beyond this many moves, one set_children call relinks all rows instead (still no reinsert)
+VISIBLE_MARGIN = 2  # Rows just outside the view that are drawn too, so a small scroll shows no stale values
+
+
+def _stable_run(positions):
+    """Indices of a longest increasing subsequence of `positions`: the rows a reorder can leave where they are."""
+    tails, tail_index, prev = [], [], [-1] * len(positions)
+    for i, p in enumerate(positions):
+        j = bisect_left(tails, p)
+        if j == len(tails): tails.append(p); tail_index.append(i)
+        else: tails[j] = p; tail_index[j] = i
+        prev[i] = tail_index[j - 1] if j else -1
+    run, i = [], tail_index[-1] if tail_index else -1
+    while i >= 0: run.append(i); i = prev[i]
+    return run
+
+
+class TreeRenderer:
+    def __init__(self, tree, columns, row_fn, formatters, tag_fn=None, hz=RENDER_HZ, scrollbar=None):
+        """`row_fn(iid)` returns a row's raw values, formatted per column by `formatters`; `tag_fn(raw)` its tag."""
+        self.tree, self.columns, self.row_fn, self.formatters, self.tag_fn = tree, columns, row_fn, formatters, tag_fn
+        self.frame_s = 1 / hz; self.scrollbar = scrollbar; self.labels = {c: tree.heading(c, "text") for c in columns}
+        self.rows, self.order, self.dirty = {}, [], set()  # rows: iid -> [raw values, texts, tag, stale]
+        self.sort_col, self.sort_desc, self.job, self.last_frame = None, False, None, 0.0
+        self.stats = {"frames": 0, "cells": 0, "moves": 0, "hidden": 0, "frame_ms": 0.0, "max_frame_ms": 0.0}
+        tree.configure(yscrollcommand=self._on_view_change); tree.bind("<Map>", lambda e: self._schedule(), add="+")
+
+    def mark(self, iid):
+        self.dirty.add(iid)
+        if self.job is None: self._schedule()
+
+    def remove(self, iid):
+        self.dirty.discard(iid)
+        if self.rows.pop(iid, None) is not None: self.order.remove(iid); self.tree.delete(iid)
+
+    def sort_by(self, column):
+        """Sorts by `column`, toggling descending when it is already the sort column."""
+        self.sort_desc = not self.sort_desc if column == self.sort_col else False
+        if self.sort_col is not None: self.tree.heading(self.sort_col, text=self.labels[self.sort_col])
+        self.sort_col = column; self.tree.heading(column, text=f"{self.labels[column]} {'▼' if self.sort_desc else '▲'}")
+        self._reorder()
+
+    def _on_view_change(self, first, last):
+        if self.scrollbar is not None: self.scrollbar.set(first, last)
+        if self.dirty and self.job is None: self._schedule()  # Rows scrolled into view may be stale
+
+    def _schedule(self):
+        if self.job is not None: return
+        delay = max(0.0, self.last_frame + self.frame_s - time.monotonic())
+        self.job = self.tree.after(int(delay * 1000), self.render)
+
+    def render(self):
+        """Draws one frame: new rows, changed cells of visible dirty rows, and the sort order if it changed."""
+        self.job = None; start = self.last_frame = time.monotonic()
+        if not self.dirty or not self.tree.winfo_ismapped(): return  # <Map> schedules a frame when the tab is shown
+        reorder = False; sort = self.columns.index(self.sort_col) if self.sort_col is not None else None
+        for iid in self.dirty:
+            raw = tuple(self.row_fn(iid)); row = self.rows.get(iid)
+            if row is None:
+                texts = [fmt(v) for fmt, v in zip(self.formatters, raw)]; tag = self.tag_fn(raw) if self.tag_fn else ""
+                self.tree.insert("", "end", iid=iid, values=texts, tags=(tag,)); self.rows[iid] = [raw, texts, tag, True]
+                self.order.append(iid); reorder = True
+            else:
+                if sort is not None and raw[sort] != row[0][sort]: reorder = True
+                if raw != row[0]: row[0] = raw; row[3] = True
+        if reorder and sort is not None: self._reorder()
+        first, last = self.tree.yview(); n = len(self.order)
+        lo, hi = max(0, int(first * n) - VISIBLE_MARGIN), min(n, math.ceil(last * n) + VISIBLE_MARGIN)
+        drawn, cells = set(), 0
+        for iid in self.order[lo:hi]:
+            if iid not in self.dirty: continue
+            drawn.add(iid); row = self.rows[iid]
+            if not row[3]: continue
+            raw, texts = row[0], row[1]; row[3] = False
+            for i, (fmt, value) in enumerate(zip(self.formatters, raw)):
+                text = fmt(value)
+                if text != texts[i]: texts[i] = text; self.tree.set(iid, self.columns[i], text); cells += 1
+            tag = self.tag_fn(raw) if self.tag_fn else ""
+            if tag != row[2]: row[2] = tag; self.tree.item(iid, tags=(tag,))
+        self.dirty -= drawn
+        elapsed = (time.monotonic() - start) * 1000; st = self.stats
+        st["frames"] += 1; st["cells"] += cells; st["hidden"] = len(self.dirty)
+        st["frame_ms"] = elapsed; st["max_frame_ms"] = max(st["max_frame_ms"], elapsed)
+
+    def _reorder(self):
+        if self.sort_col is None: return
+        col = self.columns.index(self.sort_col)
+        new = sorted(self.order, key=lambda iid: self.rows[iid][0][col], reverse=self.sort_desc)
+        if new == self.order: return
+        position = {iid: i for i, iid in enumerate(self.order)}
+        stable = {new[i] for i in _stable_run([position[iid] for iid in new])}
+        if len(new) - len(stable) > MOVE_LIMIT:
+            self.tree.set_children("", *new); self.order = new; self.stats["moves"] += len(new) - len(stable); return
+        order = self.order
+        for i, iid in enumerate(new):
+            if iid in stable: continue
+            # Right after its predecessor in the new order (which is already in place), or first
+            target = 0 if i == 0 else order.index(new[i - 1]) + 1
+            current = order.index(iid)
+            if current < target:
+                # Tk releases disagree on whether a move's index counts the row itself; detached, it does not
+                target -= 1; self.tree.detach(iid)
+            order.pop(current); order.insert(target, iid); self.tree.move(iid, "", target); self.stats["moves"] += 1